@@ -0,0 +1,89 @@
+# benchmarks/ws_transport.py
+"""
+Compare websocket hops over TCP loopback and a unix domain socket.
+
+    uv run benchmarks/ws_transport.py --frames 5000
+
+For each transport it measures the round trip of one partial frame at a time (p50/p99)
+and the rate at which a stream of frames is delivered without waiting for replies.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from adapters.ws_connect import connect  # noqa: E402
+from ws_server import serve  # noqa: E402
+
+FRAME = json.dumps({
+    "role": "Responder",
+    "message": "a few streamed tokens ",
+    "partial": True,
+    "request_id": "00000000-0000-4000-8000-000000000000"
+})
+
+async def echo(websocket):
+    async for frame in websocket:
+        if frame == "count":
+            continue
+        await websocket.send(frame)
+
+async def count(websocket):
+    received = 0
+    async for frame in websocket:
+        if frame == "done":
+            await websocket.send(str(received))
+        else:
+            received += 1
+
+async def round_trips(uri: str, frames: int):
+    latencies = []
+    async with connect(uri) as websocket:
+        for _ in range(frames):
+            start = time.perf_counter()
+            await websocket.send(FRAME)
+            await websocket.recv()
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+async def stream(uri: str, frames: int):
+    async with connect(uri) as websocket:
+        start = time.perf_counter()
+        for _ in range(frames):
+            await websocket.send(FRAME)
+        await websocket.send("done")
+        assert int(await websocket.recv()) == frames
+        return frames / (time.perf_counter() - start)
+
+async def benchmark(name: str, echo_uri: str, count_uri: str, frames: int):
+    async with serve(echo, echo_uri), serve(count, count_uri):
+        await round_trips(echo_uri, min(frames, 200))  # warm up
+        p50, p99 = await round_trips(echo_uri, frames)
+        rate = await stream(count_uri, frames)
+    print(f"{name:<6} round trip p50 {p50 * 1e6:7.1f} us  p99 {p99 * 1e6:7.1f} us  stream {rate:9.0f} frames/s")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare websocket transports")
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=9390)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        await benchmark("tcp", f"ws://127.0.0.1:{args.port}", f"ws://127.0.0.1:{args.port + 1}", args.frames)
+        await benchmark(
+            "unix",
+            f"unix://{os.path.join(directory, 'echo.sock')}",
+            f"unix://{os.path.join(directory, 'count.sock')}",
+            args.frames
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+# adapters/connection_manager.py
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from adapters.ws_connect import connect
+from websockets.exceptions import ConnectionClosed
+from messages.codec import get_codec
+from adapters.resume import backoff_delay
+
+log = logging.getLogger(__name__)
+
+# put on subscriber queues when the connection is gone for good
+_CLOSED = object()
+
+class SharedConnection:
+    """
+    One duplex websocket connection to a URI, shared by every adapter that uses it
+    (a websocket adapter without a shared connection gets one of its own).
+
+    Inbound frames are decoded once and go to all subscribers, just as each adapter saw
+    every frame on a connection of its own; frames that can't be decoded are skipped.
+    A dropped connection is reconnected once for all users, whether a read or a send
+    noticed it first, with backoff between attempts.
+    """
+
+    def __init__(self, uri: str, max_retries: int = 3, retry_delay: float = 2, codec=None, max_retry_delay: float = 30.0):
+        self.uri = uri
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.codec = codec or get_codec()
+        self.websocket = None
+        self.generation = 0
+        self.users = 0
+        self.subscribers: List[asyncio.Queue] = []
+        self._lock = asyncio.Lock()
+        self._reader: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def acquire(self):
+        """Register a user, connecting on the first one."""
+        self.users += 1
+        if self.websocket is None:
+            async with self._lock:
+                if self.websocket is None:
+                    try:
+                        await self._connect_with_retries()
+                    except EOFError:
+                        self.users -= 1
+                        raise
+                    self._closed = False
+                    self._reader = asyncio.create_task(self._read_loop())
+
+    async def release(self):
+        """Unregister a user, closing the connection after the last one."""
+        self.users -= 1
+        if self.users > 0:
+            return
+        self._closed = True
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self.websocket is not None:
+            await self.websocket.close()
+            self.websocket = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    async def receive(self, queue: asyncio.Queue) -> dict:
+        """Return the next frame from a subscription queue."""
+        data = await queue.get()
+        if data is _CLOSED:
+            # let the other readers of the queue see it too
+            queue.put_nowait(_CLOSED)
+            raise EOFError(f"Connection to {self.uri} is closed.")
+        return data
+
+    async def send(self, frame):
+        """Send an encoded frame, reconnecting (once for every user) if the connection dropped."""
+        for attempt in range(self.max_retries):
+            generation = self.generation
+            try:
+                await self.websocket.send(frame)
+                return
+            except ConnectionClosed as e:
+                log.debug(f"Connection to {self.uri} lost during send: {e}")
+                await self.reconnect(generation)
+        raise EOFError("Failed to write message after multiple retries.")
+
+    async def reconnect(self, generation: int):
+        """Reconnect, unless another user already did since `generation` was read."""
+        async with self._lock:
+            if self.generation != generation or self._closed:
+                return
+            if self.websocket is not None:
+                await self.websocket.close()
+            await self._connect_with_retries()
+
+    async def _connect_with_retries(self):
+        for attempt in range(self.max_retries):
+            try:
+                self.websocket = await connect(self.uri)
+                self.generation += 1
+                return
+            except Exception as e:
+                log.debug(f"Failed to connect (attempt {attempt+1}/{self.max_retries}): {e}")
+                await asyncio.sleep(backoff_delay(attempt, self.retry_delay, self.max_retry_delay))
+        raise EOFError("Unable to establish WebSocket connection after multiple attempts.")
+
+    async def _read_loop(self):
+        try:
+            while not self._closed:
+                generation = self.generation
+                try:
+                    frame = await self.websocket.recv()
+                except ConnectionClosed as e:
+                    log.debug(f"Connection to {self.uri} lost during read: {e}")
+                    await self.reconnect(generation)
+                    continue
+
+                try:
+                    data = self.codec.decode(frame)
+                except ValueError as e:
+                    log.debug(f"Invalid frame received from {self.uri}: {e}")
+                    continue
+                self._dispatch(data)
+        except EOFError as e:
+            log.debug(f"Giving up on {self.uri}: {e}")
+        finally:
+            for queue in self.subscribers:
+                queue.put_nowait(_CLOSED)
+
+    def _dispatch(self, data):
+        # each subscriber gets its own copy, since handlers annotate the messages they read
+        for index, queue in enumerate(self.subscribers):
+            queue.put_nowait(data if index == 0 or not isinstance(data, dict) else dict(data))
+
+
+class ConnectionManager:
+    """Hands out one SharedConnection per URI."""
+
+    def __init__(self):
+        self._connections: Dict[str, SharedConnection] = {}
+
+    def get(self, uri: str, **kwargs) -> SharedConnection:
+        connection = self._connections.get(uri)
+        if connection is None:
+            connection = self._connections[uri] = SharedConnection(uri, **kwargs)
+        return connection
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+_manager = ConnectionManager()
+
+def get_connection_manager() -> ConnectionManager:
+    """Return the process-wide connection manager."""
+    return _manager
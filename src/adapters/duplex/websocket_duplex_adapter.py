@@ -1,64 +1,67 @@
 # adapters/duplex/websocket_duplex_adapter.py
-import json
-import asyncio
 import logging
-import websockets
-from websockets.exceptions import ConnectionClosedError
+from adapters.connection_manager import SharedConnection
+from messages.codec import get_codec
+from adapters.output.send_queue import CoalescingSendQueue
 
 log = logging.getLogger(__name__)
 
 class WebSocketDuplexAdapter:
-    def __init__(self, uri="ws://localhost:8000/ws", max_retries=3, retry_delay=2):
+    def __init__(self, uri="ws://localhost:8000/ws", max_retries=3, retry_delay=2, codec=None, connection=None, max_retry_delay: float = 30.0,
+                 send_queue: int = 0):
         self.uri = uri
-        self.websocket = None
+        # with a send queue, frames are sent by a writer task and partial frames merge while they wait
+        self.send_queue = CoalescingSendQueue(self._write_now, max_frames=send_queue) if send_queue else None
+        self.max_retry_delay = max_retry_delay
+        self.codec = codec or get_codec()
+        # without a shared connection the adapter gets one of its own, which reconnects for it
+        self.connection = connection or SharedConnection(uri, max_retries=max_retries, retry_delay=retry_delay, codec=self.codec,
+                                                         max_retry_delay=max_retry_delay)
+        self._inbox = None
         self.max_retries = max_retries
         self.retry_delay = retry_delay
 
+    @property
+    def websocket(self):
+        return self.connection.websocket
+
     async def start(self):
-        await self._connect_with_retries()
+        if self.send_queue:
+            await self.send_queue.start()
+        self._inbox = self.connection.subscribe()
+        try:
+            await self.connection.acquire()
+        except EOFError:
+            self.connection.unsubscribe(self._inbox)
+            raise
 
     async def read_message(self) -> dict:
-        while True:
-            try:
-                msg = await self.websocket.recv()
-                try:
-                    data = json.loads(msg)
-                    return data
-                except json.JSONDecodeError as e:
-                    log.debug(f"Invalid JSON message received: {e}")
-                    # Instead of ending the conversation, just continue reading next messages
-                    continue
-            except ConnectionClosedError as e:
-                log.debug(f"Connection lost during read_message: {e}")
-                await self._reconnect()
-            except Exception as e:
-                log.debug(f"Unexpected error during read_message: {e}")
-                # Attempt to reconnect and continue
-                await self._reconnect()
+        """Return the next frame; raises EOFError once the connection is gone for good."""
+        return await self.connection.receive(self._inbox)
 
     async def write_message(self, data: dict):
-        while True:
-            try:
-                # Validate that data can be serialized to JSON
-                msg = json.dumps(data)
-                await self.websocket.send(msg)
-                return
-            except ConnectionClosedError as e:
-                log.debug(f"Connection lost during write_message: {e}")
-                await self._reconnect()
-            except TypeError as e:
-                log.debug(f"Data serialization error: {e}")
-                # If data can't be serialized, log and skip sending this message
-                # This avoids killing the conversation. The malformed message is just not sent.
-                return
-            except Exception as e:
-                log.debug(f"Unexpected error during write_message: {e}")
-                # Attempt to reconnect and try again
-                await self._reconnect()
+        if self.send_queue:
+            await self.send_queue.put(data)
+            return
+        await self._write_now(data)
+
+    async def _write_now(self, data: dict):
+        try:
+            msg = self.codec.encode(data)
+        except TypeError as e:
+            # a message that can't be serialized is skipped rather than ending the conversation
+            log.debug(f"Data serialization error: {e}")
+            return
+        await self.connection.send(msg)
 
     async def stop(self):
-        if self.websocket:
-            await self.websocket.close()
+        if self.send_queue:
+            await self.send_queue.close()
+        if self._inbox is None:
+            return
+        self.connection.unsubscribe(self._inbox)
+        self._inbox = None
+        await self.connection.release()
 
     async def get_user_input_and_send(self):
         # Continuously prompt user for input and send it
@@ -67,23 +70,3 @@ class WebSocketDuplexAdapter:
             if user_input.lower() == "quit":
                 break
             await self.write_message({"role": "Questioner", "message": user_input})
-
-    async def _connect_with_retries(self):
-        attempt = 0
-        while attempt < self.max_retries:
-            attempt += 1
-            try:
-                self.websocket = await websockets.connect(self.uri)
-                log.debug(f"Connected to {self.uri} on attempt {attempt}")
-                return
-            except Exception as e:
-                log.debug(f"Failed to connect (attempt {attempt}/{self.max_retries}): {e}")
-                await asyncio.sleep(self.retry_delay)
-        
-        raise EOFError(f"Unable to establish WebSocket connection after {self.max_retries} attempts.")
-
-
-    async def _reconnect(self):
-        if self.websocket:
-            await self.websocket.close()
-        await self._connect_with_retries()
@@ -0,0 +1,238 @@
+# adapters/input/durable_queue.py
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from messages.codec import get_text_codec
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT,
+    body TEXT NOT NULL,
+    visible_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS messages_visible ON messages (visible_at, id);
+CREATE TABLE IF NOT EXISTS dead_letters (
+    id INTEGER PRIMARY KEY,
+    request_id TEXT,
+    body TEXT NOT NULL,
+    attempts INTEGER NOT NULL
+);
+"""
+
+class DurableQueue:
+    """
+    A message queue kept in a local SQLite file, used by the server in place of its
+    asyncio.Queue so that messages accepted before a restart are answered after it.
+
+    put() returns at once; a writer task commits what was put in one transaction at
+    most batch_delay seconds later (or when batch_size messages are waiting), so a
+    crash loses at most that window. get() claims messages in order, hiding them from
+    other readers for visibility_timeout seconds, and the claim is extended while the
+    message is held. ack(request_id) deletes the request's delivered messages once it
+    is answered. Messages not acked in time (e.g. because the process died) are
+    delivered again; after max_attempts deliveries they move to dead_letters.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = 30.0, batch_size: int = 256,
+                 batch_delay: float = 0.005, max_attempts: int = 5, max_pending: int = 4096):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.codec = get_text_codec()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self._pending: List[Tuple[Optional[str], str]] = []
+        self._acks: List[int] = []
+        self._ready: Deque[Tuple[int, Optional[str], dict]] = deque()
+        self._held: Dict[str, List[int]] = {}
+        self._wake = asyncio.Event()
+        self._available = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._commits = 0
+        self._ends = 0
+        self._writing = False
+        self._writer: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def open(self):
+        if self._conn is not None:
+            return
+        self._conn = await asyncio.to_thread(self._connect)
+        self._closing = False
+        self._writer = asyncio.create_task(self._write_loop())
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL with NORMAL sync survives a process crash and commits without waiting on every fsync
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    async def put(self, msg: Optional[dict]):
+        # None ends the reader once the queue is drained, as with an asyncio.Queue; it isn't stored
+        if msg is None:
+            self._ends += 1
+            self._available.set()
+            return
+        if self._conn is None or self._closing:
+            raise EOFError("Durable queue is not open.")
+
+        while len(self._pending) >= self.max_pending:
+            self._space.clear()
+            await self._space.wait()
+
+        request_id = msg.get("request_id")
+        self._pending.append((None if request_id is None else str(request_id), self.codec.encode(msg)))
+        self._wake.set()
+
+    async def get(self) -> Optional[dict]:
+        while True:
+            if self._ready:
+                row_id, request_id, msg = self._ready.popleft()
+                self._held.setdefault(request_id, []).append(row_id)
+                return msg
+
+            commits = self._commits
+            rows, undecodable = await self._run(self._claim, time.time())
+            if undecodable:
+                log.error(f"Dropping {len(undecodable)} undecodable messages from {self.path}.")
+                self._acks.extend(undecodable)
+                self._wake.set()
+            if rows:
+                self._ready.extend(rows)
+                continue
+            if self._ends and not self._pending and not self._writing:
+                self._ends -= 1
+                return None
+
+            # wait for the next commit, or poll for claims that expired
+            if commits == self._commits:
+                self._available.clear()
+                try:
+                    await asyncio.wait_for(self._available.wait(), timeout=min(1.0, self.visibility_timeout))
+                except asyncio.TimeoutError:
+                    pass
+
+    def ack(self, request_id: str):
+        """Delete the delivered messages of an answered request (at the next commit)."""
+        row_ids = self._held.pop(str(request_id), None)
+        if row_ids:
+            self._acks.extend(row_ids)
+            self._wake.set()
+
+    async def close(self):
+        """Commit everything put or acked so far and close the file; held messages stay queued."""
+        if self._conn is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._writer
+        self._heartbeat.cancel()
+        await asyncio.gather(self._heartbeat, return_exceptions=True)
+        async with self._db_lock:
+            await asyncio.to_thread(self._conn.close)
+        self._conn = None
+        self._writer = self._heartbeat = None
+
+    async def _run(self, fn, *args):
+        # one connection, used from worker threads one call at a time
+        async with self._db_lock:
+            return await asyncio.to_thread(fn, *args)
+
+    async def _write_loop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if not self._closing and len(self._pending) < self.batch_size:
+                # let the messages arriving together share a transaction
+                await asyncio.sleep(self.batch_delay)
+
+            # what is put or acked during the write waits for the next one
+            rows, self._pending = self._pending, []
+            acks, self._acks = self._acks, []
+            if rows or acks:
+                self._writing = True
+                try:
+                    await self._run(self._write, rows, acks)
+                except sqlite3.Error as e:
+                    log.error(f"Failed to write {len(rows)} messages to {self.path}, retrying: {e}")
+                    self._pending = rows + self._pending
+                    self._acks = acks + self._acks
+                    await asyncio.sleep(min(1.0, self.visibility_timeout))
+                    self._wake.set()
+                    continue
+                finally:
+                    self._writing = False
+                self._commits += 1
+                self._available.set()
+                self._space.set()
+
+            if self._closing and not self._pending and not self._acks:
+                return
+
+    def _write(self, rows: List[Tuple[Optional[str], str]], acks: List[int]):
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (request_id, body, visible_at) VALUES (?, ?, ?)",
+                [(request_id, body, now) for request_id, body in rows]
+            )
+            self._conn.executemany("DELETE FROM messages WHERE id = ?", [(row_id,) for row_id in acks])
+
+    def _claim(self, now: float) -> Tuple[List[Tuple[int, Optional[str], dict]], List[int]]:
+        with self._conn:
+            # messages delivered max_attempts times without an ack are set aside
+            expired = "FROM messages WHERE visible_at <= ? AND attempts >= ?"
+            dead = self._conn.execute(f"INSERT INTO dead_letters SELECT id, request_id, body, attempts {expired}",
+                                      (now, self.max_attempts)).rowcount
+            if dead:
+                log.warning(f"Moved {dead} messages delivered {self.max_attempts} times to dead_letters in {self.path}.")
+                self._conn.execute(f"DELETE {expired}", (now, self.max_attempts))
+
+            rows = self._conn.execute(
+                "UPDATE messages SET visible_at = ?, attempts = attempts + 1 "
+                "WHERE id IN (SELECT id FROM messages WHERE visible_at <= ? ORDER BY id LIMIT ?) "
+                "RETURNING id, request_id, body",
+                (now + self.visibility_timeout, now, self.batch_size)
+            ).fetchall()
+
+        claimed, undecodable = [], []
+        for row_id, request_id, body in sorted(rows):
+            try:
+                claimed.append((row_id, request_id, self.codec.decode(body)))
+            except ValueError:
+                undecodable.append(row_id)
+        return claimed, undecodable
+
+    async def _heartbeat_loop(self):
+        # keep the claims of messages waiting to be read or being answered from expiring
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            row_ids = [row_id for row_id, _, _ in self._ready]
+            row_ids += [row_id for ids in self._held.values() for row_id in ids]
+            if not row_ids:
+                continue
+            visible_at = time.time() + self.visibility_timeout
+            try:
+                await self._run(self._extend, row_ids, visible_at)
+            except sqlite3.Error as e:
+                log.error(f"Failed to extend claims in {self.path}: {e}")
+
+    def _extend(self, row_ids: List[int], visible_at: float):
+        with self._conn:
+            self._conn.executemany("UPDATE messages SET visible_at = ? WHERE id = ?", [(visible_at, row_id) for row_id in row_ids])
@@ -0,0 +1,33 @@
+# adapters/input/queue_input_adapter.py
+import asyncio
+from .input_adapter import InputAdapter
+
+class QueueInput(InputAdapter):
+    """
+    Reads message dicts from an in-memory asyncio.Queue.
+    Used to connect in-process pipeline stages without any serialization.
+    Each producer puts a None on the queue to mark the end of its stream; the
+    input ends once every producer has done so.
+    """
+    def __init__(self, queue: asyncio.Queue, producers: int = 1):
+        self.queue = queue
+        self._remaining_producers = producers
+        self._stopped = False
+
+    async def read_message(self) -> dict:
+        if self._stopped:
+            raise EOFError("Adapter is stopped and no further messages can be read.")
+
+        while True:
+            msg = await self.queue.get()
+            if msg is not None:
+                return msg
+
+            self._remaining_producers -= 1
+            if self._remaining_producers <= 0:
+                # upstream finished, stay finished for any further reads
+                self._stopped = True
+                raise EOFError("No more messages available (None received).")
+
+    async def stop(self):
+        self._stopped = True
@@ -1,11 +1,21 @@
 # adapters/input/server_input_adapter.py
 import asyncio
-import json
+import logging
+from typing import Union
+from messages.codec import get_codec
+
+log = logging.getLogger(__name__)
 
 class ServerInputAdapter:
-    def __init__(self, message_queue: asyncio.Queue):
+    def __init__(self, message_queue: asyncio.Queue, codec=None):
         self.message_queue = message_queue
+        self.codec = codec or get_codec()
         self._stopped = False
+        # a durable queue is acked once a request's final frame has been handled, which the
+        # server input handler has done by the time it reads the next message, unless it answers
+        # requests concurrently and turns this off (it then calls answered() itself)
+        self.ack_on_read = True
+        self._answered = None
 
     async def start(self):
         # No initialization needed
@@ -15,20 +25,61 @@ class ServerInputAdapter:
         if self._stopped:
             raise EOFError("Adapter is stopped and no further messages can be read.")
 
+        self._ack_answered()
         try:
-            msg = await self.message_queue.get()
-            if msg is None:
-                # If None is used to signal no more messages, treat as EOF
-                raise EOFError("No more messages available (None received).")
-            data = json.loads(msg)
-            return data
-        except json.JSONDecodeError:
-            raise EOFError("Invalid JSON message received from the queue.")
+            while True:
+                msg = await self.message_queue.get()
+                if msg is None:
+                    # If None is used to signal no more messages, treat as EOF
+                    raise EOFError("No more messages available (None received).")
+                # the server queues validated messages as dicts, anything else is an encoded frame
+                if isinstance(msg, dict):
+                    if self.ack_on_read and not msg.get("partial", False) and msg.get("request_id") is not None:
+                        self._answered = msg["request_id"]
+                    return msg
+                try:
+                    return self.codec.decode(msg)
+                except ValueError as e:
+                    # one bad frame doesn't end the input
+                    log.debug(f"Skipping invalid frame from the queue: {e}")
+        except EOFError:
+            raise
         except asyncio.CancelledError:
             # If reading is cancelled, return EOFError to unify error handling
             raise EOFError("Read operation cancelled.")
         except Exception as e:
             raise EOFError(f"Unexpected error while reading message: {e}")
 
+    async def read_raw(self) -> Union[str, bytes]:
+        """Return the next queued frame without decoding it (the relay fast path)."""
+        if self._stopped:
+            raise EOFError("Adapter is stopped and no further messages can be read.")
+
+        try:
+            msg = await self.message_queue.get()
+        except asyncio.CancelledError:
+            raise EOFError("Read operation cancelled.")
+        if msg is None:
+            raise EOFError("No more messages available (None received).")
+        return msg
+
+    def answered(self, request_id: str):
+        """Acknowledge a request whose answer was sent (a durable queue deletes it)."""
+        ack = getattr(self.message_queue, "ack", None)
+        if ack is not None:
+            ack(request_id)
+
+    def drop(self, request_id: str):
+        """Give up on a request that won't be answered, e.g. an abandoned stream (a durable queue deletes it)."""
+        ack = getattr(self.message_queue, "ack", None)
+        if ack is not None:
+            ack(request_id)
+
+    def _ack_answered(self):
+        ack = getattr(self.message_queue, "ack", None)
+        if ack is not None and self._answered is not None:
+            ack(self._answered)
+        self._answered = None
+
     async def stop(self):
         self._stopped = True
@@ -1,12 +1,13 @@
 # adapters/input/stdin_input_adapter.py
 import asyncio
-import json
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES, decode_line
 from .input_adapter import InputAdapter
 
 class StdInInput(InputAdapter):
-    def __init__(self, cmd: list, timeout: float = 5.0, max_retries=3, retry_delay=1.0):
+    def __init__(self, cmd: list, timeout: float = 5.0, max_retries=3, retry_delay=1.0, max_line_bytes: int = DEFAULT_MAX_LINE_BYTES):
         self.cmd = cmd
         self.timeout = timeout
+        self.max_line_bytes = max_line_bytes
         self.process = None
         self.max_retries = max_retries
         self.retry_delay = retry_delay
@@ -22,7 +23,8 @@ class StdInInput(InputAdapter):
                     *self.cmd,
                     stdin=asyncio.subprocess.PIPE,
                     stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
+                    stderr=asyncio.subprocess.PIPE,
+                    limit=self.max_line_bytes
                 )
                 return
             except Exception:
@@ -36,34 +38,32 @@ class StdInInput(InputAdapter):
         if not self.process or self.process.stdout is None:
             raise EOFError("No process or stdout available.")
 
-        for attempt in range(self.max_retries):
+        # the subprocess writes one JSON message per line; blank lines are keep-alives
+        attempt = 0
+        while True:
             try:
                 line = await asyncio.wait_for(self.process.stdout.readline(), timeout=self.timeout)
             except asyncio.TimeoutError:
-                if attempt < self.max_retries - 1:
+                attempt += 1
+                if attempt < self.max_retries:
                     await asyncio.sleep(self.retry_delay)
                     continue
-                else:
-                    raise EOFError("Timed out waiting for input.")
+                raise EOFError("Timed out waiting for input.")
+            except ValueError:
+                # readline drops a line longer than max_line_bytes
+                raise EOFError(f"Message from subprocess is longer than {self.max_line_bytes} bytes.")
 
             if not line:
                 # If we get empty bytes, EOF reached. The test expects "EOF reached"
                 raise EOFError("EOF reached")
 
-            line_str = line.decode('utf-8').strip()
-            if not line_str:
-                # Empty line - treat as EOF for simplicity
-                raise EOFError("EOF reached")
-
             try:
-                msg = json.loads(line_str)
+                msg = decode_line(line)
+            except ValueError:
+                # a malformed line is a malformed message, reading on wouldn't recover it
+                raise EOFError("Invalid JSON received from subprocess.")
+            if msg is not None:
                 return msg
-            except json.JSONDecodeError:
-                if attempt < self.max_retries - 1:
-                    # Retry on invalid JSON
-                    continue
-                else:
-                    raise EOFError("Invalid JSON received from subprocess.")
 
     async def stop(self):
         if self.process:
@@ -0,0 +1,23 @@
+# adapters/ndjson.py
+from typing import Optional
+from messages.codec import get_text_codec
+
+# subprocess pipes are read with this line limit instead of asyncio's 64 KiB default
+DEFAULT_MAX_LINE_BYTES = 16 * 1024 * 1024
+
+def encode_line(msg: dict) -> bytes:
+    """Frame a message as one newline-terminated JSON line."""
+    return (get_text_codec().encode(msg) + "\n").encode("utf-8")
+
+def decode_line(line: bytes) -> Optional[dict]:
+    """
+    Decode one NDJSON frame. Blank lines are keep-alives and decode to None.
+    Raises ValueError if the line isn't a JSON object.
+    """
+    text = line.strip()
+    if not text:
+        return None
+    msg = get_text_codec().decode(text)
+    if not isinstance(msg, dict):
+        raise ValueError("NDJSON frame is not a JSON object.")
+    return msg
@@ -0,0 +1,96 @@
+# adapters/output/buffered_writer.py
+import asyncio
+import sys
+from typing import List, Optional, TextIO
+
+class BufferedStreamWriter:
+    """
+    Writes text to a blocking stream (stdout by default) from a worker thread, so a slow
+    reader at the other end of a pipe never blocks the event loop.
+
+    Text written within flush_interval of the first waiting write goes out in one write and
+    flush; a flush=True write (e.g. a final frame) goes out at once. While max_buffer_bytes
+    or more are waiting to be written, write() waits for the stream to catch up.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, flush_interval: float = 0.005, max_buffer_bytes: int = 1024 * 1024):
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.max_buffer_bytes = max_buffer_bytes
+        self._chunks: List[str] = []
+        # UTF-8 bytes waiting to be written, in total and in _chunks
+        self._pending = 0
+        self._chunk_bytes = 0
+        self._waiting = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._error: Optional[Exception] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, text: str, flush: bool = False):
+        while self._pending >= self.max_buffer_bytes and self._error is None:
+            self._space.clear()
+            await self._space.wait()
+        if self._error is not None:
+            raise EOFError(f"Failed to write to stream: {self._error}")
+        if self._task is None or self._closing:
+            raise EOFError("Writer is not running.")
+
+        size = len(text.encode("utf-8"))
+        self._chunks.append(text)
+        self._chunk_bytes += size
+        self._pending += size
+        self._waiting.set()
+        if flush:
+            self._urgent.set()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._waiting.wait()
+            if not (self._urgent.is_set() or self._closing):
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._waiting.clear()
+            self._urgent.clear()
+
+            chunks, self._chunks = self._chunks, []
+            size, self._chunk_bytes = self._chunk_bytes, 0
+            if chunks:
+                data = "".join(chunks)
+                try:
+                    await loop.run_in_executor(None, self._write_blocking, data)
+                except Exception as e:
+                    self._error = e
+                    self._space.set()
+                    return
+                self._pending -= size
+                if self._pending < self.max_buffer_bytes:
+                    self._space.set()
+
+            if self._closing and not self._chunks:
+                return
+
+    def _write_blocking(self, data: str):
+        stream = self.stream or sys.stdout
+        stream.write(data)
+        stream.flush()
+
+    async def close(self):
+        """Write everything still waiting, then stop the writer."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._waiting.set()
+        await self._task
+        self._task = None
+        if self._error is not None:
+            raise EOFError(f"Failed to write to stream: {self._error}")
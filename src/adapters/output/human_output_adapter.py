@@ -2,6 +2,9 @@
 from .output_adapter import OutputAdapter
 
 class HumanOutput(OutputAdapter):
+    # each write renders a whole panel, so only complete messages should be written
+    streams_partials = False
+
     def __init__(self, renderer=None):
         """
         Optionally accept a renderer callable that handles the display of the message data.
@@ -1,5 +1,8 @@
 # adapters/output/output_adapter.py
 class OutputAdapter:
+    # whether partial/streamed frames can be written as they arrive
+    streams_partials = True
+
     async def start(self):
         # Not implemented yet
         pass
@@ -0,0 +1,24 @@
+# adapters/output/queue_output_adapter.py
+import asyncio
+from .output_adapter import OutputAdapter
+
+class QueueOutput(OutputAdapter):
+    """
+    Writes message dicts to an in-memory asyncio.Queue.
+    Used to connect in-process pipeline stages without any serialization.
+    Stopping the adapter puts None on the queue to signal the end of the stream.
+    """
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self._stopped = False
+
+    async def write_message(self, data: dict):
+        if self._stopped:
+            raise EOFError("Adapter is stopped and cannot write messages.")
+        # a bounded queue applies backpressure to the producing stage here
+        await self.queue.put(data)
+
+    async def stop(self):
+        if not self._stopped:
+            self._stopped = True
+            await self.queue.put(None)
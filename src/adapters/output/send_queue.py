@@ -0,0 +1,109 @@
+# adapters/output/send_queue.py
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+def _mergeable(data: dict) -> bool:
+    return bool(data.get("partial")) and data.get("request_id") is not None and isinstance(data.get("message"), str)
+
+class CoalescingSendQueue:
+    """
+    A bounded queue of outgoing frames, sent one at a time by a writer task, so producers
+    don't wait for a slow socket.
+
+    A partial frame queued while the previous partial frame of the same request is still
+    waiting is merged into it, so a slow connection gets fewer, larger frames instead of a
+    growing backlog. Frames keep their order within a request. put() returns at once unless
+    max_frames frames are waiting. A failed send is raised from the next put() or close().
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]], max_frames: int = 256):
+        self.send = send
+        self.max_frames = max_frames
+        self.merged = 0
+        self._frames: Deque[dict] = deque()
+        self._tails: Dict[str, dict] = {}
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing = False
+        self._error: Optional[Exception] = None
+
+    async def start(self):
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    async def put(self, data: dict):
+        self._raise_error()
+        if self._writer is None or self._closing:
+            raise EOFError("Send queue is not running.")
+
+        # merge into this request's last waiting frame if both are partial text
+        request_id = str(data.get("request_id"))
+        tail = self._tails.get(request_id)
+        if tail is not None and _mergeable(data):
+            tail["message"] += data["message"]
+            if "trace" in data:
+                tail["trace"] = data["trace"]
+            self.merged += 1
+            return
+
+        while len(self._frames) >= self.max_frames:
+            self._space.clear()
+            await self._space.wait()
+            self._raise_error()
+
+        frame = dict(data)
+        self._frames.append(frame)
+        if _mergeable(frame):
+            self._tails[request_id] = frame
+        else:
+            self._tails.pop(request_id, None)
+        self._ready.set()
+
+    async def _run(self):
+        while True:
+            if not self._frames:
+                if self._closing:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            frame = self._frames.popleft()
+            request_id = str(frame.get("request_id"))
+            if self._tails.get(request_id) is frame:
+                del self._tails[request_id]
+            self._space.set()
+
+            try:
+                await self.send(frame)
+            except Exception as e:
+                log.debug(f"Queued send failed, dropping {len(self._frames)} waiting frames: {e}")
+                self._error = e
+                self._frames.clear()
+                self._tails.clear()
+                self._space.set()
+                return
+
+    def _raise_error(self):
+        if self._error is not None:
+            error = self._error
+            raise error if isinstance(error, EOFError) else EOFError(f"Failed to send queued frame: {error}")
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    async def close(self):
+        """Send every waiting frame, then stop the writer."""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._ready.set()
+        await self._writer
+        self._writer = None
+        self._raise_error()
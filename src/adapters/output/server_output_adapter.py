@@ -1,10 +1,15 @@
 # adapters/output/server_output_adapter.py
-import json
 import asyncio
+from typing import Union
+from messages.codec import get_codec
+from transport.flow_control import StreamCancelledError, get_credit_ledger
 
 class ServerOutputAdapter:
-    def __init__(self, clients_set, max_send_retries=3, retry_delay=1.0):
+    def __init__(self, clients_set, max_send_retries=3, retry_delay=1.0, codec=None, ledger=None):
         self.clients = clients_set
+        self.codec = codec or get_codec()
+        # clients that stream an answer with credit limit how far ahead of them its frames are sent
+        self.ledger = ledger if ledger is not None else get_credit_ledger()
         self._stopped = False
         self.max_send_retries = max_send_retries
         self.retry_delay = retry_delay
@@ -16,18 +21,39 @@ class ServerOutputAdapter:
         if self._stopped:
             raise EOFError("Adapter is stopped and cannot write messages.")
 
+        await self._wait_for_credit(data)
         try:
-            message_str = json.dumps(data)
+            message_str = self.codec.encode(data)
         except (TypeError, ValueError) as e:
             raise EOFError(f"Unable to serialize data: {e}")
 
+        # encoded once, whatever the number of clients
         await self._broadcast_with_retries(message_str)
 
-    async def broadcast(self, message_str: str):
+    async def _wait_for_credit(self, data):
+        request_id = data.get("request_id") if isinstance(data, dict) else None
+        if request_id is None or request_id not in self.ledger:
+            return
+        if not data.get("partial", False):
+            # the final frame needs no credit and ends the stream
+            self.ledger.close(request_id)
+            return
+        try:
+            await self.ledger.acquire(request_id)
+        except StreamCancelledError as e:
+            raise EOFError(str(e))
+
+    async def write_raw(self, message_str: Union[str, bytes]):
+        """Broadcast an already serialized frame as is (the relay fast path)."""
+        if self._stopped:
+            raise EOFError("Adapter is stopped and cannot write messages.")
+        await self._broadcast_with_retries(message_str)
+
+    async def broadcast(self, message_str: Union[str, bytes]):
         # Reintroducing broadcast method for tests that call it directly.
         await self._broadcast_with_retries(message_str)
 
-    async def _broadcast_with_retries(self, message_str: str):
+    async def _broadcast_with_retries(self, message_str: Union[str, bytes]):
         to_remove = []
         for client in self.clients:
             success = False
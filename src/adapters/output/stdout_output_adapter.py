@@ -1,20 +1,37 @@
 # adapters/output/stdout_output_adapter.py
-import json
 import sys
+from typing import Optional
+from messages.codec import get_text_codec
+from .buffered_writer import BufferedStreamWriter
 from .output_adapter import OutputAdapter
 
 class StdOutOutput(OutputAdapter):
+    def __init__(self, flush_interval_ms: Optional[float] = None, max_buffer_bytes: int = 1024 * 1024, codec=None):
+        # stdout is line framed, so a binary codec falls back to JSON
+        self.codec = codec or get_text_codec()
+
+        # with a flush interval, frames are batched and written off the event loop
+        self.writer = None
+        if flush_interval_ms is not None:
+            self.writer = BufferedStreamWriter(flush_interval=flush_interval_ms / 1000.0, max_buffer_bytes=max_buffer_bytes)
+
     async def start(self):
-        pass
+        if self.writer:
+            await self.writer.start()
 
     async def write_message(self, data: dict):
         # convert the dictionary to a JSON string and write it to stdout
         try:
-            message_str = json.dumps(data) + "\n"
+            message_str = self.codec.encode(data) + "\n"
         except (TypeError, ValueError) as e:
             # If data cannot be serialized, raise an EOFError for consistency
             raise EOFError(f"Unable to serialize data: {e}")
 
+        if self.writer:
+            # a final frame is written at once rather than at the end of the window
+            await self.writer.write(message_str, flush=not data.get("partial", False))
+            return
+
         try:
             sys.stdout.write(message_str)
             sys.stdout.flush()
@@ -22,4 +39,5 @@ class StdOutOutput(OutputAdapter):
             raise EOFError(f"Failed to write to stdout: {e}")
 
     async def stop(self):
-        pass
+        if self.writer:
+            await self.writer.close()
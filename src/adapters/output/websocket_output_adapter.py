@@ -1,27 +1,90 @@
 # adapters/output/websocket_output_adapter.py
-import json
 import asyncio
+from typing import Dict, Optional, Union
 import logging
-import websockets
+from adapters.ws_connect import connect
 from websockets.exceptions import ConnectionClosedError
+from messages.codec import get_codec
+from adapters.resume import RESUME, RESUME_ACK, ReplayBuffer, backoff_delay
 from .output_adapter import OutputAdapter
+from .send_queue import CoalescingSendQueue
 
 log = logging.getLogger(__name__)
 
 class WebSocketOutput(OutputAdapter):
-    def __init__(self, uri="ws://localhost:8000/ws", max_retries=3, retry_delay=2):
+    def __init__(self, uri="ws://localhost:8000/ws", max_retries=3, retry_delay=2, codec=None, connection=None,
+                 resumable: bool = False, replay_frames: int = 1024, resume_timeout: float = 2.0, max_retry_delay: float = 30.0,
+                 send_queue: int = 0):
         self.uri = uri
+        self.codec = codec or get_codec()
+        # a SharedConnection replaces the adapter's own socket and reconnect loop
+        self.connection = connection
         self.websocket = None
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        # resumable streams number each request's frames and keep them to send again after a reconnect
+        self.replay = ReplayBuffer(replay_frames) if resumable else None
+        self.resume_timeout = resume_timeout
+
+        # with a send queue, frames are sent by a writer task and partial frames merge while they wait
+        self.send_queue = CoalescingSendQueue(self._write_now, max_frames=send_queue) if send_queue else None
 
     async def start(self):
+        if self.send_queue:
+            await self.send_queue.start()
+        if self.connection:
+            await self.connection.acquire()
+            return
         await self._connect_with_retries()
 
     async def write_message(self, data: dict):
+        if self.send_queue:
+            await self.send_queue.put(data)
+            return
+        await self._write_now(data)
+
+    async def _write_now(self, data: dict):
+        number = None
+        if self.replay is not None and not self.connection:
+            data, number = self.replay.stamp(data)
+
+        try:
+            message_str = self.codec.encode(data)
+        except TypeError as e:
+            log.debug(f"Data serialization error: {e}")
+            raise EOFError("Unable to send invalid data over WebSocket.")
+
+        if number is not None:
+            self.replay.add(data["request_id"], number, message_str, final=not data.get("partial", False))
+            await self._send_resumable(message_str)
+            return
+        await self.write_raw(message_str)
+
+    async def _send_resumable(self, message_str: Union[str, bytes]):
+        # the frame is buffered, so the resume after a reconnect sends it if the receiver lacks it
+        for attempt in range(self.max_retries):
+            try:
+                await self.websocket.send(message_str)
+                return
+            except ConnectionClosedError as e:
+                log.debug(f"Connection lost during write_message: {e}")
+            try:
+                await self._reconnect()
+                return
+            except ConnectionClosedError as e:
+                log.debug(f"Connection lost while resuming: {e}")
+        raise EOFError("Failed to write message after multiple retries.")
+
+    async def write_raw(self, message_str: Union[str, bytes]):
+        """Send an already serialized frame as is (the relay fast path)."""
+        if self.connection:
+            await self.connection.send(message_str)
+            return
         for attempt in range(self.max_retries):
             try:
-                await self.websocket.send(json.dumps(data))
+                await self.websocket.send(message_str)
                 return
             except ConnectionClosedError as e:
                 log.debug(f"Connection lost during write_message: {e}")
@@ -32,20 +95,59 @@ class WebSocketOutput(OutputAdapter):
         raise EOFError("Failed to write message after multiple retries.")
 
     async def stop(self):
+        if self.send_queue:
+            await self.send_queue.close()
+        if self.connection:
+            await self.connection.release()
+            return
         if self.websocket:
             await self.websocket.close()
 
     async def _connect_with_retries(self):
         for attempt in range(self.max_retries):
             try:
-                self.websocket = await websockets.connect(self.uri)
+                self.websocket = await connect(self.uri)
                 return
             except Exception as e:
                 log.debug(f"Failed to connect (attempt {attempt+1}/{self.max_retries}): {e}")
-                await asyncio.sleep(self.retry_delay)
+                await asyncio.sleep(backoff_delay(attempt, self.retry_delay, self.max_retry_delay))
         raise EOFError("Unable to establish WebSocket connection after multiple attempts.")
 
     async def _reconnect(self):
         if self.websocket:
             await self.websocket.close()
         await self._connect_with_retries()
+        if self.replay is not None:
+            await self._resume()
+
+    async def _resume(self):
+        """Ask the receiver what it got of the buffered requests and send it the rest."""
+        streams = self.replay.streams()
+        if not streams:
+            return
+        await self.websocket.send(self.codec.encode({"type": RESUME, "streams": streams}))
+        received = await self._read_resume_ack()
+
+        pending = self.replay.frames_after(received)
+        log.debug(f"Resuming {len(streams)} streams to {self.uri}: sending {len(pending)} frames again.")
+        for frame in pending:
+            await self.websocket.send(frame)
+        if received is not None:
+            self.replay.prune(received)
+
+    async def _read_resume_ack(self) -> Optional[Dict[str, int]]:
+        # answers broadcast back on this connection are skipped; nothing else reads it
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.resume_timeout
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.websocket.recv(), timeout=max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                log.debug(f"No resume answer from {self.uri}; sending every buffered frame again.")
+                return None
+            try:
+                data = self.codec.decode(frame)
+            except ValueError:
+                continue
+            if isinstance(data, dict) and data.get("type") == RESUME_ACK:
+                return {str(request_id): int(number) for request_id, number in data.get("received", {}).items()}
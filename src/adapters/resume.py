@@ -0,0 +1,134 @@
+# adapters/resume.py
+import random
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+# control frames of the resume handshake; they are answered by the websocket server, not queued
+RESUME = "resume"
+RESUME_ACK = "resume_ack"
+
+Frame = Union[str, bytes]
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter: half the doubled delay is fixed and half random."""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class ReplayBuffer:
+    """
+    The sending side of resumable streams.
+
+    Frames with a request_id are numbered per request (message_number from 0) and kept,
+    up to max_frames across all requests, so that after a reconnect the frames the
+    receiver missed can be sent again. The frames of the least recently active request
+    are dropped first, and a request left without frames is forgotten, finished or not,
+    so at most max_frames requests are tracked. The next number of a forgotten unfinished
+    request is remembered (for the most recent max_frames of them) in case it continues.
+    """
+
+    def __init__(self, max_frames: int = 1024):
+        self.max_frames = max_frames
+        self._streams: "OrderedDict[str, dict]" = OrderedDict()
+        self._retired: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+
+    def stamp(self, data: dict) -> Tuple[dict, Optional[int]]:
+        """Return the frame numbered for its request, and the number (None for frames without a request_id)."""
+        request_id = data.get("request_id")
+        if request_id is None:
+            return data, None
+        request_id = str(request_id)
+        stream = self._streams.get(request_id)
+        if stream is None:
+            stream = self._streams[request_id] = {"frames": [], "next": self._retired.pop(request_id, 0), "done": False}
+            while len(self._streams) > self.max_frames:
+                self._forget(next(iter(self._streams)))
+        self._streams.move_to_end(request_id)
+        number = stream["next"]
+        stream["next"] += 1
+        return {**data, "message_number": number}, number
+
+    def add(self, request_id: str, number: int, frame: Frame, final: bool):
+        stream = self._streams.get(str(request_id))
+        if stream is None:
+            return
+        stream["frames"].append((number, frame))
+        stream["done"] = stream["done"] or final
+        self._size += 1
+        while self._size > self.max_frames:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        for request_id, stream in self._streams.items():
+            if stream["frames"]:
+                stream["frames"].pop(0)
+                self._size -= 1
+                if not stream["frames"]:
+                    self._forget(request_id)
+                return
+
+    def _forget(self, request_id: str):
+        stream = self._streams.pop(request_id)
+        self._size -= len(stream["frames"])
+        if not stream["done"]:
+            # numbering from 0 again would make the receiver drop its next frames as duplicates
+            self._retired[request_id] = stream["next"]
+            while len(self._retired) > self.max_frames:
+                self._retired.popitem(last=False)
+
+    def streams(self) -> List[str]:
+        """Requests with frames that may need sending again."""
+        return [request_id for request_id, stream in self._streams.items() if stream["frames"]]
+
+    def frames_after(self, received: Optional[Dict[str, int]]) -> List[Frame]:
+        """
+        Frames the receiver hasn't acknowledged, in the order they were sent. Without an
+        answer to the handshake (received is None) every buffered frame is sent again,
+        which receivers that track message_number ignore if they already have it.
+        """
+        received = received or {}
+        pending = []
+        for request_id, stream in self._streams.items():
+            last = received.get(request_id, -1)
+            pending.extend(frame for number, frame in stream["frames"] if number > last)
+        return pending
+
+    def prune(self, received: Dict[str, int]):
+        """Forget finished requests whose every frame the receiver acknowledged."""
+        for request_id in list(self._streams):
+            stream = self._streams[request_id]
+            if stream["done"] and received.get(request_id, -1) >= stream["next"] - 1:
+                self._size -= len(stream["frames"])
+                del self._streams[request_id]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class ResumeTracker:
+    """
+    The receiving side of resumable streams: the last message_number seen per request
+    (for the most recent max_streams requests), used to drop frames sent again after a
+    reconnect and to answer resume handshakes.
+    """
+
+    def __init__(self, max_streams: int = 4096):
+        self.max_streams = max_streams
+        self._last: "OrderedDict[str, int]" = OrderedDict()
+
+    def accept(self, request_id: str, number: int) -> bool:
+        """Record a numbered frame; False if it was already received."""
+        request_id = str(request_id)
+        last = self._last.get(request_id)
+        if last is not None and number <= last:
+            return False
+        self._last[request_id] = number
+        self._last.move_to_end(request_id)
+        if len(self._last) > self.max_streams:
+            self._last.popitem(last=False)
+        return True
+
+    def received(self, request_ids: List[str]) -> Dict[str, int]:
+        """The last message_number received for each of the requests that were seen."""
+        return {request_id: self._last[request_id] for request_id in request_ids if request_id in self._last}
@@ -0,0 +1,25 @@
+# adapters/ws_connect.py
+from typing import Optional
+from urllib.parse import urlparse
+import websockets
+
+# websocket URIs with this scheme connect over a unix domain socket, e.g. unix:///tmp/hop.sock
+UNIX_SCHEME = "unix"
+
+def unix_socket_path(uri: str) -> Optional[str]:
+    """Return the socket path of a unix:// URI, or None for other URIs."""
+    parsed = urlparse(uri)
+    if parsed.scheme != UNIX_SCHEME:
+        return None
+    path = (parsed.netloc + parsed.path) if parsed.netloc else parsed.path
+    if not path:
+        raise ValueError(f"No socket path in {uri}")
+    return path
+
+def connect(uri: str):
+    """Open a websocket connection to a ws://, wss:// or unix:// URI."""
+    path = unix_socket_path(uri)
+    if path is not None:
+        # the websocket handshake still needs a ws:// URI; its host is ignored
+        return websockets.unix_connect(path, uri="ws://localhost/")
+    return websockets.connect(uri)
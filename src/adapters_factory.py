@@ -19,11 +19,23 @@ from adapters.output.websocket_output_adapter import WebSocketOutput
 # Duplex adapter
 from adapters.duplex.websocket_duplex_adapter import WebSocketDuplexAdapter
 
+# Shared connections
+from adapters.connection_manager import get_connection_manager
+
 # Server
 from ws_server import connected_clients
 
-# UI renderer for human output
-from rich_renderer import RichRenderer
+
+def shared_connection(config: Config, uri: str):
+    """
+    Return the shared connection for a websocket URI used by both the input and the
+    output adapter, or None if only one adapter connects to it.
+    """
+    if config.server or config.input_type != "websocket" or config.output_type != "websocket":
+        return None
+    if config.input_ws_uri != config.output_ws_uri or uri != config.input_ws_uri:
+        return None
+    return get_connection_manager().get(uri)
 
 
 def create_input_adapter(config: Config, message_queue: Optional[asyncio.Queue] = None):
@@ -43,9 +55,9 @@ def create_input_adapter(config: Config, message_queue: Optional[asyncio.Queue]
     elif config.input_type == "stdin":
         if not config.cmd:
             raise ValueError("--cmd is required when --input=stdin")
-        return StdInInput(cmd=config.cmd)
+        return StdInInput(cmd=config.cmd, max_line_bytes=config.max_line_bytes)
     else:  # websocket input
-        return WebSocketInput(uri=config.input_ws_uri)
+        return WebSocketInput(uri=config.input_ws_uri, connection=shared_connection(config, config.input_ws_uri))
 
 
 def create_output_adapter(config: Config):
@@ -57,13 +69,19 @@ def create_output_adapter(config: Config):
     """
     if config.server:
         if config.output_type == "websocket" and config.output_ws_uri:
-            return WebSocketOutput(uri=config.output_ws_uri)
+            return WebSocketOutput(uri=config.output_ws_uri, resumable=config.resumable, replay_frames=config.replay_frames,
+                                   send_queue=config.send_queue)
         else:
             return ServerOutputAdapter(connected_clients)
     else:
         if config.output_type == "human":
-            return HumanOutput(renderer=RichRenderer)
+            # imported here so processes without human output never load Rich
+            from rich_renderer import RichRenderer
+            from chat_handler.ui_utils import render
+            # a lagging render thread may skip partial frames, never complete messages
+            return HumanOutput(renderer=lambda data: render(RichRenderer, data, droppable=bool(data.get("partial"))))
         elif config.output_type == "stdout":
-            return StdOutOutput()
+            return StdOutOutput(flush_interval_ms=config.stdout_flush_ms, max_buffer_bytes=config.stdout_buffer_bytes)
         else:
-            return WebSocketDuplexAdapter(uri=config.output_ws_uri)
+            return WebSocketDuplexAdapter(uri=config.output_ws_uri, connection=shared_connection(config, config.output_ws_uri),
+                                          send_queue=config.send_queue)
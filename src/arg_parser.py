@@ -1,6 +1,7 @@
 # arg_parser.py
 import argparse
 from typing import Optional, List
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES
 
 class Config:
     """Configuration object to store command line arguments."""
@@ -10,13 +11,53 @@ class Config:
         self.model = args.model
         self.persona = args.persona
         self.stream = args.stream
+        self.segment_stream = args.segment_stream
         self.input_type = args.input
         self.output_type = args.output
         self.cmd = args.cmd
+        self.workers = args.workers
+        self.max_line_bytes = args.max_line_bytes
+        self.batch = args.batch
+        self.batch_output = args.batch_output
+        self.batch_concurrency = args.batch_concurrency
+        self.stdout_flush_ms = args.stdout_flush_ms
+        self.codec = args.codec
+        self.resumable = args.resumable
+        self.replay_frames = args.replay_frames
+        self.send_queue = args.send_queue
+        self.stdout_buffer_bytes = args.stdout_buffer_bytes
         self.input_ws_uri = args.input_ws_uri
         self.output_ws_uri = args.output_ws_uri
         self.server = args.server
         self.server_ws_uri = args.server_ws_uri
+        self.durable_queue = args.durable_queue
+        self.conversation_store = args.conversation_store
+        self.partial_ttl = args.partial_ttl
+        self.partial_max_bytes = args.partial_max_bytes
+        self.partial_total_bytes = args.partial_total_bytes
+        self.conversation_turns = args.conversation_turns
+        self.visibility_timeout = args.visibility_timeout
+        self.credit_timeout = args.credit_timeout
+        self.multi_persona = args.multi_persona
+        self.relay = args.relay
+        self.headless = args.headless
+        self.flush_tokens = args.flush_tokens
+        self.flush_bytes = args.flush_bytes
+        self.flush_delay_ms = args.flush_delay_ms
+        self.flush_adaptive = args.flush_adaptive
+        self.ui_refresh_rate = args.ui_refresh_rate
+        self.render_thread = args.render_thread
+        self.render_queue_size = args.render_queue_size
+        self.dashboard = args.dashboard
+        self.pipeline = args.pipeline
+        self.pipeline_queue_size = args.pipeline_queue_size
+        self.pipeline_file = args.pipeline_file
+        self.personas_file = args.personas_file
+        self.personas_dirs = args.personas_dir
+        self.personas_reload_interval = args.personas_reload_interval
+        self.trace_file = args.trace_file
+        self.trace_format = args.trace_format
+        self.trace_hop = args.trace_hop
 
 def parse_args(argv: Optional[List[str]] = None) -> Config:
     """
@@ -29,18 +70,58 @@ def parse_args(argv: Optional[List[str]] = None) -> Config:
     parser = argparse.ArgumentParser(description="Chat Handler Client")
     
     # add the arguments
-    parser.add_argument("--mode", choices=["human", "llm", "persona", "forwarder"], default="human")
+    parser.add_argument("--mode", choices=["human", "llm", "persona", "forwarder", "subprocess"], default="human")
     parser.add_argument("--provider", choices=["openai", "ollama"], default="ollama")
     parser.add_argument("--model", default="llama3.3")
     parser.add_argument("--persona", default=None)
     parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--segment-stream", action="store_true")
     parser.add_argument("--input", choices=["human", "stdin", "websocket"], default="human")
     parser.add_argument("--output", choices=["human", "stdout", "websocket"], default="human")
     parser.add_argument("--cmd", nargs='+', default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-line-bytes", type=int, default=DEFAULT_MAX_LINE_BYTES)
+    parser.add_argument("--batch", default=None)
+    parser.add_argument("--batch-output", default=None)
+    parser.add_argument("--batch-concurrency", type=int, default=4)
+    parser.add_argument("--stdout-flush-ms", type=float, default=None)
+    parser.add_argument("--codec", choices=["json", "orjson", "msgpack"], default="json")
+    parser.add_argument("--resumable", action="store_true")
+    parser.add_argument("--replay-frames", type=int, default=1024)
+    parser.add_argument("--send-queue", type=int, default=0)
+    parser.add_argument("--stdout-buffer-bytes", type=int, default=1024 * 1024)
     parser.add_argument("--input-ws-uri", default="ws://localhost:8000/ws")
     parser.add_argument("--output-ws-uri", default="ws://localhost:8000/ws")
     parser.add_argument("--server", action="store_true")
     parser.add_argument("--server-ws-uri", default="ws://localhost:9000")
+    parser.add_argument("--durable-queue", default=None)
+    parser.add_argument("--conversation-store", default=None)
+    parser.add_argument("--partial-ttl", type=float, default=300.0)
+    parser.add_argument("--partial-max-bytes", type=int, default=8 * 1024 * 1024)
+    parser.add_argument("--partial-total-bytes", type=int, default=256 * 1024 * 1024)
+    parser.add_argument("--conversation-turns", type=int, default=50)
+    parser.add_argument("--visibility-timeout", type=float, default=30.0)
+    parser.add_argument("--credit-timeout", type=float, default=30.0)
+    parser.add_argument("--multi-persona", action="store_true")
+    parser.add_argument("--relay", action="store_true")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--flush-tokens", type=int, default=5)
+    parser.add_argument("--flush-bytes", type=int, default=None)
+    parser.add_argument("--flush-delay-ms", type=float, default=None)
+    parser.add_argument("--flush-adaptive", action="store_true")
+    parser.add_argument("--ui-refresh-rate", type=float, default=10.0)
+    parser.add_argument("--render-thread", action="store_true")
+    parser.add_argument("--render-queue-size", type=int, default=256)
+    parser.add_argument("--dashboard", choices=["full", "compact"], default=None)
+    parser.add_argument("--pipeline", nargs='+', default=None)
+    parser.add_argument("--pipeline-queue-size", type=int, default=0)
+    parser.add_argument("--pipeline-file", default=None)
+    parser.add_argument("--personas-file", default=None)
+    parser.add_argument("--personas-dir", action="append", default=[])
+    parser.add_argument("--personas-reload-interval", type=float, default=2.0)
+    parser.add_argument("--trace-file", default=None)
+    parser.add_argument("--trace-format", choices=["jsonl", "otlp"], default="jsonl")
+    parser.add_argument("--trace-hop", default=None)
 
     # parse arguments
     args = parser.parse_args(argv)
@@ -0,0 +1,192 @@
+# batch/batch_runner.py
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Set, Tuple
+from adapters.ndjson import decode_line, encode_line
+
+log = logging.getLogger(__name__)
+
+def default_output_path(input_path: str) -> str:
+    """Results of requests.jsonl go to requests.results.jsonl next to it."""
+    root, _ = os.path.splitext(input_path)
+    return f"{root}.results.jsonl"
+
+def completed_request_ids(output_path: str) -> Set[str]:
+    """
+    The request_ids that already have a successful result in the output file.
+    Failed requests are run again, and a torn last line (from a killed run) is ignored.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "rb") as f:
+        for line in f:
+            try:
+                result = decode_line(line)
+            except ValueError:
+                continue
+            if result and result.get("status") == "ok" and result.get("request_id") is not None:
+                completed.add(str(result["request_id"]))
+    return completed
+
+def read_requests(input_path: str) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    """
+    Yield (request_id, request, error) for each line of a JSONL request file.
+    Lines without a request_id are named after their line number, which stays stable
+    as long as the file isn't edited between runs.
+    """
+    with open(input_path, "rb") as f:
+        for number, line in enumerate(f, start=1):
+            try:
+                request = decode_line(line)
+            except ValueError as e:
+                yield f"line-{number}", None, f"Invalid request line: {e}"
+                continue
+            if request is None:
+                continue
+            request_id = str(request.get("request_id", f"line-{number}"))
+            if not isinstance(request.get("message"), str):
+                yield request_id, None, "Request has no message."
+                continue
+            yield request_id, request, None
+
+@dataclass
+class BatchSummary:
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+class BatchRunner:
+    """
+    Answers every request of a JSONL file with at most `concurrency` in flight.
+
+    Each input line is a JSON object with a message and optionally a request_id and a
+    persona. One result line is appended to the output per request, in completion
+    order: its text, status, timings and the number of streamed chunks. The output
+    doubles as the checkpoint, so a restarted run skips requests that already
+    succeeded. Each request is answered on its own, without a shared conversation.
+
+    handler_for(persona) returns the response handler for a request; handlers with
+    blocking methods are run on worker threads so they don't hold up the others.
+    """
+
+    def __init__(self, handler_for: Callable[[Optional[str]], object], input_path: str,
+                 output_path: Optional[str] = None, concurrency: int = 4):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.handler_for = handler_for
+        self.input_path = input_path
+        self.output_path = output_path or default_output_path(input_path)
+        self.concurrency = concurrency
+        self.summary = BatchSummary()
+        self._output = None
+
+    async def run(self) -> BatchSummary:
+        completed = completed_request_ids(self.output_path)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        self._open_output()
+        try:
+            workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+            try:
+                await self._feed(queue, completed)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            self._output.close()
+            self._output = None
+        return self.summary
+
+    async def _feed(self, queue: asyncio.Queue, completed: Set[str]):
+        seen = set()
+        for request_id, request, error in read_requests(self.input_path):
+            if request_id in completed or request_id in seen:
+                self.summary.skipped += 1
+                continue
+            seen.add(request_id)
+            if error is not None:
+                self._write_result({"request_id": request_id, "status": "error", "error": error})
+                self.summary.failed += 1
+                continue
+            await queue.put((request_id, request))
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            result = await self.answer(*item)
+            self._write_result(result)
+            if result["status"] == "ok":
+                self.summary.succeeded += 1
+            else:
+                self.summary.failed += 1
+
+    async def answer(self, request_id: str, request: dict) -> dict:
+        """Answer one request, returning its result line."""
+        persona = request.get("persona")
+        result = {"request_id": request_id, "persona": persona}
+        started_at = time.time()
+        started = time.monotonic()
+        try:
+            handler = self.handler_for(persona)
+            conversation = [{"role": "questioner", "content": request["message"]}]
+            text, chunks, first_token = await self._respond(handler, request["message"], conversation)
+        except Exception as e:
+            log.debug(f"Batch request {request_id} failed: {e}")
+            result.update(status="error", error=str(e) or e.__class__.__name__)
+            result.update(started_at=started_at, duration_ms=round((time.monotonic() - started) * 1000.0, 3))
+            return result
+
+        result.update(status="ok", response=text, chunks=chunks, started_at=started_at)
+        result["time_to_first_token_ms"] = round((first_token - started) * 1000.0, 3) if first_token is not None else None
+        result["duration_ms"] = round((time.monotonic() - started) * 1000.0, 3)
+        return result
+
+    async def _respond(self, handler, question: str, conversation) -> Tuple[str, Optional[int], Optional[float]]:
+        """Return the answer, its number of streamed chunks and when the first one arrived (None if not streamed)."""
+        if hasattr(handler, "get_response_stream"):
+            stream = handler.get_response_stream(question, conversation)
+            if hasattr(stream, "__aiter__"):
+                chunks, first_token = [], None
+                async for token in stream:
+                    if first_token is None:
+                        first_token = time.monotonic()
+                    chunks.append(token)
+                return "".join(chunks), len(chunks), first_token
+            return await asyncio.to_thread(_drain_stream, stream)
+
+        if asyncio.iscoroutinefunction(handler.get_response):
+            answer = await handler.get_response(question, conversation)
+        else:
+            answer = await asyncio.to_thread(handler.get_response, question, conversation)
+        return answer, None, None
+
+    def _open_output(self):
+        self._output = open(self.output_path, "ab")
+        # a run killed mid-write leaves a torn line; start ours on a fresh one
+        if self._output.tell() > 0:
+            with open(self.output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._output.write(b"\n")
+
+    def _write_result(self, result: dict):
+        # each line is flushed so a killed run loses at most the requests in flight
+        self._output.write(encode_line(result))
+        self._output.flush()
+
+def _drain_stream(stream) -> Tuple[str, int, Optional[float]]:
+    chunks, first_token = [], None
+    for token in stream:
+        if first_token is None:
+            first_token = time.monotonic()
+        chunks.append(token)
+    return "".join(chunks), len(chunks), first_token
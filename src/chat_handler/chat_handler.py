@@ -1,14 +1,21 @@
 import asyncio
 import logging
+from collections import OrderedDict
 from websockets.exceptions import ConnectionClosedError
 from .conversation_manager import ConversationManager
+from .conversation_store import ConversationStore
+from .reassembly_buffer import ReassemblyBuffer
 from .server_input_handler import handle_server_input
 from .user_input_handler import handle_user_input
-from .server_messages_handler import handle_server_messages
 from .adapters import start_adapters, stop_adapters
-from .ui_utils import print_environment_info, print_prompt, console, print_panel
+from .ui_utils import print_environment_info, print_prompt, get_console, print_panel
+from .flush_policy import FlushPolicy
+from .stream_dashboard import DashboardStreamRenderer, StreamDashboard
+from .ui_renderer import UIRenderer
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES
+from transport.adapter_conversation_io import AdapterConversationIO
 from response_handlers.response_handler_factory import create_response_handler
-from rich.panel import Panel
+from response_handlers.handler_pool import ResponseHandlerPool
 
 log = logging.getLogger(__name__)
 
@@ -21,7 +28,18 @@ class ChatHandler:
                  model: str = "llama3.3", 
                  persona: str = None,
                  stream: bool = False,
-                 server: bool = False):
+                 server: bool = False,
+                 multi_persona: bool = False,
+                 segment_stream: bool = False,
+                 flush_policy: FlushPolicy = None,
+                 dashboard: StreamDashboard = None,
+                 cmd: list = None,
+                 workers: int = 1,
+                 max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+                 conversation_store: ConversationStore = None,
+                 conversation_turns: int = 50,
+                 max_conversations: int = 1024,
+                 reassembly: ReassemblyBuffer = None):
 
         self.input_adapter = input_adapter
         self.output_adapter = output_adapter
@@ -31,12 +49,40 @@ class ChatHandler:
         self.persona = persona
         self.stream = stream
         self.server = server
+        self.multi_persona = multi_persona
+        self.segment_stream = segment_stream
 
-        # Conversation manager for tracking conversation state
-        self.conversation_manager = ConversationManager()
+        # when streamed tokens are sent downstream; its latency estimate follows our output adapter
+        self.flush_policy = flush_policy or FlushPolicy()
+
+        # one live view of all concurrent requests instead of a panel per request (server mode)
+        self.dashboard = dashboard
+
+        # streamed prompts being received (server mode), bounded so abandoned streams are dropped
+        self.reassembly = reassembly if reassembly is not None else ReassemblyBuffer()
+        self.reassembly.on_evict = self.abandon_stream
+
+        # Conversation manager for tracking conversation state, kept in the store (if any) under the persona or mode
+        self.conversation_store = conversation_store
+        self.conversation_turns = conversation_turns
+        self.max_conversations = max_conversations
+        self.conversation_manager = self.create_conversation(persona or mode)
 
         # Create the appropriate responder handler and mode description
-        self.responder_handler, local_mode_desc = create_response_handler(mode, provider, model, persona)
+        if self.multi_persona:
+            # personas are selected per message, handlers are pooled and share model clients
+            self.handler_pool = ResponseHandlerPool(mode, provider, model, default_persona=persona)
+            self.persona_conversations = OrderedDict()
+            self.responder_handler = self.handler_pool.get(persona)[0] if persona else None
+            local_mode_desc = f"Multi-persona ({provider}/{model})"
+        else:
+            self.handler_pool = None
+            self.responder_handler, local_mode_desc = create_response_handler(
+                mode, provider, model, persona, cmd=cmd, workers=workers, max_line_bytes=max_line_bytes
+            )
+
+        # a server answers up to one request per subprocess worker at once, one at a time otherwise
+        self.concurrency = max(1, workers) if mode == "subprocess" else 1
 
         # Determine local and remote roles
         if self.server:
@@ -46,6 +92,58 @@ class ChatHandler:
             self.local_name = f"You ({local_mode_desc}, Client)"
             self.remote_name = "Assistant (Server)"
 
+    def responder_for(self, persona: str = None):
+        """
+        Return the (responder_handler, conversation_manager) pair that should handle a message
+        for the given persona. Outside multi-persona mode the persona is ignored.
+        Raises ValueError if the persona is unknown.
+        """
+        if not self.multi_persona:
+            return self.responder_handler, self.conversation_manager
+
+        persona = persona or self.persona
+        if not persona:
+            raise ValueError("Message has no persona and the server has no default persona.")
+
+        handler, _ = self.handler_pool.get(persona)
+        if persona not in self.persona_conversations:
+            self.persona_conversations[persona] = self.create_conversation(persona)
+            # stored conversations can be dropped from memory and loaded again when next used
+            if self.conversation_store is not None and len(self.persona_conversations) > self.max_conversations:
+                self.persona_conversations.popitem(last=False)
+        self.persona_conversations.move_to_end(persona)
+        return handler, self.persona_conversations[persona]
+
+    def create_conversation(self, conversation_id: str) -> ConversationManager:
+        """Return a conversation manager, backed by the conversation store if there is one."""
+        if self.conversation_store is None:
+            return ConversationManager()
+        return ConversationManager(self.conversation_store, conversation_id=conversation_id, max_turns=self.conversation_turns)
+
+    def abandon_stream(self, request_id: str, msg_state: dict, reason: str):
+        """Clean up after a streamed prompt that was evicted before its final frame."""
+        if msg_state.get("segmented"):
+            msg_state["segmented"].cancel()
+        renderer = msg_state.get("ui_renderer")
+        if renderer is not None and renderer.is_streaming:
+            renderer.end_streaming()
+        if self.dashboard is not None:
+            self.dashboard.stream_finished(request_id)
+        if hasattr(self.input_adapter, "drop"):
+            self.input_adapter.drop(request_id)
+
+    def create_renderer(self, request_id: str):
+        """Return the renderer that displays one incoming request."""
+        if self.dashboard is not None:
+            return DashboardStreamRenderer(self.dashboard, request_id)
+        return UIRenderer()
+
+    def token_observer(self, request_id: str):
+        """Return a callback for a request's streamed answer tokens, or None without a dashboard."""
+        if self.dashboard is None:
+            return None
+        return self.dashboard.observer(request_id)
+
     async def run(self):
         # Print environment info at start
         print_environment_info(
@@ -62,28 +160,30 @@ class ChatHandler:
 
         # Start adapters if they have start methods
         await start_adapters(self.input_adapter, self.output_adapter)
+        if self.dashboard is not None:
+            self.dashboard.start()
 
         # If human client and not server, print initial prompt
         if self.mode == "human" and not self.server:
-            console.print()
+            get_console().print()
             await print_prompt(server_mode=False)
 
         try:
             if self.server:
-                # In server mode, handle input from server_input_handler
-                await handle_server_input(self)
+                # In server mode, handle input from server_input_handler;
+                # abandoned streams are evicted on time even while no frames arrive
+                expiry = asyncio.create_task(self.reassembly.expire_periodically())
+                try:
+                    await handle_server_input(self)
+                finally:
+                    expiry.cancel()
             else:
-                # In client mode, handle user input and possibly server messages
-                user_input_task = asyncio.create_task(handle_user_input(self))
-                tasks = [user_input_task]
-
-                # If output_adapter supports reading messages, handle server messages too
+                # In client mode, handle user input; if output_adapter can read messages,
+                # answers are streamed back through it one request at a time
+                conversation = None
                 if hasattr(self.output_adapter, "read_message"):
-                    server_response_task = asyncio.create_task(handle_server_messages(self))
-                    tasks.append(server_response_task)
-
-                # Wait for tasks to complete
-                await asyncio.gather(*tasks)
+                    conversation = AdapterConversationIO(self.output_adapter)
+                await handle_user_input(self, conversation)
 
         except (ConnectionClosedError, EOFError) as e:
             log.debug(f"Connection ended abruptly: {e}")
@@ -91,5 +191,10 @@ class ChatHandler:
             # Catch any unexpected exceptions to help with debugging
             log.error(f"An unexpected error occurred in run(): {e}", exc_info=True)
         finally:
+            if self.dashboard is not None:
+                self.dashboard.stop()
+            # responders backed by worker processes shut them down
+            if hasattr(self.responder_handler, "close"):
+                await self.responder_handler.close()
             await stop_adapters(self.input_adapter, self.output_adapter)
             print_panel("Chat", "The conversation has concluded. Thank you.", "system")
@@ -1,17 +1,61 @@
 # chat_handler/conversation_manager.py
+import asyncio
+from typing import Optional
+from .conversation_store import ConversationStore
+
 class ConversationManager:
     """
     Manages the state of the conversation between the user and the responder.
     It stores a list of messages, each represented as a dictionary with 'role' and 'content'.
+
+    With a store, every message is also appended to it, only the last max_turns messages
+    are kept in memory (and given to the responder), and those are loaded from the store
+    the first time the conversation is used, e.g. after a restart. Async callers should
+    await load() first, so the store is read off the event loop.
     """
 
-    def __init__(self):
+    def __init__(self, store: Optional[ConversationStore] = None, conversation_id: str = "default", max_turns: int = 50):
+        self.store = store
+        self.conversation_id = conversation_id
+        self.max_turns = max_turns
         self.conversation = []
+        self._loaded = store is None
+        self._loading: Optional[asyncio.Future] = None
 
     def add_message(self, role: str, content: str):
         """Add a new message to the conversation."""
+        self._load()
         self.conversation.append({"role": role.lower(), "content": content})
+        if self.store is not None:
+            self.store.append(self.conversation_id, role.lower(), content)
+            if len(self.conversation) > self.max_turns:
+                del self.conversation[:len(self.conversation) - self.max_turns]
 
     def get_conversation(self):
-        """Return the entire conversation as a list of message dictionaries."""
+        """Return the conversation (with a store, its last max_turns messages) as a list of message dictionaries."""
+        self._load()
         return self.conversation
+
+    async def load(self):
+        """Load the stored messages, if not done yet, on a worker thread."""
+        if self._loaded:
+            return
+        # concurrent requests share one read
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(
+                asyncio.to_thread(self.store.recent, self.conversation_id, self.max_turns)
+            )
+        try:
+            conversation = await asyncio.shield(self._loading)
+        except BaseException:
+            if self._loading.done():
+                self._loading = None
+            raise
+        if not self._loaded:
+            self.conversation = conversation
+            self._loaded = True
+
+    def _load(self):
+        if not self._loaded:
+            self.conversation = self.store.recent(self.conversation_id, self.max_turns)
+            self._loaded = True
@@ -0,0 +1,190 @@
+# chat_handler/conversation_store.py
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+class ConversationStore:
+    """
+    Where ConversationManager keeps history beyond its in-memory window. Turns are
+    appended as they happen and the most recent ones are read back when a conversation
+    is first used, so history survives a restart without being held in memory.
+    """
+
+    def append(self, conversation_id: str, role: str, content: str):
+        raise NotImplementedError("append must be implemented.")
+
+    def recent(self, conversation_id: str, limit: int) -> List[Dict[str, str]]:
+        """The last `limit` turns of the conversation, oldest first."""
+        raise NotImplementedError("recent must be implemented.")
+
+    def history(self, conversation_id: str) -> List[Dict[str, str]]:
+        """Every turn of the conversation, oldest first."""
+        raise NotImplementedError("history must be implemented.")
+
+    def close(self):
+        pass
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    Conversations in a local SQLite file.
+
+    Each turn is a row. Once a conversation has compact_after turns beyond the newest
+    keep_turns, those older turns are folded into one zlib-compressed archive row, so
+    recent turns stay cheap to read and old ones take little space.
+
+    append() only queues the turn: a writer thread commits the queued turns in one
+    transaction and does the compaction, so a slow disk never holds up the event loop
+    that is streaming answers. Reads wait for the queued turns to be written first.
+    """
+
+    def __init__(self, path: str, keep_turns: int = 50, compact_after: int = 200):
+        self.path = path
+        self.keep_turns = keep_turns
+        self.compact_after = compact_after
+        self.compactions = 0
+        # used by the writer thread and by readers, one at a time
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                conversation_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (conversation_id, seq)
+            );
+            CREATE TABLE IF NOT EXISTS archives (
+                conversation_id TEXT NOT NULL,
+                last_seq INTEGER NOT NULL,
+                turns BLOB NOT NULL,
+                PRIMARY KEY (conversation_id, last_seq)
+            );
+        """)
+        # turns since the last compaction, per conversation, counted from the file on first use
+        self._uncompacted: Dict[str, int] = {}
+
+        self._writes: "queue.Queue[Optional[Tuple[str, str, str]]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="conversation-store", daemon=True)
+        self._writer.start()
+
+    def append(self, conversation_id: str, role: str, content: str):
+        if not self._writer.is_alive():
+            raise EOFError(f"Conversation store {self.path} is closed.")
+        self._writes.put((conversation_id, role, content))
+
+    def flush(self):
+        """Wait until every appended turn is written."""
+        self._writes.join()
+
+    def recent(self, conversation_id: str, limit: int) -> List[Dict[str, str]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM turns WHERE conversation_id = ? ORDER BY seq DESC LIMIT ?",
+                (conversation_id, limit)
+            ).fetchall()
+            turns = [{"role": role, "content": content} for role, content in reversed(rows)]
+            if len(turns) < limit:
+                # the window reaches back into compacted history
+                archived = self._archived(conversation_id)
+                turns = archived[max(0, len(archived) - (limit - len(turns))):] + turns
+        return turns
+
+    def history(self, conversation_id: str) -> List[Dict[str, str]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM turns WHERE conversation_id = ? ORDER BY seq", (conversation_id,)
+            ).fetchall()
+            return self._archived(conversation_id) + [{"role": role, "content": content} for role, content in rows]
+
+    def _archived(self, conversation_id: str) -> List[Dict[str, str]]:
+        turns = []
+        for (blob,) in self._conn.execute(
+            "SELECT turns FROM archives WHERE conversation_id = ? ORDER BY last_seq", (conversation_id,)
+        ):
+            turns.extend(json.loads(zlib.decompress(blob)))
+        return turns
+
+    def _write_loop(self):
+        while True:
+            batch = [self._writes.get()]
+            # whatever was appended meanwhile shares the transaction
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+
+            turns = [turn for turn in batch if turn is not None]
+            try:
+                if turns:
+                    with self._lock:
+                        self._write(turns)
+            except sqlite3.Error as e:
+                log.error(f"Failed to write {len(turns)} turns to {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+            if len(turns) < len(batch):
+                return
+
+    def _write(self, turns: List[Tuple[str, str, str]]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO turns (conversation_id, seq, role, content) "
+                "VALUES (?, COALESCE((SELECT MAX(seq) FROM turns WHERE conversation_id = ?), "
+                "(SELECT MAX(last_seq) FROM archives WHERE conversation_id = ?), 0) + 1, ?, ?)",
+                [(conversation_id, conversation_id, conversation_id, role, content) for conversation_id, role, content in turns]
+            )
+
+        added: Dict[str, int] = {}
+        for conversation_id, _, _ in turns:
+            added[conversation_id] = added.get(conversation_id, 0) + 1
+        for conversation_id, count in added.items():
+            if conversation_id in self._uncompacted:
+                count += self._uncompacted[conversation_id]
+            else:
+                count = self._conn.execute("SELECT COUNT(*) FROM turns WHERE conversation_id = ?", (conversation_id,)).fetchone()[0]
+            self._uncompacted[conversation_id] = count
+            if count >= self.keep_turns + self.compact_after:
+                self._compact(conversation_id)
+
+    def compact(self, conversation_id: str):
+        """Fold every turn but the newest keep_turns into a compressed archive row."""
+        self.flush()
+        with self._lock:
+            self._compact(conversation_id)
+
+    def _compact(self, conversation_id: str):
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT seq, role, content FROM turns WHERE conversation_id = ? ORDER BY seq", (conversation_id,)
+            ).fetchall()
+            old = rows[:max(0, len(rows) - self.keep_turns)]
+            if not old:
+                return
+            last_seq = old[-1][0]
+            blob = zlib.compress(json.dumps([{"role": role, "content": content} for _, role, content in old]).encode("utf-8"))
+            self._conn.execute("INSERT INTO archives (conversation_id, last_seq, turns) VALUES (?, ?, ?)",
+                               (conversation_id, last_seq, blob))
+            self._conn.execute("DELETE FROM turns WHERE conversation_id = ? AND seq <= ?", (conversation_id, last_seq))
+        self._uncompacted[conversation_id] = len(rows) - len(old)
+        self.compactions += 1
+        log.debug(f"Compacted {len(old)} turns of conversation '{conversation_id}' in {self.path}.")
+
+    def close(self):
+        """Write the queued turns and close the file."""
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+        self._conn.close()
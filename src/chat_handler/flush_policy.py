@@ -0,0 +1,143 @@
+# chat_handler/flush_policy.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, List, Optional
+
+@dataclass
+class FlushPolicy:
+    """
+    When buffered tokens are sent downstream as one partial frame.
+
+    A frame is flushed once max_tokens tokens are buffered, once they reach max_bytes,
+    when a token contains a newline (flush_on_newline), or once the oldest buffered token
+    has waited max_delay_ms, whichever comes first. None disables a limit.
+
+    With adaptive, the token limit is held back (Nagle-style) until about one measured
+    send latency has passed since the previous frame, so a slow link gets fewer, larger
+    frames while a fast one still gets tokens promptly. max_bytes and max_delay_ms are
+    never held back. The latency estimate is kept on the policy, so use one policy per
+    output connection.
+    """
+    max_tokens: Optional[int] = 5
+    max_bytes: Optional[int] = None
+    max_delay_ms: Optional[float] = None
+    flush_on_newline: bool = True
+    adaptive: bool = False
+
+    # smoothed send latency in seconds, measured across responses
+    send_latency: float = 0.0
+    latency_smoothing: float = 0.2
+
+    def record_send(self, seconds: float):
+        """Fold one measured send duration into the latency estimate."""
+        if self.send_latency == 0.0:
+            self.send_latency = seconds
+        else:
+            self.send_latency += self.latency_smoothing * (seconds - self.send_latency)
+
+
+class TokenBatcher:
+    """Buffers one response's tokens and decides, per its FlushPolicy, when to flush them."""
+
+    def __init__(self, policy: FlushPolicy):
+        self.policy = policy
+        self._tokens: List[str] = []
+        self._bytes = 0
+        self._newline = False
+        self._first_buffered: Optional[float] = None
+        self._last_flush = 0.0
+
+    def add(self, token: str, now: Optional[float] = None):
+        if not self._tokens:
+            self._first_buffered = now if now is not None else time.monotonic()
+        self._tokens.append(token)
+        self._bytes += len(token.encode("utf-8"))
+        self._newline = self._newline or "\n" in token
+
+    def should_flush(self, now: Optional[float] = None) -> bool:
+        if not self._tokens:
+            return False
+        policy = self.policy
+        now = now if now is not None else time.monotonic()
+
+        if policy.max_bytes is not None and self._bytes >= policy.max_bytes:
+            return True
+        if policy.max_delay_ms is not None and now - self._first_buffered >= policy.max_delay_ms / 1000.0:
+            return True
+        if (policy.flush_on_newline and self._newline) or (policy.max_tokens is not None and len(self._tokens) >= policy.max_tokens):
+            return not policy.adaptive or now - self._last_flush >= policy.send_latency
+        return False
+
+    def time_to_flush(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until the buffered tokens are due without further tokens, or None if never."""
+        if not self._tokens:
+            return None
+        policy = self.policy
+        now = now if now is not None else time.monotonic()
+
+        deadlines = []
+        if policy.max_delay_ms is not None:
+            deadlines.append(self._first_buffered + policy.max_delay_ms / 1000.0)
+        if policy.adaptive and ((policy.flush_on_newline and self._newline) or (policy.max_tokens is not None and len(self._tokens) >= policy.max_tokens)):
+            # tokens held back only until the link has had time to drain
+            deadlines.append(self._last_flush + policy.send_latency)
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+    def take(self, now: Optional[float] = None) -> str:
+        flushed = "".join(self._tokens)
+        self._tokens.clear()
+        self._bytes = 0
+        self._newline = False
+        self._first_buffered = None
+        self._last_flush = now if now is not None else time.monotonic()
+        return flushed
+
+    def __bool__(self) -> bool:
+        return bool(self._tokens)
+
+
+async def batch_tokens(tokens: AsyncIterator[str], batcher: TokenBatcher,
+                       on_token: Optional[Callable[[str], None]] = None) -> AsyncIterator[str]:
+    """
+    Yield the text of each frame to send, as the batcher's policy flushes it.
+    on_token sees every token as it arrives (e.g. for a live display), independent of flushing.
+    When a flush is due on a timer (max_delay_ms or an adaptive hold), waiting for the next
+    token is bounded so buffered tokens go out on time even if the model stalls.
+    """
+    iterator = tokens.__aiter__()
+    pending = None
+    try:
+        while True:
+            timeout = batcher.time_to_flush()
+            if timeout is None and pending is None:
+                # nothing is due on a timer, so just wait for the next token
+                try:
+                    token = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            else:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if not done:
+                    yield batcher.take()
+                    continue
+                try:
+                    token = pending.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    pending = None
+
+            if on_token is not None:
+                on_token(token)
+            batcher.add(token)
+            if batcher.should_flush():
+                yield batcher.take()
+
+        if batcher:
+            yield batcher.take()
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,123 @@
+# chat_handler/reassembly_buffer.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+class ReassemblyBuffer:
+    """
+    The state of the streamed prompts a server is receiving, keyed by request_id, with
+    their chunks, so that streams that are never finished can't grow it without bound.
+
+    A stream is evicted when nothing arrived for it in ttl seconds (checked as frames arrive,
+    and by expire_periodically() while none do), when its chunks exceed
+    max_stream_bytes, or, least recently active first, when all chunks together exceed
+    max_total_bytes or there are more than max_streams streams. on_evict(request_id, state,
+    reason) is called for each evicted stream so its display can be closed. The rest of an
+    evicted stream's frames, up to its final frame, are ignored.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_stream_bytes: int = 8 * 1024 * 1024,
+                 max_total_bytes: int = 256 * 1024 * 1024, max_streams: int = 10000,
+                 on_evict: Optional[Callable[[str, dict, str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_stream_bytes = max_stream_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_streams = max_streams
+        self.on_evict = on_evict
+        self.clock = clock
+        self.total_bytes = 0
+        # evictions by reason: "ttl", "stream_bytes", "total_bytes" and "streams"
+        self.evicted: Dict[str, int] = {"ttl": 0, "stream_bytes": 0, "total_bytes": 0, "streams": 0}
+
+        # least recently active first
+        self._streams: "OrderedDict[str, dict]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._dropped: "OrderedDict[str, None]" = OrderedDict()
+
+    def get(self, request_id: str) -> Optional[dict]:
+        return self._streams.get(request_id)
+
+    def open(self, request_id: str, state: dict) -> dict:
+        """Start tracking a stream; state must have a "chunks" list."""
+        self._streams[request_id] = state
+        self._touched[request_id] = self.clock()
+        self._sizes[request_id] = 0
+        while len(self._streams) > self.max_streams:
+            self._evict(next(iter(self._streams)), "streams")
+        return state
+
+    def add(self, request_id: str, text: str) -> bool:
+        """Append a chunk to a stream. False if that evicted the stream."""
+        state = self._streams[request_id]
+        size = len(text.encode("utf-8"))
+        state["chunks"].append(text)
+        self._sizes[request_id] += size
+        self.total_bytes += size
+        self._touched[request_id] = self.clock()
+        self._streams.move_to_end(request_id)
+
+        if self._sizes[request_id] > self.max_stream_bytes:
+            self._evict(request_id, "stream_bytes")
+            return False
+        while self.total_bytes > self.max_total_bytes:
+            self._evict(next(iter(self._streams)), "total_bytes")
+        return request_id in self._streams
+
+    def pop(self, request_id: str) -> Optional[dict]:
+        """Stop tracking a stream that was handled."""
+        state = self._streams.pop(request_id, None)
+        self._touched.pop(request_id, None)
+        self.total_bytes -= self._sizes.pop(request_id, 0)
+        return state
+
+    def expire(self) -> int:
+        """Evict the streams nothing arrived for within the ttl; return how many."""
+        deadline = self.clock() - self.ttl
+        expired = 0
+        # the least recently active stream is first, so stop at the first live one
+        while self._streams:
+            request_id = next(iter(self._streams))
+            if self._touched[request_id] > deadline:
+                break
+            self._evict(request_id, "ttl")
+            expired += 1
+        return expired
+
+    async def expire_periodically(self, interval: Optional[float] = None):
+        """Run expire() every interval seconds (a quarter of the ttl by default), until cancelled."""
+        interval = interval or self.ttl / 4
+        while True:
+            await asyncio.sleep(interval)
+            self.expire()
+
+    def is_dropped(self, request_id: str) -> bool:
+        """Whether the request's stream was evicted (until its final frame is seen)."""
+        return request_id in self._dropped
+
+    def forget_dropped(self, request_id: str):
+        self._dropped.pop(request_id, None)
+
+    def _evict(self, request_id: str, reason: str):
+        state = self.pop(request_id)
+        self.evicted[reason] += 1
+        self._dropped[request_id] = None
+        while len(self._dropped) > self.max_streams:
+            self._dropped.popitem(last=False)
+        log.warning(f"Dropped partial message {request_id} ({reason}); evictions so far: {self.evicted}")
+        if self.on_evict is not None and state is not None:
+            try:
+                self.on_evict(request_id, state, reason)
+            except Exception as e:
+                log.debug(f"Failed to clean up evicted stream {request_id}: {e}")
+
+    def __contains__(self, request_id) -> bool:
+        return request_id in self._streams
+
+    def __len__(self) -> int:
+        return len(self._streams)
@@ -0,0 +1,23 @@
+# chat_handler/relay_handler.py
+import logging
+
+log = logging.getLogger(__name__)
+
+async def handle_relay(input_adapter, output_adapter):
+    """
+    Forwards frames from the input adapter to the output adapter as they arrive.
+    Frames are never decoded, re-batched or rendered, so a forwarding hop adds
+    little more than a queue hand-off and a socket write per frame.
+    Runs until the input adapter ends.
+    """
+    while True:
+        try:
+            frame = await input_adapter.read_raw()
+        except EOFError as e:
+            log.debug(f"Relay input ended: {e}")
+            break
+
+        try:
+            await output_adapter.write_raw(frame)
+        except EOFError as e:
+            log.debug(f"Failed to relay frame: {e}")
@@ -0,0 +1,112 @@
+# chat_handler/render_thread.py
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+class RenderThread:
+    """
+    Runs terminal rendering on its own thread, so a slow terminal or log pipe never blocks
+    the event loop that delivers tokens downstream.
+
+    Render calls are queued without blocking. Text appended to the same target (a live
+    panel) while the thread is busy is coalesced into one call, so a lagging display skips
+    intermediate frames rather than falling behind. If more than max_pending calls are
+    still queued, the oldest droppable ones (partial frames) are discarded and counted in
+    `dropped`; when only calls that must be drawn (complete messages) are left, submit waits
+    until the thread takes them, so the queue stays bounded without losing any.
+    """
+
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._ops: deque = deque()
+        # target -> queued append op that later text for that target can join
+        self._appends = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._reported_drops = 0
+        self._thread = threading.Thread(target=self._run, name="render", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, target: Any = None, droppable: bool = False):
+        """Queue a render call. Calls for a target stay ordered with its appends."""
+        with self._cond:
+            if target is not None:
+                # text appended after this call must not jump ahead of it
+                self._appends.pop(target, None)
+            self._ops.append((fn, args, droppable))
+            self._trim()
+            self._cond.notify_all()
+            while len(self._ops) > self.max_pending and self._can_wait():
+                self._cond.wait()
+
+    def append(self, target: Any, fn: Callable[[str], None], text: str):
+        """Queue fn(text), joining text already queued for the same target."""
+        with self._cond:
+            pending = self._appends.get(target)
+            if pending is not None:
+                pending.append(text)
+                return
+            pending = [text]
+            self._appends[target] = pending
+            self._ops.append((self._append, (fn, pending), False))
+            self._trim()
+            self._cond.notify_all()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Render whatever is still queued, then end the thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @staticmethod
+    def _append(fn: Callable[[str], None], pending: list):
+        fn("".join(pending))
+
+    def _can_wait(self) -> bool:
+        # nothing would ever take the queue from the render thread itself or once it has ended
+        return (self._thread.is_alive() and not self._stopped
+                and threading.current_thread() is not self._thread)
+
+    def _trim(self):
+        excess = len(self._ops) - self.max_pending
+        if excess <= 0:
+            return
+        kept = deque()
+        for op in self._ops:
+            if excess > 0 and op[2]:
+                excess -= 1
+                self.dropped += 1
+            else:
+                kept.append(op)
+        self._ops = kept
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ops and not self._stopped:
+                    self._cond.wait()
+                if not self._ops:
+                    return
+                batch, self._ops = self._ops, deque()
+                self._appends.clear()
+                dropped = self.dropped
+                # submitters waiting for room can go on
+                self._cond.notify_all()
+
+            if dropped > self._reported_drops:
+                log.debug(f"Render thread fell behind, {dropped - self._reported_drops} messages were not shown.")
+                self._reported_drops = dropped
+
+            for fn, args, _ in batch:
+                try:
+                    fn(*args)
+                except Exception as e:
+                    log.debug(f"Render call failed: {e}")
@@ -1,10 +1,12 @@
 # response_utils.py
 import asyncio
+import contextlib
 import logging
-from rich.panel import Panel
-from rich.text import Text
-from rich.live import Live
-from typing import Optional
+import time
+from typing import Callable, Optional
+from tracing.tracer import get_tracer
+from .flush_policy import FlushPolicy, TokenBatcher, batch_tokens
+from .ui_renderer import StreamingPanel
 
 log = logging.getLogger(__name__)
 
@@ -25,6 +27,64 @@ async def safe_get_response(get_response_func, question: str):
         log.debug(f"Failed to get response: {e}")
         return ""
 
+def traced_message(msg: dict, trace: Optional[dict]) -> dict:
+    """Attach this hop's trace context to an outgoing frame, stamped with the send time."""
+    if trace:
+        msg["trace"] = {
+            "trace_id": trace["trace_id"],
+            "parent_span_id": trace.get("parent_span_id"),
+            "sent_at": time.time()
+        }
+    return msg
+
+async def send_final_message(output_adapter, request_id: Optional[str] = None, trace: Optional[dict] = None):
+    """Send the non-partial frame that tells downstream a streamed answer is complete."""
+    final_msg = {"role": "Responder", "partial": False}
+    if request_id:
+        final_msg["request_id"] = str(request_id)
+
+    try:
+        await output_adapter.write_message(traced_message(final_msg, trace))
+    except Exception as e:
+        log.debug(f"Failed to send final partial=False message: {e}")
+
+class SendTimer:
+    """Accumulates how long one response spent sending frames downstream."""
+
+    def __init__(self):
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self.busy = 0.0
+        self.frames = 0
+
+    async def timed(self, send):
+        """Await a send coroutine, adding its duration to the totals."""
+        start = time.time()
+        try:
+            return await send
+        finally:
+            end = time.time()
+            if self.first_start is None:
+                self.first_start = start
+            self.last_end = end
+            self.busy += end - start
+            self.frames += 1
+
+def record_response_spans(trace: Optional[dict], started: float, first_token_at: Optional[float],
+                          finished: float, sends: Optional[SendTimer] = None):
+    """Record the time to first token, generation and send spans of one response under the hop's span."""
+    tracer = get_tracer()
+    if not (tracer.enabled and trace):
+        return
+
+    trace_id, parent = trace["trace_id"], trace.get("parent_span_id")
+    if first_token_at is not None:
+        tracer.record("time_to_first_token", trace_id, started, first_token_at, parent_span_id=parent)
+    tracer.record("generation", trace_id, started, finished, parent_span_id=parent)
+    if sends is not None and sends.frames:
+        tracer.record("send", trace_id, sends.first_start, sends.last_end, parent_span_id=parent,
+                      frames=sends.frames, busy_ms=round(sends.busy * 1000.0, 3))
+
 async def get_response(
     responder_handler,
     output_adapter,
@@ -33,36 +93,51 @@ async def get_response(
     stream: bool,
     local_name: str,
     console,
-    request_id: Optional[str] = None
+    request_id: Optional[str] = None,
+    send_final: bool = True,
+    trace: Optional[dict] = None,
+    flush_policy: Optional[FlushPolicy] = None,
+    on_token: Optional[Callable[[str], None]] = None
 ):
     """
     Gets the response from the responder_handler and either streams or returns it.
     If streaming is enabled, partial tokens are sent as they are generated.
     Includes request_id in all messages if provided.
+    If console is None, nothing is rendered (e.g. for in-process pipeline stages).
+    If send_final is False, the closing partial=False frame is left to the caller
+    (used when one answer is streamed in several segments).
+    If trace is given (the hop's trace_id and span as parent_span_id), it is attached
+    to every frame and the response's spans are recorded under it.
+    flush_policy decides when streamed tokens are sent as a frame (by default every
+    5 tokens or on a newline); the live display shows every token regardless.
+    on_token, if given, is called with every streamed token (e.g. to feed a dashboard).
     """
-    if stream and hasattr(responder_handler, "get_response_stream"):
-        answer = ""
-        style_name = "assistant"
-        display_role = local_name
-
-        text_content = Text("", style=style_name)
-        panel = Panel(text_content, title=display_role, border_style=style_name, expand=True)
-
-        token_buffer = []
-        tokens_before_update = 5
-
-        with Live(panel, console=console, refresh_per_second=10) as live:
-            async for token in async_token_generator(responder_handler, question, conversation):
-                token_buffer.append(token)
-                if '\n' in token or len(token_buffer) >= tokens_before_update:
-                    flushed = ''.join(token_buffer)
-                    token_buffer.clear()
+    started = time.time()
+    first_token_at = None
 
-                    answer += flushed
-                    text_content = Text(answer, style=style_name)
-                    updated_panel = Panel(text_content, title=display_role, border_style=style_name, expand=True)
-                    live.update(updated_panel)
-                    live.refresh()
+    if stream and hasattr(responder_handler, "get_response_stream"):
+        answer_chunks = []
+        sends = SendTimer()
+        policy = flush_policy or FlushPolicy()
+        batcher = TokenBatcher(policy)
+
+        # the panel only grows and redraws at its own frame rate, however fast tokens arrive
+        live_display = StreamingPanel(local_name, "assistant", live_console=console) if console is not None else contextlib.nullcontext()
+
+        with live_display as live:
+            def observe(token: str):
+                nonlocal first_token_at
+                if first_token_at is None:
+                    first_token_at = time.time()
+                if live is not None:
+                    live.append(token)
+                if on_token is not None:
+                    on_token(token)
+
+            tokens = async_token_generator(responder_handler, question, conversation)
+            async with contextlib.aclosing(batch_tokens(tokens, batcher, observe)) as frames:
+                async for flushed in frames:
+                    answer_chunks.append(flushed)
 
                     msg = {
                         "role": "Responder",
@@ -72,45 +147,22 @@ async def get_response(
                     if request_id:
                         msg["request_id"] = str(request_id)
 
+                    send_started = time.monotonic()
                     try:
-                        await output_adapter.write_message(msg)
+                        await sends.timed(output_adapter.write_message(traced_message(msg, trace)))
                     except Exception as e:
                         log.debug(f"Failed streaming token batch: {e}")
                         break
+                    policy.record_send(time.monotonic() - send_started)
 
-            # Flush remaining tokens if any
-            if token_buffer:
-                flushed = ''.join(token_buffer)
-                answer += flushed
-                text_content = Text(answer, style=style_name)
-                updated_panel = Panel(text_content, title=display_role, border_style=style_name, expand=True)
-                live.update(updated_panel)
-                live.refresh()
-
-                msg = {
-                    "role": "Responder",
-                    "message": flushed,
-                    "partial": True
-                }
-                if request_id:
-                    msg["request_id"] = str(request_id)
-
-                try:
-                    await output_adapter.write_message(msg)
-                except Exception as e:
-                    log.debug(f"Failed streaming final token batch: {e}")
+        generated = time.time()
 
         # Send final non-partial message to indicate streaming is done
-        final_msg = {"role": "Responder", "partial": False}
-        if request_id:
-            final_msg["request_id"] = str(request_id)
-
-        try:
-            await output_adapter.write_message(final_msg)
-        except Exception as e:
-            log.debug(f"Failed to send final partial=False message: {e}")
+        if send_final:
+            await sends.timed(send_final_message(output_adapter, request_id, trace))
 
-        return answer
+        record_response_spans(trace, started, first_token_at, generated, sends)
+        return "".join(answer_chunks)
     else:
         # Non-streaming mode
         if asyncio.iscoroutinefunction(responder_handler.get_response):
@@ -131,4 +183,7 @@ async def get_response(
         # except Exception as e:
         #     log.debug(f"Failed to send non-streamed responder message: {e}")
 
+        # the whole answer arrives at once, so its first token is its last
+        finished = time.time()
+        record_response_spans(trace, started, finished, finished)
         return answer
@@ -0,0 +1,165 @@
+# chat_handler/segmented_response.py
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, List, Optional
+from .flush_policy import FlushPolicy
+from .response_utils import get_response, safe_get_response, traced_message
+
+log = logging.getLogger(__name__)
+
+# end of a sentence (followed by whitespace) or a line break
+_BOUNDARY_PATTERN = re.compile(r"[.!?。！？](?=\s)|\n")
+
+
+class SentenceSegmenter:
+    """
+    Splits streamed text into complete sentences as it arrives.
+
+    Segments shorter than min_chars are held back and merged with the next one
+    (so abbreviations don't become segments of their own), and text longer than
+    max_chars without a boundary is cut at the last space to bound latency.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 400):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return any segments that are now complete."""
+        self._buffer += text
+        segments = []
+
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            segment, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            if segment.strip():
+                segments.append(segment)
+
+        return segments
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream has ended."""
+        remainder, self._buffer = self._buffer, ""
+        return remainder if remainder.strip() else None
+
+    def _next_cut(self) -> Optional[int]:
+        for match in _BOUNDARY_PATTERN.finditer(self._buffer):
+            end = match.end()
+            if end >= self.min_chars:
+                # include the whitespace after the boundary in this segment
+                while end < len(self._buffer) and self._buffer[end].isspace():
+                    end += 1
+                return end
+
+        if len(self._buffer) > self.max_chars:
+            space = self._buffer.rfind(" ", 0, self.max_chars)
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+
+class SegmentedResponder:
+    """
+    Answers a prompt segment by segment while the rest of it is still streaming in.
+
+    Complete segments are queued to a worker task that calls respond_segment(segment, index)
+    for each one in order, so a hop can start generating (and streaming downstream) as soon
+    as the first sentence from upstream is complete.
+    """
+
+    def __init__(self, respond_segment: Callable[[str, int], Awaitable[str]], segmenter: Optional[SentenceSegmenter] = None):
+        self.respond_segment = respond_segment
+        self.segmenter = segmenter or SentenceSegmenter()
+        self._segments: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._answers: List[str] = []
+
+    def feed(self, text: str):
+        """Add a partial chunk of the prompt."""
+        for segment in self.segmenter.feed(text):
+            self._enqueue(segment)
+
+    async def finish(self, text: str = "") -> str:
+        """Add the final chunk, wait for every segment to be answered and return the full answer."""
+        self.feed(text)
+        remainder = self.segmenter.flush()
+        if remainder:
+            self._enqueue(remainder)
+
+        if self._worker is None:
+            return ""
+
+        await self._segments.put(None)
+        await self._worker
+        return "".join(self._answers)
+
+    def cancel(self):
+        """Stop answering, e.g. when the upstream stream was abandoned."""
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def _enqueue(self, segment: str):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        self._segments.put_nowait(segment)
+
+    async def _run(self):
+        index = 0
+        while True:
+            segment = await self._segments.get()
+            if segment is None:
+                break
+            try:
+                self._answers.append(await self.respond_segment(segment, index) or "")
+            except Exception as e:
+                log.debug(f"Failed to answer segment {index}: {e}")
+            index += 1
+
+
+def segment_responder(responder_handler, output_adapter, conversation_manager, request_id: str, local_name: str,
+                      role: str = "questioner", trace: Optional[dict] = None, flush_policy: Optional[FlushPolicy] = None,
+                      on_token: Optional[Callable[[str], None]] = None) -> SegmentedResponder:
+    """
+    Return a SegmentedResponder that answers each segment with responder_handler, streaming
+    the answer to output_adapter as partial frames under request_id (with a separator frame
+    between segments) and adding both sides to the conversation. The caller sends the final
+    frame once finish() returns. Nothing is rendered.
+    """
+
+    async def respond_segment(segment: str, index: int) -> str:
+        await conversation_manager.load()
+        conversation_manager.add_message(role, segment)
+
+        # keep the answers to consecutive segments apart
+        separator = ""
+        if index > 0:
+            separator = " "
+            await output_adapter.write_message(traced_message(
+                {"role": "Responder", "message": separator, "partial": True, "request_id": request_id},
+                trace
+            ))
+
+        answer = await safe_get_response(
+            lambda q: get_response(
+                responder_handler,
+                output_adapter,
+                q,
+                conversation_manager.get_conversation(),
+                True,
+                local_name,
+                None,
+                request_id=request_id,
+                send_final=False,
+                trace=trace,
+                flush_policy=flush_policy,
+                on_token=on_token
+            ),
+            segment
+        )
+        conversation_manager.add_message("responder", answer)
+        return separator + answer
+
+    return SegmentedResponder(respond_segment)
@@ -1,46 +1,91 @@
 # chat_handler/server_input_handler.py
 import asyncio
 import logging
+import time
 import uuid
+from typing import Optional
 from websockets.exceptions import ConnectionClosedError
 from pydantic import ValidationError, parse_obj_as
 from messages.message_types import MessageUnion
-from .response_utils import get_response, safe_get_response
-from .ui_renderer import UIRenderer
-from .ui_utils import display_message, console
+from tracing.tracer import get_tracer
+from .response_utils import get_response, safe_get_response, send_final_message
+from .segmented_response import SegmentedResponder, segment_responder
+from .ui_utils import get_console, is_headless
 
 log = logging.getLogger(__name__)
 
+def start_segmented_response(chat_handler, msg_state: dict, request_id: str) -> Optional[SegmentedResponder]:
+    """
+    Start answering a streamed prompt sentence by sentence while it is still arriving.
+    Each segment's answer is streamed downstream as partial frames under the same
+    request_id; the caller sends the single final frame once every segment is answered.
+    The answer is not rendered live, since the incoming stream already owns the display.
+    Returns None if the responder can't stream.
+    """
+    responder_handler, conversation_manager = chat_handler.responder_for(msg_state["persona"])
+    if not hasattr(responder_handler, "get_response_stream"):
+        return None
+
+    return segment_responder(
+        responder_handler,
+        chat_handler.output_adapter,
+        conversation_manager,
+        request_id,
+        chat_handler.local_name,
+        role=msg_state["role"],
+        trace=msg_state["trace"],
+        flush_policy=chat_handler.flush_policy,
+        on_token=chat_handler.token_observer(request_id)
+    )
+
 async def handle_server_input(chat_handler):
     """
     Handles input from the server in server mode.
     Processes user messages, including partial and complete messages, and obtains
     responses from the responder. If streaming is enabled, the final completion
     message is now handled by `get_response` only, to avoid duplication.
+    Runs until the input adapter ends.
     """
-    # Track ongoing partial messages per request_id
-    partial_messages = {}
+    # Track ongoing partial messages per request_id; abandoned streams are evicted
+    partial_messages = chat_handler.reassembly
+    tracer = get_tracer()
+
+    # frames sent without a request_id belong to one stream until its final frame
+    unlabelled_request_id = None
+
+    # with a pool of responders, up to chat_handler.concurrency requests are answered at once
+    slots = asyncio.Semaphore(chat_handler.concurrency)
+    in_flight = set()
+    if chat_handler.concurrency > 1 and hasattr(chat_handler.input_adapter, "ack_on_read"):
+        # reading on doesn't mean the previous request was answered
+        chat_handler.input_adapter.ack_on_read = False
 
     while True:
         try:
             user_msg = await chat_handler.input_adapter.read_message()
+            read_at = time.time()
         except (EOFError, ConnectionClosedError) as e:
-            log.debug(f"Server input read error: {e}. Attempting to continue.")
-            await asyncio.sleep(0.5)
-            continue
+            log.debug(f"Server input ended: {e}")
+            break
 
         # Ensure type field is present; assume "chat" if missing
         if "type" not in user_msg:
             user_msg["type"] = "chat"
 
-        # Ensure request_id is present; generate one if missing
+        # Ensure request_id is present; keep one temporary ID for the whole unlabelled stream
         if "request_id" not in user_msg:
-            log.warning("Received message without request_id. Assigning a temporary ID.")
-            user_msg["request_id"] = str(uuid.uuid4())
+            if unlabelled_request_id is None:
+                log.warning("Received message without request_id. Assigning a temporary ID.")
+                unlabelled_request_id = str(uuid.uuid4())
+            user_msg["request_id"] = unlabelled_request_id
+            if not user_msg.get("partial", False):
+                unlabelled_request_id = None
 
         # Attempt to validate and parse message using MessageUnion
         try:
+            validation_start = time.time()
             message_obj = parse_obj_as(MessageUnion, user_msg)
+            validation_end = time.time()
         except ValidationError as ve:
             log.error(f"Message validation failed: {ve.errors()}")
             continue
@@ -50,25 +95,38 @@ async def handle_server_input(chat_handler):
         request_id = str(message_obj.request_id)  # Convert UUID to string
         partial = getattr(message_obj, 'partial', False)
         message_text = getattr(message_obj, 'message', "")
+        persona = getattr(message_obj, 'persona', None)
+        incoming_trace = message_obj.trace.model_dump() if message_obj.trace else None
+
+        # Evict streams that went quiet, and ignore the rest of streams that were evicted
+        partial_messages.expire()
+        if partial_messages.is_dropped(request_id):
+            if not partial:
+                partial_messages.forget_dropped(request_id)
+            continue
 
         # Access the partial_messages state for this request_id
         if request_id not in partial_messages:
-            partial_messages[request_id] = {
+            partial_messages.open(request_id, {
                 "chunks": [],
                 "ui_renderer": None,
                 "role": role,
-                "finalized": False
-            }
+                "persona": persona,
+                "segmented": None,
+                "finalized": False,
+                "trace": tracer.continue_trace(incoming_trace, request_id),
+                "started": read_at
+            })
 
-        msg_state = partial_messages[request_id]
+        msg_state = partial_messages.get(request_id)
+        if not partial_messages.add(request_id, message_text):
+            continue
 
         if partial:
             # Handle partial chunk
-            msg_state["chunks"].append(message_text)
-
             # Start or update the streaming UI
             if msg_state["ui_renderer"] is None:
-                msg_state["ui_renderer"] = UIRenderer()
+                msg_state["ui_renderer"] = chat_handler.create_renderer(request_id)
                 initial_text = "".join(msg_state["chunks"])
                 msg_state["ui_renderer"].start_streaming(
                     server=chat_handler.server,
@@ -81,18 +139,31 @@ async def handle_server_input(chat_handler):
                 # Update streaming display with the new chunk
                 msg_state["ui_renderer"].update_streaming(message_text)
 
+            # In segment streaming mode, answer complete sentences before the prompt is finished
+            if chat_handler.segment_stream:
+                if msg_state["segmented"] is None:
+                    try:
+                        msg_state["segmented"] = start_segmented_response(chat_handler, msg_state, request_id) or False
+                    except ValueError as e:
+                        # fall back to answering the whole prompt, which reports the routing error
+                        log.error(f"Unable to route message {request_id}: {e}")
+                        msg_state["segmented"] = False
+                if msg_state["segmented"]:
+                    msg_state["segmented"].feed(message_text)
+
         else:
             # Final message
-            msg_state["chunks"].append(message_text)
             full_prompt = "".join(msg_state["chunks"])
             msg_state["finalized"] = True
+            msg_state["persona"] = msg_state["persona"] or persona
+            tracer.record_ingress(msg_state["trace"], incoming_trace, read_at, (validation_start, validation_end))
 
             # End streaming if it was ongoing
             if msg_state["ui_renderer"] and msg_state["ui_renderer"].is_streaming:
                 msg_state["ui_renderer"].end_streaming()
 
             # Display the complete user message
-            msg_state["ui_renderer"] = msg_state["ui_renderer"] or UIRenderer()
+            msg_state["ui_renderer"] = msg_state["ui_renderer"] or chat_handler.create_renderer(request_id)
             msg_state["ui_renderer"].display_complete_message(
                 server=chat_handler.server,
                 local_name=chat_handler.local_name,
@@ -101,39 +172,119 @@ async def handle_server_input(chat_handler):
                 content=full_prompt
             )
 
-            # Add the user message to the conversation
-            chat_handler.conversation_manager.add_message(role, full_prompt)
-
-            # Process the prompt fully using the responder
-            answer = await safe_get_response(
-                lambda q: get_response(
-                    chat_handler.responder_handler,
-                    chat_handler.output_adapter,
-                    q,
-                    chat_handler.conversation_manager.get_conversation(),
-                    chat_handler.stream,
-                    chat_handler.local_name,
-                    console,
-                    request_id=request_id
-                ),
-                full_prompt
-            )
+            # The prompt is complete, so it no longer counts against the partial message limits
+            partial_messages.pop(request_id)
 
-            chat_handler.conversation_manager.add_message("responder", answer)
+            if chat_handler.concurrency == 1:
+                await answer_request(chat_handler, msg_state, request_id, message_text, full_prompt)
+                continue
 
-            # Only display the final complete message here if we're NOT streaming.
-            # In streaming mode, get_response handles all UI updates, including the final state.
-            if not chat_handler.stream:
-                msg_state["ui_renderer"].display_complete_message(
-                    server=chat_handler.server,
-                    local_name=chat_handler.local_name,
-                    remote_name=chat_handler.remote_name,
-                    role="responder",
-                    content=answer
-                )
+            # answer in a task of its own, so a pool of responders works on several requests at once;
+            # waiting for a free slot keeps unanswered messages in the queue
+            await slots.acquire()
+            task = asyncio.create_task(answer_in_slot(slots, chat_handler, msg_state, request_id, message_text, full_prompt))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+    # requests already being answered still get their answers
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+async def answer_in_slot(slots: asyncio.Semaphore, chat_handler, msg_state: dict, request_id: str, message_text: str, full_prompt: str):
+    try:
+        await answer_request(chat_handler, msg_state, request_id, message_text, full_prompt)
+    except Exception as e:
+        log.error(f"Failed to answer message {request_id}: {e}")
+    finally:
+        slots.release()
+
+async def answer_request(chat_handler, msg_state: dict, request_id: str, message_text: str, full_prompt: str):
+    """Answer a complete prompt (whose last frame held message_text) and send the answer downstream."""
+    tracer = get_tracer()
+    role = msg_state["role"]
+    concurrent = chat_handler.concurrency > 1
+
+    if msg_state["segmented"]:
+        # Answer the rest of the prompt, then close the stream with one final frame
+        answer = await msg_state["segmented"].finish(message_text)
+        await send_final_message(chat_handler.output_adapter, request_id, msg_state["trace"])
+        tracer.end_hop(msg_state["trace"], msg_state["started"], request_id=request_id, segmented=True)
+
+        msg_state["ui_renderer"].display_complete_message(
+            server=chat_handler.server,
+            local_name=chat_handler.local_name,
+            remote_name=chat_handler.remote_name,
+            role="responder",
+            content=answer
+        )
+        await msg_state["ui_renderer"].after_message(server_mode=chat_handler.server)
+        mark_answered(chat_handler, request_id)
+        return
+
+    # Pick the responder and conversation for the message's persona
+    try:
+        responder_handler, conversation_manager = chat_handler.responder_for(msg_state["persona"])
+    except ValueError as e:
+        log.error(f"Unable to route message {request_id}: {e}")
+        if chat_handler.dashboard is not None:
+            chat_handler.dashboard.stream_finished(request_id)
+        mark_answered(chat_handler, request_id)
+        return
+    await conversation_manager.load()
+
+    if concurrent:
+        # each request sees the history as of its start; its turns are added together once answered
+        conversation = conversation_manager.get_conversation() + [{"role": role.lower(), "content": full_prompt}]
+    else:
+        # Add the user message to the conversation
+        conversation_manager.add_message(role, full_prompt)
+        conversation = conversation_manager.get_conversation()
+
+    # only one live panel can be drawn at a time; the dashboard, if there is one, owns the display
+    console = None
+    if not (is_headless() or chat_handler.dashboard is not None or concurrent):
+        console = get_console()
+
+    # Process the prompt fully using the responder
+    answer = await safe_get_response(
+        lambda q: get_response(
+            responder_handler,
+            chat_handler.output_adapter,
+            q,
+            conversation,
+            chat_handler.stream,
+            chat_handler.local_name,
+            console,
+            request_id=request_id,
+            trace=msg_state["trace"],
+            flush_policy=chat_handler.flush_policy,
+            on_token=chat_handler.token_observer(request_id)
+        ),
+        full_prompt
+    )
+
+    if concurrent:
+        conversation_manager.add_message(role, full_prompt)
+    conversation_manager.add_message("responder", answer)
+    tracer.end_hop(msg_state["trace"], msg_state["started"], request_id=request_id)
+
+    # Only display the final complete message here if it wasn't streamed to a live panel.
+    # In that case get_response handles all UI updates, including the final state.
+    if not (chat_handler.stream and console is not None):
+        msg_state["ui_renderer"].display_complete_message(
+            server=chat_handler.server,
+            local_name=chat_handler.local_name,
+            remote_name=chat_handler.remote_name,
+            role="responder",
+            content=answer
+        )
 
-            # After responding, show the prompt again
-            await msg_state["ui_renderer"].after_message(server_mode=chat_handler.server)
+    # After responding, show the prompt again
+    await msg_state["ui_renderer"].after_message(server_mode=chat_handler.server)
+    mark_answered(chat_handler, request_id)
 
-            # Remove the request_id since we're done with this message
-            del partial_messages[request_id]
+def mark_answered(chat_handler, request_id: str):
+    """Tell the input adapter a request was handled (a durable queue then deletes it)."""
+    answered = getattr(chat_handler.input_adapter, "answered", None)
+    if answered is not None:
+        answered(request_id)
@@ -0,0 +1,184 @@
+# chat_handler/stream_dashboard.py
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from response_handlers.persona_registry import estimate_tokens
+from .ui_utils import get_console, get_refresh_rate, render
+
+# characters of each stream's latest text shown in its row
+TAIL_CHARS = 48
+
+@dataclass
+class StreamStats:
+    request_id: str
+    label: str
+    phase: str
+    started: float
+    tokens: int = 0
+    tail: str = ""
+
+    def tokens_per_second(self, now: float) -> float:
+        elapsed = now - self.started
+        return self.tokens / elapsed if elapsed > 0 else 0.0
+
+
+class StreamDashboard:
+    """
+    A single live view of every stream a server is handling at once.
+
+    Each request gets a row with its phase (receiving the prompt or answering it), token
+    count, tokens/sec and latest text; compact mode shows only the aggregate throughput.
+    Rich supports one live display at a time, so this replaces the per-request panels.
+    Redraws are limited to refresh_per_second and built from a snapshot, so they can run
+    on a render thread while streams keep updating.
+    """
+
+    def __init__(self, compact: bool = False, max_rows: int = 20, refresh_per_second: Optional[float] = None, live_console=None):
+        self.compact = compact
+        self.max_rows = max_rows
+        self.min_interval = 1.0 / (refresh_per_second or get_refresh_rate())
+        self.live_console = live_console
+        self.streams: Dict[str, StreamStats] = {}
+        self.finished = 0
+        self.finished_tokens = 0
+        self._started = time.monotonic()
+        self._live = None
+        self._last_refresh = 0.0
+
+    def start(self):
+        render(self._start, target=self)
+
+    def stop(self):
+        self.refresh(force=True)
+        render(self._stop, target=self)
+
+    def stream_started(self, request_id: str, label: str, phase: str = "receiving"):
+        if request_id not in self.streams:
+            self.streams[request_id] = StreamStats(request_id, label, phase, time.monotonic())
+            self.refresh()
+
+    def stream_update(self, request_id: str, text: str, phase: Optional[str] = None):
+        stats = self.streams.get(request_id)
+        if stats is None or not text:
+            return
+        stats.tokens += estimate_tokens(text)
+        stats.tail = (stats.tail + text.replace("\n", " "))[-TAIL_CHARS:]
+        if phase:
+            stats.phase = phase
+        self.refresh()
+
+    def stream_phase(self, request_id: str, phase: str):
+        stats = self.streams.get(request_id)
+        if stats is not None:
+            stats.phase = phase
+            self.refresh()
+
+    def stream_finished(self, request_id: str):
+        stats = self.streams.pop(request_id, None)
+        if stats is not None:
+            self.finished += 1
+            self.finished_tokens += stats.tokens
+            self.refresh()
+
+    def observer(self, request_id: str, phase: str = "answering") -> Callable[[str], None]:
+        """Return a callback that adds streamed text to a request's row."""
+        return lambda text: self.stream_update(request_id, text, phase)
+
+    def throughput(self, now: Optional[float] = None) -> float:
+        """Aggregate tokens/sec across the active streams."""
+        now = now if now is not None else time.monotonic()
+        return sum(stats.tokens_per_second(now) for stats in self.streams.values())
+
+    def refresh(self, force: bool = False):
+        """Queue a redraw if the last one is old enough."""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.min_interval:
+            return
+        self._last_refresh = now
+        render(self._draw, self._snapshot(now), target=self)
+
+    def _snapshot(self, now: float) -> Tuple[List[tuple], str]:
+        rows = []
+        if not self.compact:
+            for stats in list(self.streams.values())[:self.max_rows]:
+                rows.append((
+                    stats.request_id[:8],
+                    stats.label,
+                    stats.phase,
+                    str(stats.tokens),
+                    f"{stats.tokens_per_second(now):.1f}",
+                    f"{now - stats.started:.1f}s",
+                    stats.tail
+                ))
+        summary = (
+            f"{len(self.streams)} active, {self.finished} finished | "
+            f"{self.throughput(now):.1f} tok/s | {self.finished_tokens} tokens answered"
+        )
+        return rows, summary
+
+    def _start(self):
+        from rich.live import Live
+        from rich.text import Text
+
+        self._live = Live(Text(""), console=self.live_console or get_console(), auto_refresh=False)
+        self._live.__enter__()
+
+    def _draw(self, snapshot: Tuple[List[tuple], str]):
+        if self._live is None:
+            return
+        from rich.table import Table
+        from rich.text import Text
+
+        rows, summary = snapshot
+        if self.compact:
+            self._live.update(Text(summary, style="system"), refresh=True)
+            return
+
+        table = Table(title="Streams", caption=summary, expand=True)
+        for column in ("request", "label", "phase", "tokens", "tok/s", "elapsed"):
+            table.add_column(column, no_wrap=True)
+        table.add_column("latest", overflow="ellipsis", no_wrap=True)
+        for row in rows:
+            table.add_row(*row)
+        self._live.update(table, refresh=True)
+
+    def _stop(self):
+        if self._live is not None:
+            self._live.__exit__(None, None, None)
+            self._live = None
+
+
+class DashboardStreamRenderer:
+    """
+    Stands in for UIRenderer in handle_server_input, showing one request as a row of a
+    StreamDashboard instead of its own panels.
+    """
+
+    def __init__(self, dashboard: StreamDashboard, request_id: str):
+        self.dashboard = dashboard
+        self.request_id = request_id
+        self.is_streaming = False
+
+    def start_streaming(self, server: bool, local_name: str, remote_name: str, role: str, initial_text: str):
+        self.is_streaming = True
+        self.dashboard.stream_started(self.request_id, role)
+        self.dashboard.stream_update(self.request_id, initial_text)
+
+    def update_streaming(self, new_text: str):
+        self.dashboard.stream_update(self.request_id, new_text)
+
+    def end_streaming(self):
+        self.is_streaming = False
+
+    def display_complete_message(self, server: bool, local_name: str, remote_name: str, role: str, content: str):
+        if role.lower() == "responder":
+            return
+        # a prompt sent in one frame still gets a row
+        if self.request_id not in self.dashboard.streams:
+            self.dashboard.stream_started(self.request_id, role)
+            self.dashboard.stream_update(self.request_id, content)
+        self.dashboard.stream_phase(self.request_id, "answering")
+
+    async def after_message(self, server_mode: bool):
+        # called once a request is answered
+        self.dashboard.stream_finished(self.request_id)
@@ -1,55 +1,142 @@
 # chat_handler/ui_renderer.py
-from typing import Optional
-from rich.panel import Panel
-from rich.text import Text
-from rich.live import Live
-from .ui_utils import role_to_display_name, print_prompt, display_message, console
+import importlib
+from typing import List, Optional
+from . import ui_utils
+from .ui_utils import role_to_display_name, print_prompt, display_message, is_headless, get_refresh_rate, render, get_render_thread
+
+# Rich classes are imported on first use, so headless processes never load Rich
+_RICH_CLASSES = {"Live": "rich.live", "Panel": "rich.panel", "Text": "rich.text"}
+
+def _rich(name: str):
+    if name not in globals():
+        globals()[name] = getattr(importlib.import_module(_RICH_CLASSES[name]), name)
+    return globals()[name]
+
+def _console():
+    # a console set on this module (e.g. by tests) wins over the shared one
+    return globals().get("console") or ui_utils.get_console()
+
+def __getattr__(name):
+    if name in _RICH_CLASSES:
+        return _rich(name)
+    if name == "console":
+        return ui_utils.get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class StreamingPanel:
+    """
+    A live panel for text that arrives in chunks.
+
+    Chunks are appended to a single Text inside a Panel built once, and Live redraws it
+    refresh_per_second times (by default the process-wide UI refresh rate) on its own timer,
+    however fast or slowly chunks arrive, so rendering a long answer costs linear rather than
+    quadratic time and text that arrives before a pause is drawn within one frame.
+    The accumulated text is kept as a list of chunks and only joined when read.
+    With a render thread set (see ui_utils.set_render_thread), chunks are added on that thread.
+    """
+
+    def __init__(self, title: str, style: str, initial_text: str = "", refresh_per_second: Optional[float] = None, live_console=None):
+        self.style = style
+        self.refresh_per_second = refresh_per_second or get_refresh_rate()
+        self._chunks: List[str] = []
+        self._text = _rich("Text")("", style=style)
+        self._live = _rich("Live")(
+            _rich("Panel")(self._text, title=title, border_style=style, expand=True),
+            console=live_console or _console(),
+            refresh_per_second=self.refresh_per_second
+        )
+        if initial_text:
+            self._chunks.append(initial_text)
+            self._text.append(initial_text)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        render(self._start, target=self)
+
+    def append(self, chunk: str):
+        """Add a chunk; it is drawn with the next frame."""
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+
+        # a busy render thread joins chunks that arrive before it gets to them
+        render_thread = get_render_thread()
+        if render_thread is not None:
+            render_thread.append(self, self._draw, chunk)
+        else:
+            self._draw(chunk)
+
+    def stop(self):
+        render(self._stop, target=self)
+
+    def _start(self):
+        self._live.__enter__()
+
+    def _draw(self, chunk: str):
+        self._text.append(chunk)
+
+    def _stop(self):
+        # leaving Live draws the final frame, including chunks since the last refresh
+        self._live.__exit__(None, None, None)
+
+    @property
+    def content(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
 
 class UIRenderer:
     def __init__(self):
         self.is_streaming = False
-        self.streaming_answer = ""
-        self.live_instance: Optional[Live] = None
+        self.live_instance: Optional[StreamingPanel] = None
         self.display_role: Optional[str] = None
         self.style_name: Optional[str] = None
 
+    @property
+    def streaming_answer(self) -> str:
+        return self.live_instance.content if self.live_instance else ""
+
     def start_streaming(self, server: bool, local_name: str, remote_name: str, role: str, initial_text: str):
         """Start displaying streamed content."""
         self.is_streaming = True
-        self.streaming_answer = initial_text
+        if is_headless():
+            return
         self.display_role, self.style_name = role_to_display_name(server, local_name, remote_name, role)
 
-        text_content = Text(self.streaming_answer, style=self.style_name)
-        panel = Panel(text_content, title=self.display_role, border_style=self.style_name, expand=True)
-        self.live_instance = Live(panel, console=console, refresh_per_second=10)
-        self.live_instance.__enter__()
+        self.live_instance = StreamingPanel(self.display_role, self.style_name, initial_text=initial_text)
+        self.live_instance.start()
 
     def update_streaming(self, new_text: str):
         """Update the ongoing streaming display."""
         if not self.is_streaming or not self.live_instance:
             return
-        self.streaming_answer += new_text
-        text_content = Text(self.streaming_answer, style=self.style_name)
-        updated_panel = Panel(text_content, title=self.display_role, border_style=self.style_name, expand=True)
-        self.live_instance.update(updated_panel)
-        self.live_instance.refresh()
+        self.live_instance.append(new_text)
 
     def end_streaming(self):
         """End the streaming display."""
         if self.is_streaming and self.live_instance:
-            self.live_instance.__exit__(None, None, None)
+            self.live_instance.stop()
             self.live_instance = None
         self.is_streaming = False
-        self.streaming_answer = ""
         self.display_role = None
         self.style_name = None
-        console.print()
+        if not is_headless():
+            render(_console().print)
 
     def display_complete_message(self, server: bool, local_name: str, remote_name: str, role: str, content: str):
         """Display a complete (non-streaming) message."""
+        if is_headless():
+            return
         if content:
             display_message(server, local_name, remote_name, role, content)
-        console.print()
+        render(_console().print)
 
     async def after_message(self, server_mode: bool):
         """Perform any UI actions after a complete message is displayed, e.g., show prompt."""
@@ -1,27 +1,91 @@
 # ui_utils.py
-from rich.console import Console
-from rich.panel import Panel
-from rich.text import Text
-from rich.theme import Theme
 import asyncio
 
-# set the theme
-custom_theme = Theme({
-    "you": "bold magenta",
-    "assistant": "bold cyan",
-    "verifier": "bold green",
-    "unknown": "bold yellow",
-    "system": "bold blue"
-})
+# Rich is only imported once something is drawn, so headless processes never load it
+_headless = False
 
-# setup the console
-console = Console(theme=custom_theme)
+def set_headless(headless: bool = True):
+    """Skip all rendering in this process (see --headless)."""
+    global _headless
+    _headless = headless
+
+def is_headless() -> bool:
+    return _headless
+
+# live displays redraw at most this often, however often frames are sent downstream
+_refresh_per_second = 10.0
+
+def set_refresh_rate(refresh_per_second: float):
+    """Set how many times per second live displays may redraw (see --ui-refresh-rate)."""
+    global _refresh_per_second
+    if refresh_per_second <= 0:
+        raise ValueError("The UI refresh rate must be positive.")
+    _refresh_per_second = refresh_per_second
+
+def get_refresh_rate() -> float:
+    return _refresh_per_second
+
+# when set, drawing happens on this RenderThread instead of the event loop
+_render_thread = None
+
+def set_render_thread(render_thread):
+    """Route all drawing through a RenderThread (see --render-thread), or back to the caller with None."""
+    global _render_thread
+    _render_thread = render_thread
+
+def get_render_thread():
+    return _render_thread
+
+def render(fn, *args, target=None, droppable: bool = False):
+    """Draw now, or queue the call on the render thread if there is one."""
+    if _render_thread is not None:
+        _render_thread.submit(fn, *args, target=target, droppable=droppable)
+    else:
+        fn(*args)
+
+def _create_console():
+    global console, custom_theme
+    from rich.console import Console
+    from rich.theme import Theme
+
+    # set the theme
+    custom_theme = Theme({
+        "you": "bold magenta",
+        "assistant": "bold cyan",
+        "verifier": "bold green",
+        "unknown": "bold yellow",
+        "system": "bold blue"
+    })
+
+    # setup the console
+    console = Console(theme=custom_theme)
+
+def get_console():
+    """Return the shared console, creating it on first use."""
+    if "console" not in globals():
+        _create_console()
+    return globals()["console"]
+
+def __getattr__(name):
+    # `console` and `custom_theme` are created lazily
+    if name in ("console", "custom_theme"):
+        _create_console()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def print_panel(title: str, content: str, style: str = "unknown"):
+    if _headless:
+        return
+    render(_print_panel, title, content, style)
+
+def _print_panel(title: str, content: str, style: str):
+    from rich.panel import Panel
+    from rich.text import Text
+
     text_content = Text(content, style=style)
     panel = Panel(text_content, title=title, border_style=style, expand=True)
-    console.print(panel)
+    get_console().print(panel)
 
 def role_to_display_name(server: bool, local_name: str, remote_name: str, role: str) -> (str, str):
     r = role.lower()
@@ -52,10 +116,14 @@ def role_to_display_name(server: bool, local_name: str, remote_name: str, role:
     return display_role, style_name
 
 def display_message(server: bool, local_name: str, remote_name: str, role: str, message: str):
+    if _headless:
+        return
     display_role, style_name = role_to_display_name(server, local_name, remote_name, role)
     print_panel(display_role, message, style=style_name)
 
 def print_environment_info(server: bool, mode: str, persona: str, provider: str, model: str, input_adapter_name: str, output_adapter_name: str, local_name: str, remote_name: str):
+    if _headless:
+        return
     mode_type = "Server Mode" if server else "Client Mode"
     content_lines = [
         f"{mode_type}",
@@ -83,5 +151,15 @@ def print_environment_info(server: bool, mode: str, persona: str, provider: str,
     print_panel("Environment Info", info_str, "system")
 
 async def print_prompt(server_mode=False):
+    # headless processes have no prompt, and don't pay for the pause before it
+    if _headless:
+        return
+    if _render_thread is not None:
+        # the render thread keeps output in order, no need to let it settle
+        render(_print_prompt)
+        return
     await asyncio.sleep(0.05)
-    console.print(">:", end=" ", style="system")
+    _print_prompt()
+
+def _print_prompt():
+    get_console().print(">:", end=" ", style="system")
@@ -1,16 +1,25 @@
 # chat_handler/user_input_handler.py
 import asyncio
 import logging
+import time
+import uuid
+from typing import Optional
 from websockets.exceptions import ConnectionClosedError
+from tracing.tracer import get_tracer
+from transport.conversation_io import ConversationEndedError, ConversationIO
 from .ui_renderer import UIRenderer
 
 # logging
 log = logging.getLogger(__name__)
 
-async def handle_user_input(chat_handler):
+async def handle_user_input(chat_handler, conversation: Optional[ConversationIO] = None):
     """
     Handles user input in client mode.
     Delegates UI rendering to UIRenderer.
+
+    With a conversation (over a duplex output adapter), each message is sent with
+    conversation.stream() and its answer is shown as it arrives before the next message
+    is read, so the server never streams faster than the answer is displayed.
     """
     ui_renderer = UIRenderer()
 
@@ -30,6 +39,7 @@ async def handle_user_input(chat_handler):
             break
 
         # Add user message to conversation
+        await chat_handler.conversation_manager.load()
         chat_handler.conversation_manager.add_message(u_role, u_content)
 
         # Display user's message via UIRenderer
@@ -41,6 +51,20 @@ async def handle_user_input(chat_handler):
             content=u_content
         )
 
+        # Requests start their trace here when tracing is enabled
+        tracer = get_tracer()
+        if tracer.enabled:
+            user_msg.setdefault("request_id", str(uuid.uuid4()))
+            user_msg["trace"] = {**tracer.start_trace(user_msg["request_id"]), "sent_at": time.time()}
+
+        if conversation is not None:
+            try:
+                await show_answer(chat_handler, ui_renderer, conversation.stream(user_msg))
+            except ConversationEndedError as e:
+                log.debug(f"Conversation ended: {e}")
+                break
+            continue
+
         # Relay the user's message to the server (in client mode)
         try:
             await chat_handler.output_adapter.write_message(user_msg)
@@ -51,3 +75,16 @@ async def handle_user_input(chat_handler):
 
         # After showing the user's message and sending it along, show prompt
         await ui_renderer.after_message(server_mode=chat_handler.server)
+
+async def show_answer(chat_handler, ui_renderer: UIRenderer, chunks):
+    """Display an answer streamed from the server, chunk by chunk."""
+    try:
+        async for chunk in chunks:
+            if not ui_renderer.is_streaming:
+                ui_renderer.start_streaming(chat_handler.server, chat_handler.local_name, chat_handler.remote_name, "responder", chunk)
+            else:
+                ui_renderer.update_streaming(chunk)
+    finally:
+        if ui_renderer.is_streaming:
+            ui_renderer.end_streaming()
+    await ui_renderer.after_message(server_mode=False)
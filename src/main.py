@@ -3,8 +3,27 @@ import asyncio
 import logging
 from arg_parser import parse_args, Config
 from adapters_factory import create_input_adapter, create_output_adapter
+from adapters.input.durable_queue import DurableQueue
 from chat_handler.chat_handler import ChatHandler
+from chat_handler.conversation_store import SQLiteConversationStore
+from chat_handler.reassembly_buffer import ReassemblyBuffer
+from chat_handler.adapters import start_adapters, stop_adapters
+from chat_handler.relay_handler import handle_relay
+from chat_handler.ui_utils import print_panel, set_headless, set_refresh_rate, set_render_thread
+from chat_handler.render_thread import RenderThread
+from chat_handler.stream_dashboard import StreamDashboard
+from messages.codec import configure_codec
+from chat_handler.flush_policy import FlushPolicy
+from pipeline.pipeline import Pipeline
+from batch.batch_runner import BatchRunner
+from pipeline.dag import build_dag_pipeline, load_pipeline_definition
 from ws_server import start_server
+from response_handlers.persona_registry import configure_persona_registry
+from response_handlers.response_handler_factory import create_response_handler
+from response_handlers.handler_pool import ResponseHandlerPool
+from tracing.tracer import configure_tracer, get_tracer
+from tracing.exporters import create_span_exporter
+from transport.flow_control import get_credit_ledger
 
 # setup the logger
 logger = logging.getLogger(__name__)
@@ -17,18 +36,139 @@ def setup_logging(level=logging_level) -> None:
         level=level
     )
 
+def trace_hop_name(config: Config) -> str:
+    """Name this process's spans after the hop it plays in a chain, unless --trace-hop is given."""
+    if config.trace_hop:
+        return config.trace_hop
+    name = config.persona or config.mode
+    return f"{name}@{config.server_ws_uri}" if config.server else name
+
+def flush_policy_from_config(config: Config) -> FlushPolicy:
+    """Build the streamed token flush policy from the --flush-* options (0 disables a limit)."""
+    return FlushPolicy(
+        max_tokens=config.flush_tokens or None,
+        max_bytes=config.flush_bytes or None,
+        max_delay_ms=config.flush_delay_ms or None,
+        adaptive=config.flush_adaptive
+    )
+
+def validate_config(config: Config) -> None:
+    """
+    Check option combinations that argparse can't express.
+    """
+    # check that a persona is specified in persona model (batch requests may name their own)
+    if config.mode == "persona" and not config.persona and not config.multi_persona and not config.batch:
+        raise ValueError("--persona is required when --mode persona")
+
+    # subprocess responders run --cmd, which can't also be the input
+    if config.mode == "subprocess":
+        if not config.cmd:
+            raise ValueError("--cmd is required when --mode subprocess")
+        if config.input_type == "stdin" or config.multi_persona:
+            raise ValueError("--mode subprocess can't be used with --input stdin or --multi-persona")
+        if config.workers < 1:
+            raise ValueError("--workers must be at least 1")
+    if config.max_line_bytes < 1:
+        raise ValueError("--max-line-bytes must be positive")
+
+    # a batch reads its requests from a file and writes results to another, with no chat around it
+    if config.batch:
+        if config.server or config.relay or config.pipeline or config.pipeline_file:
+            raise ValueError("--batch can't be used with --server, --relay or a pipeline")
+        if config.mode == "human":
+            raise ValueError("--batch can't be used with --mode human")
+        if config.batch_concurrency < 1:
+            raise ValueError("--batch-concurrency must be at least 1")
+
+    # the durable queue replaces the server's in-memory queue; messages are acked as the chat handler answers them
+    if config.durable_queue and not config.server:
+        raise ValueError("--durable-queue requires --server")
+    if config.durable_queue and (config.relay or config.pipeline or config.pipeline_file):
+        raise ValueError("--durable-queue can't be used with --relay or a pipeline")
+    if config.visibility_timeout <= 0:
+        raise ValueError("--visibility-timeout must be positive")
+
+    # stored conversations belong to the chat handler
+    if config.conversation_store and (config.relay or config.pipeline or config.pipeline_file or config.batch):
+        raise ValueError("--conversation-store can't be used with --relay, --batch or a pipeline")
+    if config.conversation_turns < 1:
+        raise ValueError("--conversation-turns must be at least 1")
+
+    # partial message limits bound what a server holds for streams that never finish
+    if config.partial_ttl <= 0 or config.partial_max_bytes < 1 or config.partial_total_bytes < 1:
+        raise ValueError("--partial-ttl, --partial-max-bytes and --partial-total-bytes must be positive")
+
+    # a streaming client that grants no credit for this long has its answer cancelled
+    if config.credit_timeout <= 0:
+        raise ValueError("--credit-timeout must be positive")
+
+    # segments are answered as partial frames, so this needs streaming output
+    if config.segment_stream and not config.stream:
+        raise ValueError("--segment-stream requires --stream")
+
+    # a pipeline is either a list of stages or a definition file
+    if config.pipeline and config.pipeline_file:
+        raise ValueError("--pipeline and --pipeline-file can't be used together")
+
+    # multi-persona routing only makes sense for a server
+    if config.multi_persona and not config.server:
+        raise ValueError("--multi-persona requires --server")
+
+    # the relay fast path replaces a forwarding server hop
+    if config.relay and not (config.server and config.mode == "forwarder"):
+        raise ValueError("--relay requires --server and --mode forwarder")
+    if config.relay and (config.pipeline or config.pipeline_file):
+        raise ValueError("--relay can't be used with a pipeline")
+    if config.relay and config.resumable:
+        # relayed frames are sent as received, without the numbering resuming needs
+        raise ValueError("--relay can't be used with --resumable")
+
+    # a headless process has nobody to show output to or ask for answers (a server answers its clients instead)
+    if config.headless and ((config.output_type == "human" and not config.server) or config.mode == "human"):
+        raise ValueError("--headless can't be used with --output human (outside --server) or --mode human")
+
+    # the dashboard shows the requests a server handles, in place of its own panels
+    if config.dashboard and not config.server:
+        raise ValueError("--dashboard requires --server")
+    if config.dashboard and (config.headless or config.relay or config.pipeline or config.pipeline_file):
+        raise ValueError("--dashboard can't be used with --headless, --relay or a pipeline")
+
+    # resumable streams number the frames a server hop sends to the next one
+    if config.resumable and not (config.server and config.output_type == "websocket"):
+        raise ValueError("--resumable requires --server and --output websocket")
+    if config.replay_frames < 1:
+        raise ValueError("--replay-frames must be positive")
+
+    # the send queue holds frames for a websocket output
+    if config.send_queue < 0:
+        raise ValueError("--send-queue can't be negative")
+    if config.send_queue and config.output_type != "websocket":
+        raise ValueError("--send-queue requires --output websocket")
+
+    # buffered stdout only applies to stdout output
+    if config.stdout_flush_ms is not None:
+        if config.output_type != "stdout" or config.server:
+            raise ValueError("--stdout-flush-ms requires --output stdout")
+        if config.stdout_flush_ms < 0 or config.stdout_buffer_bytes < 1:
+            raise ValueError("--stdout-flush-ms can't be negative and --stdout-buffer-bytes must be positive")
+
+    # flush limits are counts and durations
+    if config.flush_tokens < 0 or (config.flush_bytes or 0) < 0 or (config.flush_delay_ms or 0) < 0:
+        raise ValueError("--flush-tokens, --flush-bytes and --flush-delay-ms can't be negative")
+
 async def run_chat(config: Config, message_queue: asyncio.Queue) -> None:
     """
     Run the chat handler according to the provided configuration.
     """
-    # check that a persona is specified in persona model
-    if config.mode == "persona" and not config.persona:
-        raise ValueError("--persona is required when --mode persona")
-    
     # create the adapters
     input_adapter = create_input_adapter(config, message_queue)
     output_adapter = create_output_adapter(config)
 
+    # keep conversations on disk, with only their recent turns in memory
+    conversation_store = None
+    if config.conversation_store:
+        conversation_store = SQLiteConversationStore(config.conversation_store, keep_turns=config.conversation_turns)
+
     # setup the chat handler
     handler = ChatHandler(
         input_adapter=input_adapter,
@@ -38,11 +178,111 @@ async def run_chat(config: Config, message_queue: asyncio.Queue) -> None:
         model=config.model,
         persona=config.persona,
         stream=config.stream,
-        server=config.server
+        server=config.server,
+        multi_persona=config.multi_persona,
+        segment_stream=config.segment_stream,
+        flush_policy=flush_policy_from_config(config),
+        dashboard=StreamDashboard(compact=config.dashboard == "compact") if config.dashboard else None,
+        cmd=config.cmd if config.mode == "subprocess" else None,
+        workers=config.workers,
+        max_line_bytes=config.max_line_bytes,
+        conversation_store=conversation_store,
+        conversation_turns=config.conversation_turns,
+        reassembly=ReassemblyBuffer(
+            ttl=config.partial_ttl,
+            max_stream_bytes=config.partial_max_bytes,
+            max_total_bytes=config.partial_total_bytes
+        )
     )
 
     # start the chat
-    await handler.run()
+    try:
+        await handler.run()
+    finally:
+        if conversation_store is not None:
+            conversation_store.close()
+
+async def run_relay(config: Config, message_queue: asyncio.Queue) -> None:
+    """
+    Relay frames from the server socket to the output adapter without parsing or rendering them.
+    """
+    # create the adapters
+    input_adapter = create_input_adapter(config, message_queue)
+    output_adapter = create_output_adapter(config)
+
+    # relay until the input ends
+    await start_adapters(input_adapter, output_adapter)
+    try:
+        await handle_relay(input_adapter, output_adapter)
+    finally:
+        await stop_adapters(input_adapter, output_adapter)
+
+async def run_pipeline(config: Config, message_queue: asyncio.Queue) -> None:
+    """
+    Run the configured stages as an in-process pipeline between the input and output adapters.
+    """
+    # create the adapters
+    input_adapter = create_input_adapter(config, message_queue)
+    output_adapter = create_output_adapter(config)
+
+    # setup the pipeline, either a DAG from a definition file or a simple chain
+    if config.pipeline_file:
+        pipeline = build_dag_pipeline(
+            load_pipeline_definition(config.pipeline_file),
+            provider=config.provider,
+            model=config.model,
+            input_adapter=input_adapter,
+            output_adapter=output_adapter,
+            stream=config.stream,
+            segment_stream=config.segment_stream,
+            keep_alive=config.server,
+            flush_policy=flush_policy_from_config(config)
+        )
+    else:
+        pipeline = Pipeline.from_specs(
+            config.pipeline,
+            provider=config.provider,
+            model=config.model,
+            input_adapter=input_adapter,
+            output_adapter=output_adapter,
+            stream=config.stream,
+            segment_stream=config.segment_stream,
+            queue_size=config.pipeline_queue_size,
+            keep_alive=config.server,
+            flush_policy=flush_policy_from_config(config)
+        )
+
+    # run the pipeline
+    await start_adapters(input_adapter, output_adapter)
+    try:
+        await pipeline.run()
+    finally:
+        await stop_adapters(input_adapter, output_adapter)
+
+async def run_batch(config: Config) -> None:
+    """
+    Answer every request of the --batch file and append the results to the --batch-output file.
+    """
+    if config.mode == "subprocess":
+        # one pool of external responders answers every request
+        handler, _ = create_response_handler(config.mode, config.provider, config.model, cmd=config.cmd,
+                                             workers=config.workers, max_line_bytes=config.max_line_bytes)
+        handler_for = lambda persona: handler
+    else:
+        # requests may name their persona; handlers are pooled and share model clients
+        handler = None
+        pool = ResponseHandlerPool(config.mode, config.provider, config.model, default_persona=config.persona)
+        handler_for = lambda persona: pool.get(persona)[0]
+
+    runner = BatchRunner(handler_for, config.batch, output_path=config.batch_output, concurrency=config.batch_concurrency)
+    try:
+        summary = await runner.run()
+    finally:
+        if handler is not None:
+            await handler.close()
+    result = f"{summary.succeeded} succeeded, {summary.failed} failed, {summary.skipped} skipped; results in {runner.output_path}"
+    logger.info(f"Batch finished: {result}")
+    print_panel("Batch", result, "system")
 
 async def run_app(config: Config) -> None:
     """
@@ -50,19 +290,43 @@ async def run_app(config: Config) -> None:
     
     :param config: Configuration object.
     """
-    # setup a message queue
-    message_queue = asyncio.Queue()
+    # check the options before starting anything
+    validate_config(config)
+
+    # a batch runs on its own, without adapters
+    if config.batch:
+        await run_batch(config)
+        return
+
+    # setup a message queue, kept on disk across restarts with --durable-queue
+    if config.durable_queue:
+        message_queue = DurableQueue(config.durable_queue, visibility_timeout=config.visibility_timeout)
+        await message_queue.open()
+    else:
+        message_queue = asyncio.Queue()
+
+    # a relay, a pipeline of stages or a single chat handler consumes the input
+    if config.relay:
+        run_consumer = run_relay
+    elif config.pipeline or config.pipeline_file:
+        run_consumer = run_pipeline
+    else:
+        run_consumer = run_chat
 
     # check if we're running as a server
     if config.server:
         # Server mode: run both the server and chat handler concurrently
-        await asyncio.gather(
-            start_server(config.server_ws_uri, message_queue),
-            run_chat(config, message_queue)
-        )
+        try:
+            await asyncio.gather(
+                start_server(config.server_ws_uri, message_queue, relay=config.relay),
+                run_consumer(config, message_queue)
+            )
+        finally:
+            if config.durable_queue:
+                await message_queue.close()
     else:
         # Client mode: just run the chat handler
-        await run_chat(config, message_queue)
+        await run_consumer(config, message_queue)
 
 def main():
     # setup logging
@@ -71,8 +335,43 @@ def main():
     # get the config
     config = parse_args()
 
+    # skip all rendering (and never load Rich) on headless hosts
+    if config.headless:
+        set_headless()
+    set_refresh_rate(config.ui_refresh_rate)
+
+    # encode websocket frames with the configured codec (adapters pick it up when created)
+    configure_codec(config.codec)
+
+    # draw on a separate thread so a slow terminal can't hold up the event loop
+    render_thread = None
+    if config.render_thread and not config.headless:
+        render_thread = RenderThread(max_pending=config.render_queue_size)
+        render_thread.start()
+        set_render_thread(render_thread)
+
+    # a stalled streaming client can hold up an answer for at most this long
+    get_credit_ledger().stall_timeout = config.credit_timeout
+
+    # setup the process-wide persona registry
+    configure_persona_registry(
+        personas_file=config.personas_file,
+        persona_dirs=config.personas_dirs,
+        reload_interval=config.personas_reload_interval
+    )
+
+    # record spans for every request this hop handles
+    if config.trace_file:
+        configure_tracer(trace_hop_name(config), create_span_exporter(config.trace_file, config.trace_format))
+
     # run the app
-    asyncio.run(run_app(config))
+    try:
+        asyncio.run(run_app(config))
+    finally:
+        if render_thread is not None:
+            set_render_thread(None)
+            render_thread.stop()
+        get_tracer().close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,102 @@
+# messages/codec.py
+import json
+import threading
+from typing import Any, Union
+
+# optional faster serializers, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+Frame = Union[str, bytes]
+
+class JsonCodec:
+    """Frames as JSON text using the standard library."""
+    name = "json"
+    binary = False
+
+    def encode(self, data: Any) -> str:
+        return json.dumps(data)
+
+    def decode(self, frame: Frame) -> Any:
+        return json.loads(frame)
+
+
+class OrjsonCodec:
+    """Frames as JSON text using orjson; the wire format is the same as JsonCodec's."""
+    name = "orjson"
+    binary = False
+
+    def encode(self, data: Any) -> str:
+        # orjson raises JSONEncodeError, a TypeError, for data it can't serialize
+        return orjson.dumps(data).decode("utf-8")
+
+    def decode(self, frame: Frame) -> Any:
+        return orjson.loads(frame)
+
+
+class MsgpackCodec:
+    """Frames as msgpack (binary websocket frames); every hop of a chain must use it."""
+    name = "msgpack"
+    binary = True
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data)
+
+    def decode(self, frame: Frame) -> Any:
+        if isinstance(frame, str):
+            raise ValueError("Expected a binary msgpack frame, got text.")
+        try:
+            return msgpack.unpackb(frame)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack frame: {e}")
+
+
+def json_codec():
+    """Return the fastest available JSON codec."""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
+
+def create_codec(name: str = "json"):
+    """
+    Create a codec by name. 'json' uses orjson when it is installed and the standard
+    library otherwise; 'orjson' and 'msgpack' require their packages.
+    Raises ValueError for unknown or unavailable codecs.
+    """
+    if name == "json":
+        return json_codec()
+    elif name == "orjson":
+        if orjson is None:
+            raise ValueError("The orjson codec requires the orjson package.")
+        return OrjsonCodec()
+    elif name == "msgpack":
+        if msgpack is None:
+            raise ValueError("The msgpack codec requires the msgpack package.")
+        return MsgpackCodec()
+    else:
+        raise ValueError(f"Unknown codec: {name}")
+
+_codec = json_codec()
+_codec_lock = threading.Lock()
+
+def get_codec():
+    """Return the process-wide codec for websocket frames."""
+    return _codec
+
+def get_text_codec():
+    """Return the process-wide codec if it writes text, else the fastest JSON codec (for line-framed pipes)."""
+    return _codec if not _codec.binary else json_codec()
+
+def configure_codec(name: str):
+    """Replace the process-wide codec."""
+    global _codec
+    with _codec_lock:
+        _codec = create_codec(name)
+        return _codec
@@ -13,17 +13,26 @@ class MessageType(str, Enum):
     CHAT = "chat"
     HEALTHCHECK = "healthcheck"
 
+class TraceContext(BaseModel):
+    trace_id: str = Field(..., description="Trace shared by every hop that handles the request.")
+    parent_span_id: Optional[str] = Field(None, description="Span of the upstream hop that sent this message.")
+    sent_at: Optional[float] = Field(None, description="Unix time the upstream hop sent this message.")
+    received_at: Optional[float] = Field(None, description="Unix time this hop's ingress received the message.")
+    queued_at: Optional[float] = Field(None, description="Unix time this hop's ingress validated and queued the message.")
+
 class MessageBase(BaseModel):
     request_id: UUID4 = Field(default_factory=uuid.uuid4, description="Unique ID for correlating requests/responses.")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Timestamp of when the message was received.")
     role: MessageRole = Field(..., description="Role of the message sender.")
     type: MessageType = Field(..., description="Type of the message.")
+    trace: Optional[TraceContext] = Field(None, description="Trace context propagated across hops.")
 
 class ChatMessage(MessageBase):
     type: Literal[MessageType.CHAT] = MessageType.CHAT
     message: str = Field(..., description="The message content.")
     partial: bool = Field(False, description="Indicates if this is a partial/streamed message.")
     message_number: Optional[int] = Field(None, description="Sequence number for partial/streamed messages.")
+    persona: Optional[str] = Field(None, description="Persona that should handle this message (multi-persona servers).")
 
     @model_validator(mode="after")
     def validate_non_partial_has_message(cls, model):
@@ -0,0 +1,219 @@
+# pipeline/dag.py
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional
+from adapters.input.input_adapter import InputAdapter
+from adapters.input.queue_input_adapter import QueueInput
+from adapters.output.output_adapter import OutputAdapter
+from .pipeline import Pipeline
+from .stage import PipelineStage
+
+log = logging.getLogger(__name__)
+
+STAGE_TYPES = ("persona", "llm", "forwarder", "human")
+MERGE_STRATEGIES = ("concat", "join")
+
+
+class FanOutOutput(OutputAdapter):
+    """
+    Writes every frame to the input queues of all downstream stages.
+    Frames are tagged with the producing stage so a fan-in stage can tell its inputs apart.
+    """
+    def __init__(self, queues: List[asyncio.Queue], stage: Optional[str] = None):
+        self.queues = queues
+        self.stage = stage
+
+    async def write_message(self, data: dict):
+        if self.stage:
+            data = {**data, "stage": self.stage}
+        # a full (bounded) downstream queue holds this stage back
+        for queue in self.queues:
+            await queue.put(data)
+
+    async def stop(self):
+        for queue in self.queues:
+            await queue.put(None)
+
+
+class FanInInput(InputAdapter):
+    """
+    Merges the answers of several upstream stages into one message per request_id.
+
+    Frames from each source are reassembled until that source's final frame arrives; once
+    every source has finished a request, a single complete message with the merged text is
+    returned. Requests still incomplete when all sources have ended are merged from whatever
+    arrived.
+    """
+    def __init__(self, input_adapter: InputAdapter, sources: List[str], merge: str = "concat"):
+        self.input_adapter = input_adapter
+        self.sources = sources
+        self.merge = merge
+        self._pending: Dict[str, Dict[str, List[str]]] = {}
+        self._finished: Dict[str, set] = {}
+        self._traces: Dict[str, Optional[dict]] = {}
+
+    async def read_message(self) -> dict:
+        while True:
+            try:
+                frame = await self.input_adapter.read_message()
+            except EOFError:
+                if not self._pending:
+                    raise
+                request_id = next(iter(self._pending))
+                log.debug(f"Merging incomplete request {request_id} after upstream ended.")
+                return self._merged(request_id)
+
+            request_id = frame.get("request_id")
+            source = frame.get("stage")
+            parts = self._pending.setdefault(request_id, {})
+            self._traces.setdefault(request_id, frame.get("trace"))
+            parts.setdefault(source, []).append(frame.get("message") or "")
+
+            if not frame.get("partial", False):
+                finished = self._finished.setdefault(request_id, set())
+                finished.add(source)
+                if finished.issuperset(self.sources):
+                    return self._merged(request_id)
+
+    async def stop(self):
+        await self.input_adapter.stop()
+
+    def _merged(self, request_id: str) -> dict:
+        parts = self._pending.pop(request_id)
+        self._finished.pop(request_id, None)
+        trace = self._traces.pop(request_id, None)
+
+        # keep the declared input order, not arrival order
+        texts = [(source, "".join(parts[source]).strip()) for source in self.sources if source in parts]
+        if self.merge == "concat":
+            message = "\n\n".join(f"[{source}]\n{text}" for source, text in texts)
+        else:
+            message = "\n\n".join(text for _, text in texts)
+
+        merged = {"role": "Questioner", "message": message, "partial": False, "request_id": request_id}
+        if trace:
+            # the merged request continues the trace of its first upstream answer
+            merged["trace"] = trace
+        return merged
+
+
+def load_pipeline_definition(path: str) -> List[dict]:
+    """Read the list of stage definitions from a pipeline definition (JSON) file."""
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid pipeline definition {path}: {e}")
+
+    stages = data.get("stages") if isinstance(data, dict) else None
+    if not isinstance(stages, list) or not stages:
+        raise ValueError(f"Pipeline definition {path} must contain a non-empty 'stages' list.")
+    return stages
+
+
+def validate_stages(stages: List[dict]) -> List[str]:
+    """
+    Check a list of stage definitions and return the stage names in topological order.
+    Raises ValueError describing the first problem found.
+    """
+    names = []
+    for stage in stages:
+        name = stage.get("name")
+        if not name:
+            raise ValueError("Every pipeline stage needs a name.")
+        if name in names:
+            raise ValueError(f"Duplicate pipeline stage '{name}'.")
+        names.append(name)
+
+        stage_type = stage.get("type", "persona")
+        if stage_type not in STAGE_TYPES:
+            raise ValueError(f"Stage '{name}' has unknown type '{stage_type}'.")
+        if stage_type == "persona" and not stage.get("persona"):
+            raise ValueError(f"Stage '{name}' of type persona needs a persona.")
+        if stage.get("merge", "concat") not in MERGE_STRATEGIES:
+            raise ValueError(f"Stage '{name}' has unknown merge strategy '{stage.get('merge')}'.")
+        if int(stage.get("concurrency", 1)) < 1 or int(stage.get("buffer", 0)) < 0:
+            raise ValueError(f"Stage '{name}' needs concurrency >= 1 and buffer >= 0.")
+        if int(stage.get("concurrency", 1)) > 1 and stage.get("history", True):
+            # concurrent requests would interleave in one conversation
+            raise ValueError(f"Stage '{name}' answers requests concurrently, so it needs \"history\": false.")
+
+    inputs = {stage["name"]: list(stage.get("inputs", [])) for stage in stages}
+    for name, stage_inputs in inputs.items():
+        for source in stage_inputs:
+            if source not in inputs:
+                raise ValueError(f"Stage '{name}' reads from unknown stage '{source}'.")
+
+    # Kahn's algorithm, keeping definition order among ready stages
+    order = []
+    remaining = dict(inputs)
+    while remaining:
+        ready = [name for name in names if name in remaining and not set(remaining[name]) - set(order)]
+        if not ready:
+            raise ValueError(f"Pipeline stages form a cycle: {', '.join(remaining)}.")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+    return order
+
+
+def build_dag_pipeline(stages: List[dict], provider: str, model: str, input_adapter, output_adapter,
+                       stream: bool = False, segment_stream: bool = False, keep_alive: bool = False,
+                       flush_policy=None) -> Pipeline:
+    """
+    Wire stage definitions into a Pipeline.
+
+    Stages without inputs read from the input adapter, stages nobody reads from write to
+    the output adapter, a stage read by several stages fans out to all of them, and a
+    stage with several inputs merges their answers per request (fan-in).
+    """
+    validate_stages(stages)
+
+    inboxes = {stage["name"]: asyncio.Queue(maxsize=int(stage.get("buffer", 0))) for stage in stages}
+    consumers = {stage["name"]: [] for stage in stages}
+    for stage in stages:
+        for source in stage.get("inputs", []):
+            consumers[source].append(stage["name"])
+
+    roots = [stage["name"] for stage in stages if not stage.get("inputs")]
+    terminals = [name for name, readers in consumers.items() if not readers]
+    sink_queue = asyncio.Queue()
+
+    pipeline_stages = []
+    for stage in stages:
+        name = stage["name"]
+        stage_inputs = stage.get("inputs", [])
+
+        if len(stage_inputs) > 1:
+            stage_input = FanInInput(QueueInput(inboxes[name], producers=len(stage_inputs)), stage_inputs, stage.get("merge", "concat"))
+        else:
+            stage_input = QueueInput(inboxes[name])
+
+        queues = [inboxes[reader] for reader in consumers[name]]
+        if name in terminals:
+            queues.append(sink_queue)
+
+        pipeline_stages.append(PipelineStage.create(
+            name,
+            stage.get("type", "persona"),
+            stage.get("persona"),
+            stage.get("provider", provider),
+            stage.get("model", model),
+            stage_input,
+            FanOutOutput(queues, stage=name),
+            stream=stream,
+            segment_stream=segment_stream,
+            concurrency=int(stage.get("concurrency", 1)),
+            keep_history=bool(stage.get("history", True)),
+            flush_policy=flush_policy
+        ))
+
+    return Pipeline(
+        pipeline_stages,
+        input_adapter,
+        output_adapter,
+        FanOutOutput([inboxes[name] for name in roots]),
+        QueueInput(sink_queue, producers=len(terminals)),
+        keep_alive=keep_alive
+    )
@@ -0,0 +1,121 @@
+# pipeline/pipeline.py
+import asyncio
+import logging
+import time
+import uuid
+from typing import List
+from adapters.input.queue_input_adapter import QueueInput
+from adapters.output.queue_output_adapter import QueueOutput
+from tracing.tracer import get_tracer
+from .stage import PipelineStage
+
+log = logging.getLogger(__name__)
+
+class Pipeline:
+    """
+    Runs an ordered list of pipeline stages in one process.
+
+    Messages from the input adapter flow through the stages over in-memory queues and
+    the last stage's frames are written to the output adapter, replacing a chain of
+    websocket hops between separate processes. The source writes to source_output and
+    the sink reads from sink_input, so stages can be wired as a chain or as a DAG.
+    """
+
+    def __init__(self, stages: List[PipelineStage], input_adapter, output_adapter, source_output, sink_input, keep_alive: bool = False):
+        self.stages = stages
+        self.input_adapter = input_adapter
+        self.output_adapter = output_adapter
+        self.source_output = source_output
+        self.sink_input = sink_input
+        # in server mode input errors are transient and the pipeline keeps reading
+        self.keep_alive = keep_alive
+
+    @classmethod
+    def from_specs(cls, specs: List[str], provider: str, model: str, input_adapter, output_adapter, stream: bool = False, segment_stream: bool = False, queue_size: int = 0, keep_alive: bool = False,
+                   flush_policy=None):
+        """Build a pipeline from --pipeline entries, connecting consecutive stages with queues."""
+        if not specs:
+            raise ValueError("A pipeline needs at least one stage.")
+
+        # one queue in front of every stage plus one for the sink
+        queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(specs) + 1)]
+        stages = [
+            PipelineStage.from_spec(spec, provider, model, QueueInput(queues[i]), QueueOutput(queues[i + 1]), stream=stream, segment_stream=segment_stream, flush_policy=flush_policy)
+            for i, spec in enumerate(specs)
+        ]
+        return cls(stages, input_adapter, output_adapter, QueueOutput(queues[0]), QueueInput(queues[-1]), keep_alive=keep_alive)
+
+    async def run(self):
+        """Run the source, every stage and the sink until the input is exhausted."""
+        await asyncio.gather(
+            self._source(),
+            *(stage.run() for stage in self.stages),
+            self._sink()
+        )
+
+    async def _source(self):
+        tracer = get_tracer()
+        # frames sent without a request_id belong to one stream until its final frame
+        unlabelled_request_id = None
+        try:
+            while True:
+                try:
+                    msg = await self.input_adapter.read_message()
+                except EOFError as e:
+                    if self.keep_alive:
+                        log.debug(f"Pipeline input read error: {e}. Attempting to continue.")
+                        await asyncio.sleep(0.5)
+                        continue
+                    log.debug(f"Pipeline input ended: {e}")
+                    break
+
+                if not msg.get("partial", False) and (msg.get("message") or "").strip().lower() == "exit":
+                    break
+
+                # frames of one message must share a request_id to be reassembled
+                if "request_id" not in msg:
+                    unlabelled_request_id = unlabelled_request_id or str(uuid.uuid4())
+                    msg["request_id"] = unlabelled_request_id
+                    if not msg.get("partial", False):
+                        unlabelled_request_id = None
+
+                if tracer.enabled and not msg.get("trace"):
+                    msg["trace"] = {**tracer.start_trace(msg["request_id"]), "sent_at": time.time()}
+                await self.source_output.write_message(msg)
+        finally:
+            await self.source_output.stop()
+
+    async def _sink(self):
+        # adapters that cannot show partial frames get one complete message per request
+        streams_partials = getattr(self.output_adapter, "streams_partials", True)
+        pending = {}
+
+        while True:
+            try:
+                frame = await self.sink_input.read_message()
+            except EOFError:
+                break
+
+            if streams_partials:
+                await self._write(frame)
+                continue
+
+            # answers from parallel terminal stages are told apart by their stage tag
+            key = (frame.get("request_id"), frame.get("stage"))
+            pending.setdefault(key, []).append(frame.get("message") or "")
+            if not frame.get("partial", False):
+                message = {
+                    "role": frame.get("role", "Responder"),
+                    "message": "".join(pending.pop(key)),
+                    "partial": False,
+                    "request_id": key[0]
+                }
+                if key[1]:
+                    message["stage"] = key[1]
+                await self._write(message)
+
+    async def _write(self, frame: dict):
+        try:
+            await self.output_adapter.write_message(frame)
+        except Exception as e:
+            log.debug(f"Failed to write pipeline output: {e}")
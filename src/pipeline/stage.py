@@ -0,0 +1,196 @@
+# pipeline/stage.py
+import asyncio
+import dataclasses
+import logging
+import time
+import uuid
+from typing import Optional, Tuple
+from chat_handler.conversation_manager import ConversationManager
+from chat_handler.flush_policy import FlushPolicy
+from chat_handler.response_utils import get_response, safe_get_response, send_final_message, traced_message
+from chat_handler.segmented_response import SegmentedResponder, segment_responder
+from response_handlers.response_handler_factory import create_response_handler
+from response_handlers.llm_client import get_shared_client
+from tracing.tracer import get_tracer
+
+log = logging.getLogger(__name__)
+
+# stage specs that name a mode rather than a persona
+STAGE_MODES = ("human", "llm", "forwarder")
+
+def parse_stage_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """
+    Turn a --pipeline entry into a (mode, persona) pair.
+    'forwarder', 'llm' and 'human' select that mode, anything else is a persona name.
+    """
+    if spec in STAGE_MODES:
+        return spec, None
+    return "persona", spec
+
+class PipelineStage:
+    """
+    Runs one response handler as a stage of an in-process pipeline.
+
+    The stage reads message frames from its input adapter, reassembles partial frames
+    per request_id, and writes the handler's answer (streamed as partial frames when
+    streaming is enabled) to its output adapter, using the same frame format as the
+    websocket chain. Nothing is serialized or rendered.
+
+    With concurrency > 1, up to that many requests are answered at once; frames of
+    different requests then interleave downstream, each under its own request_id.
+    Such a stage answers every request on its own, so keep_history must be False.
+    """
+
+    def __init__(self, name: str, responder_handler, input_adapter, output_adapter, stream: bool = False,
+                 segment_stream: bool = False, concurrency: int = 1, keep_history: bool = True,
+                 flush_policy: Optional[FlushPolicy] = None):
+        self.name = name
+        self.responder_handler = responder_handler
+        self.input_adapter = input_adapter
+        self.output_adapter = output_adapter
+        self.stream = stream
+        # answer complete sentences while upstream is still streaming
+        self.segment_stream = segment_stream and stream and hasattr(responder_handler, "get_response_stream")
+        self.concurrency = max(1, concurrency)
+        if self.concurrency > 1 and keep_history:
+            raise ValueError(f"Stage {name} can't keep history while answering requests concurrently.")
+        self.keep_history = keep_history
+        # each stage measures the latency of its own output
+        self.flush_policy = dataclasses.replace(flush_policy) if flush_policy else FlushPolicy()
+
+        # by default each stage keeps its own history, as a separate chain process would
+        self.conversation_manager = ConversationManager()
+
+    @classmethod
+    def create(cls, name: str, mode: str, persona: Optional[str], provider: str, model: str, input_adapter, output_adapter, **kwargs):
+        """Create a stage whose responder is built for the given mode and persona."""
+        # llm backed stages in one process share a single model client
+        llm_client = get_shared_client(provider, model) if mode in ("llm", "persona") else None
+        responder_handler, _ = create_response_handler(mode, provider, model, persona, llm_client=llm_client)
+        return cls(name, responder_handler, input_adapter, output_adapter, **kwargs)
+
+    @classmethod
+    def from_spec(cls, spec: str, provider: str, model: str, input_adapter, output_adapter, stream: bool = False, segment_stream: bool = False,
+                  flush_policy: Optional[FlushPolicy] = None):
+        """Create a stage from a --pipeline entry such as 'forwarder' or 'english_german_translator'."""
+        mode, persona = parse_stage_spec(spec)
+        return cls.create(spec, mode, persona, provider, model, input_adapter, output_adapter, stream=stream, segment_stream=segment_stream,
+                          flush_policy=flush_policy)
+
+    async def run(self):
+        """Process messages until the input ends, then signal the end downstream."""
+        chunks = {}
+        segmented = {}
+        traces = {}
+        tracer = get_tracer()
+        slots = asyncio.Semaphore(self.concurrency)
+        in_flight = set()
+        try:
+            while True:
+                try:
+                    msg = await self.input_adapter.read_message()
+                    read_at = time.time()
+                except EOFError:
+                    break
+
+                request_id = str(msg.get("request_id") or uuid.uuid4())
+                text = msg.get("message") or ""
+
+                if request_id not in traces:
+                    traces[request_id] = tracer.continue_trace(msg.get("trace"), request_id)
+                    if traces[request_id]:
+                        traces[request_id]["received_at"] = read_at
+                if not msg.get("partial", False):
+                    tracer.record_ingress(traces[request_id], msg.get("trace"), read_at)
+
+                if self.segment_stream and (msg.get("partial", False) or request_id in segmented):
+                    if request_id not in segmented:
+                        segmented[request_id] = self._segmented_responder(request_id, traces[request_id])
+
+                    if msg.get("partial", False):
+                        segmented[request_id].feed(text)
+                    else:
+                        await segmented.pop(request_id).finish(text)
+                        trace = traces.pop(request_id)
+                        await send_final_message(self.output_adapter, request_id, trace)
+                        tracer.end_hop(trace, read_at, request_id=request_id, stage=self.name, segmented=True)
+                    continue
+
+                chunks.setdefault(request_id, []).append(text)
+
+                if msg.get("partial", False):
+                    continue
+
+                prompt = "".join(chunks.pop(request_id))
+                trace = traces.pop(request_id)
+                if self.concurrency == 1:
+                    await self.respond(prompt, request_id, trace)
+                    continue
+
+                # wait for a free slot, so a busy stage pushes back on its input queue
+                await slots.acquire()
+                task = asyncio.create_task(self._respond_in_slot(slots, prompt, request_id, trace))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            for responder in segmented.values():
+                responder.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            await self.output_adapter.stop()
+
+    async def _respond_in_slot(self, slots: asyncio.Semaphore, prompt: str, request_id: str, trace: Optional[dict] = None):
+        try:
+            await self.respond(prompt, request_id, trace)
+        finally:
+            slots.release()
+
+    def _segmented_responder(self, request_id: str, trace: Optional[dict] = None) -> SegmentedResponder:
+        conversation_manager = self.conversation_manager if self.keep_history else ConversationManager()
+        return segment_responder(self.responder_handler, self.output_adapter, conversation_manager, request_id, self.name,
+                                 trace=trace, flush_policy=self.flush_policy)
+
+    async def respond(self, prompt: str, request_id: str, trace: Optional[dict] = None) -> str:
+        """
+        Answer a complete prompt and write the frames for it downstream.
+        trace is the hop's trace context (see Tracer.continue_trace), if tracing is enabled.
+        """
+        started = time.time()
+        if not prompt.strip():
+            # an empty final frame still closes the request, e.g. for a fan-in stage waiting on it
+            log.debug(f"Stage {self.name} skipping empty prompt for {request_id}.")
+            await send_final_message(self.output_adapter, request_id, trace)
+            return ""
+
+        # without history every request is answered on its own
+        conversation_manager = self.conversation_manager if self.keep_history else ConversationManager()
+
+        conversation_manager.add_message("questioner", prompt)
+        answer = await safe_get_response(
+            lambda q: get_response(
+                self.responder_handler,
+                self.output_adapter,
+                q,
+                conversation_manager.get_conversation(),
+                self.stream,
+                self.name,
+                None,
+                request_id=request_id,
+                trace=trace,
+                flush_policy=self.flush_policy
+            ),
+            prompt
+        )
+        conversation_manager.add_message("responder", answer)
+
+        if not (self.stream and hasattr(self.responder_handler, "get_response_stream")):
+            # get_response only writes frames when it streams
+            await self.output_adapter.write_message(traced_message({
+                "role": "Responder",
+                "message": answer,
+                "partial": False,
+                "request_id": request_id
+            }, trace))
+
+        get_tracer().end_hop(trace, started, request_id=request_id, stage=self.name)
+        return answer
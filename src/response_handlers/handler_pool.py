@@ -0,0 +1,48 @@
+# response_handlers/handler_pool.py
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .llm_client import get_shared_client
+from .response_handler_factory import create_response_handler
+
+log = logging.getLogger(__name__)
+
+class ResponseHandlerPool:
+    """
+    Hands out response handlers per persona for a single server process.
+
+    Handlers are created on first use and kept in a bounded LRU pool, and every
+    handler for the same provider/model reuses one shared LLM client, so memory and
+    connections scale with the personas actually in use rather than those configured.
+    """
+
+    def __init__(self, mode: str, provider: str, model: str, default_persona: Optional[str] = None, max_handlers: int = 64):
+        self.mode = mode
+        self.provider = provider
+        self.model = model
+        self.default_persona = default_persona
+        self.max_handlers = max_handlers
+        self._handlers: "OrderedDict[Optional[str], Tuple[object, str]]" = OrderedDict()
+
+    def get(self, persona: Optional[str] = None) -> Tuple[object, str]:
+        """
+        Return the (handler, description) pair for the persona, or for the default persona if none is given.
+        Raises ValueError if the persona is unknown.
+        """
+        key = persona or self.default_persona
+        if key in self._handlers:
+            self._handlers.move_to_end(key)
+            return self._handlers[key]
+
+        # only llm backed modes need a model client
+        llm_client = get_shared_client(self.provider, self.model) if self.mode in ("llm", "persona") else None
+        entry = create_response_handler(self.mode, self.provider, self.model, key, llm_client=llm_client)
+
+        self._handlers[key] = entry
+        if len(self._handlers) > self.max_handlers:
+            evicted, _ = self._handlers.popitem(last=False)
+            log.debug(f"Evicted response handler for persona '{evicted}' from pool.")
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._handlers)
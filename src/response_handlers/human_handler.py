@@ -1,11 +1,12 @@
 # response_handlers/human_handler.py
 import asyncio
-from rich.console import Console
-
-console = Console()
 
 class HumanHandler:
     async def get_response(self, question: str, conversation: list) -> str:
+        # imported here so processes without a human responder never load Rich
+        from rich.console import Console
+        console = Console()
+
         loop = asyncio.get_running_loop()
         answer = await loop.run_in_executor(None, console.input, "[bold cyan]Your answer:[/bold cyan] ")
         return answer
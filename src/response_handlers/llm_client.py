@@ -5,7 +5,8 @@ import ollama
 from openai import OpenAI
 from dotenv import load_dotenv
 import logging
-from typing import Dict, Any, List, Generator
+import threading
+from typing import Dict, Any, List, Generator, Tuple
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +26,15 @@ class LLMClient:
         if self.provider == "ollama" and not hasattr(ollama, "chat"):
             raise ValueError("Ollama is not properly configured in this environment.")
 
+        # the provider sdk client is created on first use and then reused
+        self._openai_client = None
+
+    def _get_openai_client(self):
+        """Return the OpenAI client, creating it on first use so its connection pool is reused."""
+        if self._openai_client is None:
+            self._openai_client = OpenAI(api_key=self.api_key)
+        return self._openai_client
+
     def create_completion(self, messages: List[Dict], tools: List = None) -> Dict[str, Any]:
         """Create a chat completion using the specified LLM provider (non-streaming)."""
         if self.provider == "openai":
@@ -51,7 +61,7 @@ class LLMClient:
 
     def _openai_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
         """Handle OpenAI chat completions (non-streaming)."""
-        client = OpenAI(api_key=self.api_key)
+        client = self._get_openai_client()
 
         try:
             response = client.chat.completions.create(
@@ -69,7 +79,7 @@ class LLMClient:
 
     def _openai_completion_stream(self, messages: List[Dict], tools: List) -> Generator[str, None, None]:
         """Handle OpenAI chat completions (streaming)."""
-        client = OpenAI(api_key=self.api_key)
+        client = self._get_openai_client()
 
         try:
             response = client.chat.completions.create(
@@ -149,3 +159,16 @@ class LLMClient:
         except Exception as e:
             logging.error(f"Ollama API Error (stream): {str(e)}")
             raise ValueError(f"Ollama API Error: {str(e)}")
+
+
+# clients shared across handlers, keyed by (provider, model)
+_shared_clients: Dict[Tuple[str, str], LLMClient] = {}
+_shared_clients_lock = threading.Lock()
+
+def get_shared_client(provider: str, model: str) -> LLMClient:
+    """Return a process-wide LLMClient for the provider and model, creating it if needed."""
+    key = (provider, model)
+    with _shared_clients_lock:
+        if key not in _shared_clients:
+            _shared_clients[key] = LLMClient(provider=provider, model=model)
+        return _shared_clients[key]
@@ -3,14 +3,14 @@ from typing import List, Dict
 from .llm_client import LLMClient
 
 class LLMHandler:
-    def __init__(self, provider: str, model: str, system_prompt: str = None):
+    def __init__(self, provider: str, model: str, system_prompt: str = None, llm_client: LLMClient = None):
         # set the provider, model and system prompt
         self.provider = provider
         self.model = model
         self.system_prompt = system_prompt
 
-        # set the llm client
-        self.llm_client = LLMClient(provider=provider, model=model)
+        # set the llm client (optionally a shared one)
+        self.llm_client = llm_client or LLMClient(provider=provider, model=model)
 
     def _build_messages(self, question: str, conversation: List[Dict]) -> List[Dict]:
         msgs = []
@@ -1,32 +1,30 @@
 # response_handlers/persona_handler.py
-import json
-import os
+import logging
+from typing import List, Dict
 from .llm_handler import LLMHandler
+from .llm_client import LLMClient
+from .persona_registry import get_persona_registry
+
+log = logging.getLogger(__name__)
 
 class PersonaHandler(LLMHandler):
-    def __init__(self, persona_name: str, provider: str = "ollama", model: str = "llama3.3"):
+    def __init__(self, persona_name: str, provider: str = "ollama", model: str = "llama3.3", llm_client: LLMClient = None):
         # set persona name and system prompt
         self.persona_name = persona_name
         self.system_prompt = self.load_system_prompt()
 
         # Initialize LLMHandler with the system prompt
-        super().__init__(provider=provider, model=model, system_prompt=self.system_prompt)
+        super().__init__(provider=provider, model=model, system_prompt=self.system_prompt, llm_client=llm_client)
 
 
     def load_system_prompt(self) -> str:
-        """Load the system prompt from personas.json based on the persona name."""
-        json_file = os.path.join(os.path.dirname(__file__), "../../personas.json")
-
-        # check we have a personas json
-        if not os.path.exists(json_file):
-            raise FileNotFoundError(f"personas.json not found at {json_file}")
-
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        """Load the system prompt for the persona from the process-wide persona registry."""
+        return get_persona_registry().get(self.persona_name).system_prompt
 
-        # check we found a persona
-        if self.persona_name not in data:
-            raise ValueError(f"No system prompt found for persona '{self.persona_name}'.")
-        
-        # set the system prompt
-        return data[self.persona_name]["system_prompt"]
\ No newline at end of file
+    def _build_messages(self, question: str, conversation: List[Dict]) -> List[Dict]:
+        # pick up hot-reloaded prompts; a request already in flight keeps the prompt it started with
+        try:
+            self.system_prompt = self.load_system_prompt()
+        except ValueError as e:
+            log.warning(f"Persona '{self.persona_name}' unavailable after reload, keeping previous prompt: {e}")
+        return super()._build_messages(question, conversation)
@@ -0,0 +1,177 @@
+# response_handlers/persona_registry.py
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# default location of the bundled personas file (repo root)
+DEFAULT_PERSONAS_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), "../../personas.json"))
+
+# words and individual punctuation marks, a cheap stand-in for a real tokenizer
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text without a model tokenizer."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+@dataclass(frozen=True)
+class Persona:
+    """A parsed persona along with data precomputed at load time."""
+    name: str
+    system_prompt: str
+    token_count: int
+    source: str
+
+
+class PersonaRegistry:
+    """
+    Process-wide, parse-once store of personas.
+
+    Personas are read from a main personas file plus any number of extra directories
+    of *.json files (later sources override earlier ones). The parsed personas are held
+    in an immutable snapshot; a reload builds a new snapshot and swaps it in, so callers
+    that already resolved a persona keep using it until they ask again.
+    """
+
+    def __init__(self,
+                 personas_file: str = DEFAULT_PERSONAS_FILE,
+                 persona_dirs: Optional[List[str]] = None,
+                 reload_interval: Optional[float] = 2.0):
+        self.personas_file = personas_file
+        self.persona_dirs = list(persona_dirs or [])
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._personas: Optional[Dict[str, Persona]] = None
+        self._fingerprint: Tuple = ()
+        self._last_check = 0.0
+
+    def get(self, name: str) -> Persona:
+        """Return the persona with the given name, loading or reloading if needed."""
+        personas = self._snapshot()
+        if name not in personas:
+            raise ValueError(f"No system prompt found for persona '{name}'.")
+        return personas[name]
+
+    def names(self) -> List[str]:
+        """Return the names of all known personas."""
+        return list(self._snapshot())
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the persona sources if they changed on disk (or always, if forced).
+        Returns True if a new snapshot was swapped in.
+        """
+        with self._lock:
+            fingerprint = self._source_fingerprint()
+            if not force and self._personas is not None and fingerprint == self._fingerprint:
+                return False
+
+            try:
+                personas = self._load(fingerprint)
+            except (OSError, ValueError) as e:
+                if self._personas is None:
+                    raise
+                # keep serving the last good snapshot, e.g. while a file is half-written
+                log.warning(f"Persona reload failed, keeping previous personas: {e}")
+                return False
+
+            self._personas = personas
+            self._fingerprint = fingerprint
+            log.debug(f"Loaded {len(personas)} personas from {len(fingerprint)} source(s).")
+            return True
+
+    def _snapshot(self) -> Dict[str, Persona]:
+        now = time.monotonic()
+        if self._personas is None:
+            self._last_check = now
+            self.reload()
+        elif self.reload_interval is not None and now - self._last_check >= self.reload_interval:
+            # a stat per source at most once per interval, re-parse only on change
+            self._last_check = now
+            self.reload()
+        return self._personas
+
+    def _source_files(self) -> List[str]:
+        files = [self.personas_file]
+        for directory in self.persona_dirs:
+            files.extend(sorted(glob.glob(os.path.join(directory, "*.json"))))
+        return files
+
+    def _source_fingerprint(self) -> Tuple:
+        fingerprint = []
+        for path in self._source_files():
+            try:
+                stat = os.stat(path)
+                fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def _load(self, fingerprint: Tuple) -> Dict[str, Persona]:
+        # check we have the main personas json
+        if not os.path.exists(self.personas_file):
+            raise FileNotFoundError(f"personas.json not found at {self.personas_file}")
+
+        personas: Dict[str, Persona] = {}
+        for path, mtime, _ in fingerprint:
+            if mtime is None:
+                continue
+
+            with open(path, "r", encoding="utf-8") as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid persona file {path}: {e}")
+            if not isinstance(data, dict):
+                raise ValueError(f"Invalid persona file {path}: expected an object of personas.")
+
+            for name, entry in data.items():
+                prompt = entry.get("system_prompt") if isinstance(entry, dict) else None
+                if not isinstance(prompt, str):
+                    log.warning(f"Skipping persona '{name}' in {path}: missing system_prompt.")
+                    continue
+                personas[name] = Persona(
+                    name=name,
+                    system_prompt=prompt,
+                    token_count=estimate_tokens(prompt),
+                    source=path
+                )
+        return personas
+
+
+# process-wide registry
+_registry: Optional[PersonaRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_persona_registry() -> PersonaRegistry:
+    """Return the process-wide persona registry, creating it with defaults if needed."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PersonaRegistry()
+        return _registry
+
+
+def configure_persona_registry(personas_file: Optional[str] = None,
+                               persona_dirs: Optional[List[str]] = None,
+                               reload_interval: Optional[float] = 2.0) -> PersonaRegistry:
+    """Replace the process-wide persona registry with one using the given sources."""
+    global _registry
+    with _registry_lock:
+        _registry = PersonaRegistry(
+            personas_file=personas_file or DEFAULT_PERSONAS_FILE,
+            persona_dirs=persona_dirs,
+            reload_interval=reload_interval
+        )
+        return _registry
@@ -1,19 +1,25 @@
 # response_handlers/response_handler_factory.py
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES
 from .human_handler import HumanHandler
 from .llm_handler import LLMHandler
 from .persona_handler import PersonaHandler
 from .forwarder_handler import ForwarderHandler
+from .subprocess_handler import SubprocessHandler
 
-def create_response_handler(mode: str, provider: str, model: str, persona: str = None):
+def create_response_handler(mode: str, provider: str, model: str, persona: str = None, llm_client=None, cmd=None, workers: int = 1, max_line_bytes: int = DEFAULT_MAX_LINE_BYTES):
     if mode == "human":
         return HumanHandler(), "Human"
     elif mode == "llm":
-        return LLMHandler(provider=provider, model=model), f"LLM ({provider}/{model})"
+        return LLMHandler(provider=provider, model=model, llm_client=llm_client), f"LLM ({provider}/{model})"
     elif mode == "persona":
         if not persona:
             raise ValueError("persona is required when mode=persona")
-        return PersonaHandler(persona_name=persona, provider=provider, model=model), f"Persona ({persona}, {provider}/{model})"
+        return PersonaHandler(persona_name=persona, provider=provider, model=model, llm_client=llm_client), f"Persona ({persona}, {provider}/{model})"
     elif mode == "forwarder":
         return ForwarderHandler(), "forwarder"
+    elif mode == "subprocess":
+        if not cmd:
+            raise ValueError("cmd is required when mode=subprocess")
+        return SubprocessHandler(cmd, workers=workers, max_line_bytes=max_line_bytes), f"Subprocess ({' '.join(cmd)}, {workers} workers)"
     else:
         raise ValueError(f"Unknown mode: {mode}")
@@ -0,0 +1,20 @@
+# response_handlers/subprocess_handler.py
+from typing import Dict, List
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES
+from .subprocess_pool import SubprocessPool
+
+class SubprocessHandler:
+    def __init__(self, cmd: List[str], workers: int = 1, max_line_bytes: int = DEFAULT_MAX_LINE_BYTES):
+        # answers come from a pool of long-lived external responder processes
+        self.pool = SubprocessPool(cmd, workers=workers, max_line_bytes=max_line_bytes)
+
+    async def get_response(self, question: str, conversation: List[Dict]) -> str:
+        return await self.pool.request(question, conversation)
+
+    async def get_response_stream(self, question: str, conversation: List[Dict]):
+        # partial chunks are passed on as the worker writes them
+        async for chunk in self.pool.stream(question, conversation):
+            yield chunk
+
+    async def close(self):
+        await self.pool.close()
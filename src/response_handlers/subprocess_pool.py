@@ -0,0 +1,200 @@
+# response_handlers/subprocess_pool.py
+import asyncio
+import logging
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES, decode_line, encode_line
+
+log = logging.getLogger(__name__)
+
+class SubprocessWorker:
+    """
+    One long-lived responder process.
+
+    Requests are written to its stdin as JSON lines, `{"request_id", "message", "conversation"}`,
+    and it answers each with JSON lines `{"request_id", "message", "partial"}`: any number of
+    `"partial": true` chunks, then one frame without it (which may carry the whole answer).
+    A worker may interleave answers to several requests; a frame without a request_id goes to
+    the only pending request. Blank lines are ignored and lines may be up to max_line_bytes.
+    """
+
+    def __init__(self, cmd: List[str], index: int, max_line_bytes: int = DEFAULT_MAX_LINE_BYTES):
+        self.cmd = cmd
+        self.index = index
+        self.max_line_bytes = max_line_bytes
+        self.process = None
+        self.pending: Dict[str, asyncio.Queue] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        # a worker is up while its output is being read
+        return self._reader is not None and not self._reader.done()
+
+    @property
+    def busy(self) -> int:
+        return len(self.pending)
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=self.max_line_bytes
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def send(self, request: dict) -> asyncio.Queue:
+        """Write a request to the worker and return the queue its answer frames arrive on."""
+        frames = asyncio.Queue()
+        self.pending[request["request_id"]] = frames
+        try:
+            self.process.stdin.write(encode_line(request))
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            self.pending.pop(request["request_id"], None)
+            raise EOFError(f"Worker {self.index} stopped accepting requests: {e}")
+        return frames
+
+    async def _read_loop(self):
+        while True:
+            try:
+                line = await self.process.stdout.readline()
+            except ValueError:
+                log.warning(f"Worker {self.index} wrote a line over {self.max_line_bytes} bytes; dropping it.")
+                continue
+            if not line:
+                break
+
+            try:
+                msg = decode_line(line)
+            except ValueError:
+                log.warning(f"Worker {self.index} wrote a line that isn't a JSON object; ignoring it.")
+                continue
+            if msg is None:
+                continue
+
+            request_id = msg.get("request_id")
+            if request_id is None and len(self.pending) == 1:
+                request_id = next(iter(self.pending))
+
+            frames = self.pending.get(request_id)
+            if frames is None:
+                log.warning(f"Worker {self.index} answered unknown request {request_id}; ignoring it.")
+                continue
+            frames.put_nowait(msg)
+            if not msg.get("partial", False):
+                del self.pending[request_id]
+
+        self._fail_pending(EOFError(f"Worker {self.index} exited."))
+
+    def _fail_pending(self, error: Exception):
+        for frames in self.pending.values():
+            frames.put_nowait(error)
+        self.pending.clear()
+
+    async def wait(self):
+        """Wait until the worker's output ends."""
+        if self._reader is not None:
+            await asyncio.shield(self._reader)
+
+    async def stop(self):
+        if self.alive:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                self.process.terminate()
+                await self.process.wait()
+        if self._reader is not None:
+            await self._reader
+        self._fail_pending(EOFError(f"Worker {self.index} stopped."))
+
+
+class SubprocessPool:
+    """
+    A fixed number of workers running the same responder command.
+
+    Each request goes to the live worker with the fewest requests in flight, and its
+    answer is matched back by request_id. A worker that exits fails its pending requests
+    and is restarted after restart_delay. Workers start on the first request.
+    """
+
+    def __init__(self, cmd: List[str], workers: int = 1, restart_delay: float = 0.5, max_line_bytes: int = DEFAULT_MAX_LINE_BYTES):
+        if not cmd:
+            raise ValueError("A command is required for a subprocess pool.")
+        if workers < 1:
+            raise ValueError("A subprocess pool needs at least one worker.")
+        self.cmd = cmd
+        self.workers = [SubprocessWorker(cmd, index, max_line_bytes) for index in range(workers)]
+        self.restart_delay = restart_delay
+        self.restarts = 0
+        self._supervisors: List[asyncio.Task] = []
+        self._starting: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        # concurrent first requests all wait for the same start
+        if self._starting is None:
+            self._starting = asyncio.create_task(self._start_workers())
+        await asyncio.shield(self._starting)
+
+    async def _start_workers(self):
+        for worker in self.workers:
+            await worker.start()
+            self._supervisors.append(asyncio.create_task(self._supervise(worker)))
+
+    async def _supervise(self, worker: SubprocessWorker):
+        while not self._closed:
+            await worker.wait()
+            if self._closed:
+                return
+            log.warning(f"Worker {worker.index} exited; restarting it.")
+            await asyncio.sleep(self.restart_delay)
+            try:
+                await worker.start()
+                self.restarts += 1
+            except Exception as e:
+                log.error(f"Unable to restart worker {worker.index}: {e}")
+
+    def least_busy(self) -> SubprocessWorker:
+        workers = [worker for worker in self.workers if worker.alive]
+        if not workers:
+            raise EOFError("No subprocess workers are running.")
+        return min(workers, key=lambda worker: worker.busy)
+
+    async def stream(self, message: str, conversation: Optional[list] = None, request_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Send a prompt to the least busy worker and yield its answer as the worker streams it."""
+        await self.start()
+        request_id = request_id or str(uuid.uuid4())
+        worker = self.least_busy()
+        frames = await worker.send({
+            "request_id": request_id,
+            "message": message,
+            "conversation": conversation or []
+        })
+
+        try:
+            while True:
+                frame = await frames.get()
+                if isinstance(frame, Exception):
+                    raise frame
+                if frame.get("message"):
+                    yield frame["message"]
+                if not frame.get("partial", False):
+                    return
+        finally:
+            # an abandoned stream stops collecting frames
+            worker.pending.pop(request_id, None)
+
+    async def request(self, message: str, conversation: Optional[list] = None, request_id: Optional[str] = None) -> str:
+        """Send a prompt to the least busy worker and return its whole answer."""
+        return "".join([chunk async for chunk in self.stream(message, conversation, request_id)])
+
+    async def close(self):
+        self._closed = True
+        for worker in self.workers:
+            await worker.stop()
+        for supervisor in self._supervisors:
+            supervisor.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
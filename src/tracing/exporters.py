@@ -0,0 +1,85 @@
+# tracing/exporters.py
+import json
+from typing import Any, Dict, List
+from .tracer import Span
+
+class JsonlSpanExporter:
+    """Writes one JSON object per span to a file, for offline latency waterfalls."""
+
+    def __init__(self, path: str, flush_every: int = 64):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "a", encoding="utf-8")
+        self._unflushed = 0
+
+    def export(self, span: Span):
+        self._file.write(json.dumps(self.encode(span)) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def encode(self, span: Span) -> Dict[str, Any]:
+        return span.to_dict()
+
+    def flush(self):
+        self._file.flush()
+        self._unflushed = 0
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            self._file.close()
+
+
+class OtlpJsonSpanExporter(JsonlSpanExporter):
+    """
+    Writes spans in the OTLP/JSON trace format, one ExportTraceServiceRequest per line
+    (the OpenTelemetry file exporter layout), so collectors and viewers can import them.
+    """
+
+    def encode(self, span: Span) -> Dict[str, Any]:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int(span.end * 1e9)),
+            "attributes": _otlp_attributes(span.attributes),
+        }
+        if span.parent_span_id:
+            otlp_span["parentSpanId"] = span.parent_span_id
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": span.hop})},
+                "scopeSpans": [{"scope": {"name": "rubrik-cli"}, "spans": [otlp_span]}]
+            }]
+        }
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded_value = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded_value = {"doubleValue": value}
+        else:
+            encoded_value = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": encoded_value})
+    return encoded
+
+
+EXPORTERS = {
+    "jsonl": JsonlSpanExporter,
+    "otlp": OtlpJsonSpanExporter,
+}
+
+def create_span_exporter(path: str, fmt: str = "jsonl"):
+    """Create the span exporter for the given format ('jsonl' or 'otlp')."""
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown trace format: {fmt}")
+    return EXPORTERS[fmt](path)
@@ -0,0 +1,161 @@
+# tracing/tracer.py
+import logging
+import secrets
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+def new_span_id() -> str:
+    """Return a random 8-byte span id as hex."""
+    return secrets.token_hex(8)
+
+def trace_id_for(request_id: Optional[str] = None) -> str:
+    """Derive a 16-byte hex trace id from a request_id (a UUID) so traces join on request_id."""
+    try:
+        return uuid.UUID(str(request_id)).hex
+    except ValueError:
+        return secrets.token_hex(16)
+
+@dataclass
+class Span:
+    """A finished, timed operation of one hop; times are unix seconds."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    hop: str
+    start: float
+    end: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["duration_ms"] = round(self.duration_ms, 3)
+        return data
+
+class Tracer:
+    """
+    Records spans for the requests this hop handles and hands them to an exporter.
+    Without an exporter tracing is disabled and recording is a no-op, so call sites
+    can check `enabled` to skip collecting timings at all.
+    """
+
+    def __init__(self, hop: str = "rubrik-cli", exporter=None):
+        self.hop = hop
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_trace(self, request_id: Optional[str] = None) -> Dict[str, Any]:
+        """Return a new trace context for a request entering the system at this hop."""
+        return {"trace_id": trace_id_for(request_id), "parent_span_id": None}
+
+    def continue_trace(self, incoming: Optional[dict], request_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the trace context for this hop's handling of a request, or None when tracing
+        is disabled. It keeps the incoming trace_id (or starts a trace from the request_id)
+        and names a new span for the hop as parent_span_id, which is what outgoing frames carry.
+        """
+        if not self.enabled:
+            return None
+
+        incoming = incoming or self.start_trace(request_id)
+        return {
+            "trace_id": incoming["trace_id"],
+            "parent_span_id": new_span_id(),
+            "upstream_span_id": incoming.get("parent_span_id"),
+            "sent_at": incoming.get("sent_at"),
+            "received_at": incoming.get("received_at"),
+        }
+
+    def record_ingress(self, hop_trace: Optional[dict], incoming: Optional[dict], read_at: float,
+                       validation: Optional[tuple] = None):
+        """
+        Record how a frame reached this hop: transit from the upstream send to ingress,
+        validation at ingress (or the given (start, end) when the handler validated it)
+        and the wait in the ingress queue until it was read.
+        """
+        if not (self.enabled and hop_trace):
+            return
+
+        incoming = incoming or {}
+        trace_id, parent = hop_trace["trace_id"], hop_trace["parent_span_id"]
+        sent_at, received_at, queued_at = incoming.get("sent_at"), incoming.get("received_at"), incoming.get("queued_at")
+
+        if sent_at and received_at:
+            # spans hosts, so only meaningful with synchronized clocks
+            self.record("transit", trace_id, sent_at, received_at, parent_span_id=parent)
+        if received_at and queued_at:
+            self.record("validation", trace_id, received_at, queued_at, parent_span_id=parent)
+        elif validation:
+            self.record("validation", trace_id, validation[0], validation[1], parent_span_id=parent)
+
+        waiting_since = queued_at or sent_at
+        if waiting_since:
+            self.record("queue_wait", trace_id, waiting_since, read_at, parent_span_id=parent)
+
+    def end_hop(self, hop_trace: Optional[dict], start: float, **attributes) -> Optional[Span]:
+        """Record the span covering this hop's whole handling of a request."""
+        if not (self.enabled and hop_trace):
+            return None
+        return self.record(
+            "hop",
+            hop_trace["trace_id"],
+            hop_trace.get("received_at") or start,
+            parent_span_id=hop_trace.get("upstream_span_id"),
+            span_id=hop_trace["parent_span_id"],
+            **attributes
+        )
+
+    def record(self, name: str, trace_id: str, start: float, end: Optional[float] = None,
+               parent_span_id: Optional[str] = None, span_id: Optional[str] = None, **attributes) -> Optional[Span]:
+        """Record a span that has already finished."""
+        if not self.enabled:
+            return None
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=span_id or new_span_id(),
+            parent_span_id=parent_span_id,
+            hop=self.hop,
+            start=start,
+            end=end if end is not None else time.time(),
+            attributes=attributes
+        )
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            log.debug(f"Failed to export span {name}: {e}")
+        return span
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+# process-wide tracer, disabled until configured
+_tracer = Tracer()
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+def configure_tracer(hop: str, exporter=None) -> Tracer:
+    """Replace the process-wide tracer, closing the previous one."""
+    global _tracer
+    with _tracer_lock:
+        _tracer.close()
+        _tracer = Tracer(hop=hop, exporter=exporter)
+        return _tracer
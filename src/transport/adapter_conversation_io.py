@@ -0,0 +1,40 @@
+# transport/adapter_conversation_io.py
+from typing import Dict, Any
+from transport.conversation_io import ConversationIO, ConversationEndedError
+
+class AdapterConversationIO(ConversationIO):
+    """
+    A conversation over an input adapter and an output adapter (or one duplex adapter
+    used for both), so that any adapter pair can be streamed from with stream().
+    """
+
+    def __init__(self, input_adapter, output_adapter=None):
+        self.input_adapter = input_adapter
+        self.output_adapter = output_adapter or input_adapter
+
+    def _adapters(self):
+        if self.output_adapter is self.input_adapter:
+            return [self.input_adapter]
+        return [self.input_adapter, self.output_adapter]
+
+    async def start_conversation(self):
+        for adapter in self._adapters():
+            if hasattr(adapter, "start"):
+                await adapter.start()
+
+    async def listen(self) -> Dict[str, Any]:
+        try:
+            return await self.input_adapter.read_message()
+        except EOFError as e:
+            raise ConversationEndedError(str(e))
+
+    async def respond(self, data: Dict[str, Any]):
+        try:
+            await self.output_adapter.write_message(data)
+        except EOFError as e:
+            raise ConversationEndedError(str(e))
+
+    async def end_conversation(self):
+        for adapter in self._adapters():
+            if hasattr(adapter, "stop"):
+                await adapter.stop()
@@ -1,6 +1,12 @@
 # transport/conversation_io.py
+import asyncio
+import logging
+import uuid
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, Optional
+from transport.flow_control import CANCEL, CREDIT, DEFAULT_WINDOW, InboundStream
+
+log = logging.getLogger(__name__)
 
 class ConversationEndedError(Exception):
     """Raised when the conversation unexpectedly ends or no more messages are available."""
@@ -29,3 +35,97 @@ class ConversationIO(ABC):
     async def end_conversation(self):
         """Gracefully end the conversation."""
         pass
+
+    async def stream(self, request: Dict[str, Any], window: int = DEFAULT_WINDOW) -> AsyncIterator[str]:
+        """
+        Send a request and yield the text of each frame of its answer as it arrives,
+        until the final frame:
+
+            async for chunk in transport.stream({"role": "Questioner", "message": "hi"}):
+                ...
+
+        At most `window` frames of the answer are buffered. The request grants the peer that
+        much credit and more is granted as chunks are read, so a peer that honours credit
+        waits for a slow consumer. Leaving the loop early, or cancelling it, tells the peer
+        to stop. Several streams may be open at once; while any is, frames are read by
+        the streams and listen() must not be called.
+        """
+        request = dict(request, credit=window)
+        request.setdefault("type", "chat")
+        request.setdefault("request_id", str(uuid.uuid4()))
+        request_id = str(request["request_id"])
+
+        router = self._stream_router()
+        inbound = router.open(request_id, window)
+        finished = False
+        try:
+            await self.respond(request)
+            while True:
+                frame = await inbound.get()
+                if frame.get("errors"):
+                    raise ConversationEndedError(frame.get("message") or "The request was rejected.")
+                text = frame.get("message")
+                if not frame.get("partial", False):
+                    finished = True
+                    if text:
+                        yield text
+                    return
+
+                credit = inbound.credit()
+                if credit:
+                    await self.respond({"type": CREDIT, "request_id": request_id, "credit": credit})
+                if text:
+                    yield text
+        finally:
+            router.close(request_id)
+            if not finished:
+                try:
+                    await self.respond({"type": CANCEL, "request_id": request_id})
+                except Exception as e:
+                    log.debug(f"Unable to cancel stream {request_id}: {e}")
+
+    def _stream_router(self) -> "StreamRouter":
+        router = getattr(self, "_router", None)
+        if router is None:
+            router = self._router = StreamRouter(self)
+        return router
+
+
+class StreamRouter:
+    """Reads a conversation's frames while streams are open, handing each to its request's stream."""
+
+    def __init__(self, conversation: ConversationIO):
+        self.conversation = conversation
+        self.streams: Dict[str, InboundStream] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    def open(self, request_id: str, window: int) -> InboundStream:
+        inbound = self.streams[request_id] = InboundStream(request_id, window)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+        return inbound
+
+    def close(self, request_id: str):
+        inbound = self.streams.pop(request_id, None)
+        if inbound is not None:
+            inbound.close()
+        if not self.streams and self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    async def _read_loop(self):
+        try:
+            while self.streams:
+                frame = await self.conversation.listen()
+                request_id = frame.get("request_id") if isinstance(frame, dict) else None
+                inbound = self.streams.get(str(request_id)) if request_id is not None else None
+                if inbound is None:
+                    log.debug(f"Dropping frame for request {request_id} with no open stream.")
+                    continue
+                await inbound.put(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e if isinstance(e, ConversationEndedError) else ConversationEndedError(f"Reading the stream failed: {e}")
+            for inbound in self.streams.values():
+                inbound.fail(error)
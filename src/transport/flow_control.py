@@ -0,0 +1,159 @@
+# transport/flow_control.py
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# control frames of credit flow control; they are answered by the websocket server, not queued
+CREDIT = "credit"
+CANCEL = "cancel"
+
+# frames a receiver buffers per stream unless it asks for another window
+DEFAULT_WINDOW = 64
+
+class StreamCancelledError(Exception):
+    """Raised to the sender of a stream that its receiver cancelled."""
+    pass
+
+class InboundStream:
+    """
+    The receiving end of one streamed answer: a buffer of at most window partial frames
+    (plus the final one, which needs no credit), and the credit to hand back as they are read.
+    """
+
+    def __init__(self, request_id: str, window: int = DEFAULT_WINDOW):
+        self.request_id = request_id
+        self.window = window
+        self.error: Optional[Exception] = None
+        self.closed = False
+        self._frames: Deque[Dict[str, Any]] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._unreturned = 0
+
+    async def put(self, frame: Dict[str, Any]):
+        # a sender that ignores credit is held up here, and so is everything read after it
+        while len(self._frames) > self.window and not self.closed:
+            self._writable.clear()
+            await self._writable.wait()
+        if self.closed:
+            return
+        self._frames.append(frame)
+        self._readable.set()
+
+    async def get(self) -> Dict[str, Any]:
+        while not self._frames:
+            if self.error is not None:
+                raise self.error
+            self._readable.clear()
+            await self._readable.wait()
+        frame = self._frames.popleft()
+        self._writable.set()
+        return frame
+
+    def fail(self, error: Exception):
+        """End the stream with an error, raised once the buffered frames are read."""
+        self.error = error
+        self._readable.set()
+
+    def close(self):
+        self.closed = True
+        self._writable.set()
+
+    def credit(self) -> int:
+        """Count a frame as read; return the credit to grant now, batched to half a window."""
+        self._unreturned += 1
+        if self._unreturned < max(1, self.window // 2):
+            return 0
+        credit, self._unreturned = self._unreturned, 0
+        return credit
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+class _Window:
+    def __init__(self, credit: float, owner: Any):
+        self.credit = credit
+        self.owner = owner
+        self.cancelled = False
+        self.changed = asyncio.Event()
+
+
+class CreditLedger:
+    """
+    The sending side of credit flow control.
+
+    A receiver opens a stream with the number of partial frames it can buffer and grants
+    more credit as it reads them; acquire() waits until the next partial frame of the
+    request may be sent, so a slow reader holds up generation instead of filling buffers.
+    A receiver that grants no credit for stall_timeout seconds (e.g. one that stopped
+    reading without disconnecting) has its stream cancelled, so it can't hold up the
+    sender for good. Requests nobody opened aren't limited. Windows are kept for the most
+    recent max_streams requests; older ones stop limiting their sender.
+    """
+
+    def __init__(self, max_streams: int = 4096, stall_timeout: float = 30.0):
+        self.max_streams = max_streams
+        self.stall_timeout = stall_timeout
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+
+    def open(self, request_id: str, window: int, owner: Any = None):
+        self._windows[str(request_id)] = _Window(window, owner)
+        self._windows.move_to_end(str(request_id))
+        while len(self._windows) > self.max_streams:
+            _, evicted = self._windows.popitem(last=False)
+            evicted.credit = float("inf")
+            evicted.changed.set()
+
+    def grant(self, request_id: str, credit: int):
+        window = self._windows.get(str(request_id))
+        if window is not None and credit > 0:
+            window.credit += credit
+            window.changed.set()
+
+    def cancel(self, request_id: str):
+        window = self._windows.get(str(request_id))
+        if window is not None:
+            window.cancelled = True
+            window.changed.set()
+
+    def cancel_owner(self, owner: Any):
+        """Cancel every stream opened by a receiver that went away."""
+        for request_id, window in self._windows.items():
+            if window.owner is owner:
+                self.cancel(request_id)
+
+    async def acquire(self, request_id: str):
+        """Take one credit for a partial frame. Raises StreamCancelledError if the receiver cancelled or stalled."""
+        window = self._windows.get(str(request_id))
+        if window is None:
+            return
+        while window.credit <= 0 and not window.cancelled:
+            window.changed.clear()
+            try:
+                await asyncio.wait_for(window.changed.wait(), timeout=self.stall_timeout)
+            except asyncio.TimeoutError:
+                log.warning(f"Cancelling stream {request_id}: no credit for {self.stall_timeout}s.")
+                window.cancelled = True
+        if window.cancelled:
+            raise StreamCancelledError(f"Stream {request_id} was cancelled by its receiver.")
+        window.credit -= 1
+
+    def close(self, request_id: str):
+        self._windows.pop(str(request_id), None)
+
+    def __contains__(self, request_id) -> bool:
+        return str(request_id) in self._windows
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+_ledger = CreditLedger()
+
+def get_credit_ledger() -> CreditLedger:
+    """Return the process-wide credit ledger."""
+    return _ledger
@@ -1,18 +1,20 @@
 # transport/stdio_conversation_io.py
-import json
 import asyncio
 import subprocess
 from typing import Dict, Any
-from conversation_io import ConversationIO, ConversationEndedError
+from adapters.ndjson import DEFAULT_MAX_LINE_BYTES, decode_line, encode_line
+from transport.conversation_io import ConversationIO, ConversationEndedError
 
 class StdioConversationIO(ConversationIO):
-    def __init__(self, cmd: list, timeout: float = 5.0):
+    def __init__(self, cmd: list, timeout: float = 5.0, max_line_bytes: int = DEFAULT_MAX_LINE_BYTES):
         """
         cmd: command to run as the buddy process, e.g. ["python", "buddy_script.py"]
         timeout: how long to wait for a response before giving up
+        max_line_bytes: the longest line the buddy may write
         """
         self.cmd = cmd
         self.timeout = timeout
+        self.max_line_bytes = max_line_bytes
         self.process = None
 
     async def start_conversation(self):
@@ -21,7 +23,8 @@ class StdioConversationIO(ConversationIO):
             *self.cmd,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            stderr=subprocess.PIPE,
+            limit=self.max_line_bytes
         )
 
     async def listen(self) -> Dict[str, Any]:
@@ -33,40 +36,38 @@ class StdioConversationIO(ConversationIO):
         if not self.process or self.process.stdout is None:
             raise ConversationEndedError("Process not started or no stdout.")
 
-        try:
-            line = await asyncio.wait_for(self.process.stdout.readline(), timeout=self.timeout)
-        except asyncio.TimeoutError:
-            # If no output in time, consider conversation ended or return empty
-            raise ConversationEndedError("No response from buddy within timeout.")
+        while True:
+            try:
+                line = await asyncio.wait_for(self.process.stdout.readline(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                # If no output in time, consider conversation ended or return empty
+                raise ConversationEndedError("No response from buddy within timeout.")
+            except ValueError:
+                raise ConversationEndedError(f"Buddy wrote a line longer than {self.max_line_bytes} bytes.")
 
-        if not line:
-            # EOF reached
-            raise ConversationEndedError("Buddy closed the conversation.")
+            if not line:
+                # EOF reached
+                raise ConversationEndedError("Buddy closed the conversation.")
 
-        # Decode and strip line
-        line_str = line.decode('utf-8').strip()
+            # Suppose the buddy returns JSON lines
+            # If it's plain text, wrap it in a dict
+            try:
+                msg = decode_line(line)
+            except ValueError:
+                # If not JSON, just return a simple dict
+                msg = {"role": "assistant", "message": line.decode('utf-8').strip()}
 
-        # Suppose the buddy returns JSON lines
-        # If it's plain text, wrap it in a dict
-        import json
-        try:
-            msg = json.loads(line_str)
-        except json.JSONDecodeError:
-            # If not JSON, just return a simple dict
-            msg = {"role": "assistant", "message": line_str}
-
-        return msg
+            # blank lines are keep-alives
+            if msg is not None:
+                return msg
 
     async def respond(self, data: Dict[str, Any]):
         # Write a line to the subprocess stdin
         if not self.process or self.process.stdin is None:
             raise ConversationEndedError("Process not started or no stdin available.")
 
-        # Convert data to JSON or a line of text depending on your buddy's protocol
-        line = json.dumps(data) + "\n"
-
-        # Write line to stdin
-        self.process.stdin.write(line.encode('utf-8'))
+        # Write the data to stdin as one JSON line
+        self.process.stdin.write(encode_line(data))
 
         # Flush the output buffer
         await self.process.stdin.drain()
@@ -1,39 +1,39 @@
 # transport/websocket_conversation_io.py
-import json
-import websockets
-from typing import Dict, Any, AsyncGenerator
+import logging
+from typing import Dict, Any
+from websockets.exceptions import ConnectionClosed
+from adapters.ws_connect import connect
+from messages.codec import get_codec
 from transport.conversation_io import ConversationIO, ConversationEndedError
 
+log = logging.getLogger(__name__)
+
 class WebSocketConversationIO(ConversationIO):
-    def __init__(self, uri="ws://localhost:8000/ws"):
+    def __init__(self, uri="ws://localhost:8000/ws", codec=None):
         self.uri = uri
+        self.codec = codec or get_codec()
         self.websocket = None
 
     async def start_conversation(self):
-        self.websocket = await websockets.connect(self.uri)
+        self.websocket = await connect(self.uri)
 
     async def listen(self) -> Dict[str, Any]:
-        try:
-            message = await self.websocket.recv()
-        except websockets.exceptions.ConnectionClosedError:
-            raise ConversationEndedError("The conversation ended unexpectedly.")
-        return json.loads(message)
+        while True:
+            try:
+                message = await self.websocket.recv()
+            except ConnectionClosed:
+                raise ConversationEndedError("The conversation ended unexpectedly.")
+            try:
+                return self.codec.decode(message)
+            except ValueError as e:
+                log.debug(f"Skipping invalid frame from {self.uri}: {e}")
 
     async def respond(self, data: Dict[str, Any]):
-        await self.websocket.send(json.dumps(data))
+        try:
+            await self.websocket.send(self.codec.encode(data))
+        except ConnectionClosed:
+            raise ConversationEndedError("The conversation ended unexpectedly.")
 
     async def end_conversation(self):
         if self.websocket:
             await self.websocket.close()
-
-    async def listen_stream(self) -> AsyncGenerator[Dict[str, Any], None]:
-        try:
-            while True:
-                raw_msg = await self.websocket.recv()
-                msg = json.loads(raw_msg)
-                yield msg
-                if msg.get("done", False):
-                    break
-        except websockets.exceptions.ConnectionClosedError:
-            raise ConversationEndedError("The conversation ended unexpectedly during streaming.")
-
@@ -1,17 +1,44 @@
 import asyncio
 import logging
-import json
+import os
+import stat
+import time
 import uuid
 import websockets
-from urllib.parse import urlparse
+from typing import Optional, Union
+from urllib.parse import urlparse, unquote
 from websockets.exceptions import ConnectionClosedError
 from pydantic import ValidationError, parse_obj_as
 from messages.message_types import MessageUnion  # Import your union of message models
+from tracing.tracer import get_tracer
+from messages.codec import get_codec
+from adapters.resume import RESUME, RESUME_ACK, ResumeTracker
+from adapters.ws_connect import unix_socket_path
+from transport.flow_control import CANCEL, CREDIT, get_credit_ledger
 
 logger = logging.getLogger(__name__)
 
 connected_clients = set()
 
+# the last message_number received per request, shared by all connections since a resumed stream arrives on a new one
+resume_tracker = ResumeTracker()
+
+# websocket paths of the form /persona/<name> select the persona for every message on the connection
+PERSONA_PATH_PREFIX = "/persona/"
+
+def persona_from_path(websocket) -> Optional[str]:
+    """Return the persona named in the connection's request path, if any."""
+    request = getattr(websocket, "request", None)
+    path = getattr(request, "path", None) or getattr(websocket, "path", None)
+    if not isinstance(path, str) or not path.startswith(PERSONA_PATH_PREFIX):
+        return None
+    persona = unquote(urlparse(path).path[len(PERSONA_PATH_PREFIX):]).strip("/")
+    return persona or None
+
+def is_credit(value) -> bool:
+    """Whether a frame's credit is a usable number of frames (a positive int)."""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
 async def server_handler(websocket: websockets.WebSocketServerProtocol, message_queue: asyncio.Queue) -> None:
     """
     Handles individual WebSocket client connections.
@@ -20,17 +47,20 @@ async def server_handler(websocket: websockets.WebSocketServerProtocol, message_
     """
     connected_clients.add(websocket)
     logger.info(f"New client connected. Total clients: {len(connected_clients)}")
+    path_persona = persona_from_path(websocket)
+    codec = get_codec()
 
     try:
         async for raw_message in websocket:
+            received_at = time.time()
             logger.debug(f"Received raw message from client: {raw_message}")
 
-            # Attempt to parse as JSON
+            # Attempt to decode a structured frame
             try:
-                data = json.loads(raw_message)
+                data = codec.decode(raw_message)
                 was_structured = True
-            except json.JSONDecodeError:
-                # Not valid JSON, treat as a simple chat message from a Questioner
+            except ValueError:
+                # Not a structured frame, treat as a simple chat message from a Questioner
                 was_structured = False
                 data = {
                     "role": "Questioner",
@@ -39,6 +69,27 @@ async def server_handler(websocket: websockets.WebSocketServerProtocol, message_
                     "partial": False
                 }
 
+            # a sender resuming after a reconnect asks which of its frames arrived
+            if was_structured and isinstance(data, dict) and data.get("type") == RESUME:
+                streams = [str(request_id) for request_id in data.get("streams", [])]
+                await websocket.send(codec.encode({"type": RESUME_ACK, "received": resume_tracker.received(streams)}))
+                continue
+
+            # a streaming client grants credit for more of an answer's frames, or cancels it
+            if was_structured and isinstance(data, dict) and data.get("type") in (CREDIT, CANCEL):
+                if data.get("request_id") is not None:
+                    if data["type"] == CANCEL:
+                        get_credit_ledger().cancel(data["request_id"])
+                    elif is_credit(data.get("credit")):
+                        get_credit_ledger().grant(data["request_id"], data["credit"])
+                    else:
+                        logger.debug(f"Ignoring credit frame with invalid credit: {data.get('credit')!r}")
+                continue
+
+            # a persona in the message wins over one in the connection path
+            if path_persona and isinstance(data, dict) and not data.get("persona"):
+                data["persona"] = path_persona
+
             # Validate message using MessageUnion
             try:
                 # Use parse_obj_as for union parsing
@@ -64,24 +115,41 @@ async def server_handler(websocket: websockets.WebSocketServerProtocol, message_
                         "request_id": request_id,
                         "errors": error_list
                     }
-                    await websocket.send(json.dumps(error_response))
+                    await websocket.send(codec.encode(error_response))
                 else:
                     # For unstructured, just send a text error response
                     await websocket.send("Invalid message. Please send a non-empty message.")
                 continue
 
-            # Validation passed
-            structured_message = message_obj.model_dump_json()
+            # numbered frames sent again after a resume are dropped if they already arrived
+            message_number = getattr(message_obj, "message_number", None)
+            if message_number is not None and not resume_tracker.accept(str(message_obj.request_id), message_number):
+                logger.debug(f"Dropping duplicate frame {message_number} of request {message_obj.request_id}.")
+                continue
+
+            # Validation passed; dumped in JSON mode so UUIDs and enums are plain values
+            message_dict = message_obj.model_dump(mode="json")
+
+            # a request with credit limits how many partial frames of its answer are sent ahead of the client
+            credit = data.get("credit") if isinstance(data, dict) else None
+            if is_credit(credit):
+                get_credit_ledger().open(message_dict["request_id"], credit, owner=websocket)
 
             # Add was_structured info to the message before putting it on the queue
-            message_dict = json.loads(structured_message)
             message_dict["was_structured"] = was_structured
 
+            # requests entering the system here start a trace; every hop stamps its ingress times
+            if message_dict.get("trace") is None and get_tracer().enabled:
+                message_dict["trace"] = get_tracer().start_trace(message_dict["request_id"])
+            if message_dict.get("trace") is not None:
+                message_dict["trace"]["received_at"] = received_at
+                message_dict["trace"]["queued_at"] = time.time()
+
             logger.debug(f"Validated message (was_structured={was_structured}, "
                          f"request_id={message_dict['request_id']}): {message_dict}")
 
-            # Put the updated message dict as JSON back into the queue for downstream processing
-            await message_queue.put(json.dumps(message_dict))
+            # Queue the dict itself; re-encoding it only for the input adapter to decode it again is wasted work
+            await message_queue.put(message_dict)
 
     except ConnectionClosedError as e:
         logger.info(f"Client connection closed unexpectedly: {e}")
@@ -89,24 +157,93 @@ async def server_handler(websocket: websockets.WebSocketServerProtocol, message_
         logger.error(f"An error occurred while handling client: {e}")
     finally:
         connected_clients.discard(websocket)
+        # nobody is left to read the answers this client was streaming
+        get_credit_ledger().cancel_owner(websocket)
         logger.info(f"Client disconnected. Total clients: {len(connected_clients)}")
 
 
-async def start_server(server_ws_uri: str, message_queue: asyncio.Queue) -> None:
+def relay_frame(raw_message) -> Optional[Union[str, bytes]]:
     """
-    Starts the WebSocket server and runs indefinitely.
+    Return the frame to relay for a raw websocket message without validating it:
+    JSON objects (and binary frames, with a binary codec) are passed on byte for byte,
+    plain text is wrapped as a chat message, and blank text and binary frames that aren't
+    UTF-8 text (with a text codec) are dropped.
+    """
+    codec = get_codec()
+    if isinstance(raw_message, bytes):
+        if codec.binary:
+            return raw_message
+        try:
+            raw_message = raw_message.decode("utf-8")
+        except UnicodeDecodeError:
+            logger.debug("Dropping binary frame that isn't UTF-8 text.")
+            return None
+
+    if raw_message.lstrip().startswith("{"):
+        return raw_message
+    if not raw_message.strip():
+        return None
+
+    return codec.encode({
+        "role": "Questioner",
+        "type": "chat",
+        "message": raw_message,
+        "partial": False,
+        "request_id": str(uuid.uuid4())
+    })
+
+async def relay_handler(websocket: websockets.WebSocketServerProtocol, message_queue: asyncio.Queue) -> None:
     """
+    Handles a client connection of a relay server.
+    Frames are queued as received, skipping the parsing and validation done by server_handler.
+    """
+    connected_clients.add(websocket)
+    logger.info(f"New relay client connected. Total clients: {len(connected_clients)}")
+
+    try:
+        async for raw_message in websocket:
+            frame = relay_frame(raw_message)
+            if frame is not None:
+                await message_queue.put(frame)
+    except ConnectionClosedError as e:
+        logger.info(f"Client connection closed unexpectedly: {e}")
+    except Exception as e:
+        logger.error(f"An error occurred while relaying client messages: {e}")
+    finally:
+        connected_clients.discard(websocket)
+        logger.info(f"Client disconnected. Total clients: {len(connected_clients)}")
+
+
+def remove_stale_socket(path: str) -> None:
+    """Remove a socket file left behind by a previous server, so the path can be bound again."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def serve(handler, server_ws_uri: str, **kwargs):
+    """Serve websockets on a ws:// host and port, or on the socket path of a unix:// URI."""
+    path = unix_socket_path(server_ws_uri)
+    if path is not None:
+        remove_stale_socket(path)
+        return websockets.unix_serve(handler, path, **kwargs)
+
     parsed = urlparse(server_ws_uri)
-    host = parsed.hostname
-    port = parsed.port
+    return websockets.serve(handler, parsed.hostname, parsed.port, **kwargs)
 
+async def start_server(server_ws_uri: str, message_queue: asyncio.Queue, relay: bool = False) -> None:
+    """
+    Starts the WebSocket server and runs indefinitely.
+    With relay, incoming frames are queued raw (see relay_handler).
+    A unix:// URI serves on a unix domain socket instead of TCP.
+    """
     logger.info(f"Starting WebSocket server at {server_ws_uri}")
 
     # Disable ping and timeout intervals to reduce unintended disconnections
-    async with websockets.serve(
-        lambda ws: server_handler(ws, message_queue),
-        host,
-        port,
+    async with serve(
+        lambda ws: (relay_handler if relay else server_handler)(ws, message_queue),
+        server_ws_uri,
         ping_interval=None,
         ping_timeout=None,
         close_timeout=None
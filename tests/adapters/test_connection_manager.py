@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from websockets.exceptions import ConnectionClosedError
+from src.adapters.connection_manager import ConnectionManager, SharedConnection
+from src.adapters.duplex.websocket_duplex_adapter import WebSocketDuplexAdapter
+from src.adapters.input.websocket_input_adapter import WebSocketInput
+
+
+class FakeSocket:
+    """A websocket whose inbound frames are fed by the test; closing it ends recv."""
+    def __init__(self, fail_sends=False):
+        self.inbound = asyncio.Queue()
+        self.sent = []
+        self.closed = False
+        self.fail_sends = fail_sends
+
+    async def recv(self):
+        frame = await self.inbound.get()
+        if frame is None:
+            raise ConnectionClosedError(None, None)
+        return frame
+
+    async def send(self, frame):
+        if self.fail_sends:
+            raise ConnectionClosedError(None, None)
+        self.sent.append(frame)
+
+    async def close(self):
+        self.closed = True
+        self.inbound.put_nowait(None)
+
+
+@pytest.mark.asyncio
+async def test_adapters_share_one_connection():
+    socket = FakeSocket()
+    connect = AsyncMock(return_value=socket)
+    connection = SharedConnection("ws://example.com/ws")
+    input_adapter = WebSocketInput(connection=connection)
+    duplex_adapter = WebSocketDuplexAdapter(connection=connection)
+
+    with patch("websockets.connect", connect):
+        await input_adapter.start()
+        await duplex_adapter.start()
+        assert connect.await_count == 1
+
+        socket.inbound.put_nowait(json.dumps({"role": "Responder", "message": "hi"}))
+        first = await input_adapter.read_message()
+        second = await duplex_adapter.read_message()
+        assert first == second == {"role": "Responder", "message": "hi"}
+        # each adapter gets its own copy
+        assert first is not second
+
+        await duplex_adapter.write_message({"role": "Questioner", "message": "hello"})
+        assert json.loads(socket.sent[0]) == {"role": "Questioner", "message": "hello"}
+
+        await input_adapter.stop()
+        assert not socket.closed
+        await duplex_adapter.stop()
+        assert socket.closed
+
+@pytest.mark.asyncio
+async def test_reconnects_once_for_all_users():
+    first, second = FakeSocket(fail_sends=True), FakeSocket()
+    connect = AsyncMock(side_effect=[first, second])
+    connection = SharedConnection("ws://example.com/ws", retry_delay=0.01)
+    with patch("websockets.connect", connect):
+        inbox = connection.subscribe()
+        await connection.acquire()
+
+        # the send notices the drop and reconnects; the reader sees the old socket close but doesn't reconnect again
+        await connection.send("frame")
+        second.inbound.put_nowait(json.dumps({"message": "after"}))
+        assert (await connection.receive(inbox))["message"] == "after"
+
+        assert connect.await_count == 2
+        assert second.sent == ["frame"]
+        await connection.release()
+
+@pytest.mark.asyncio
+async def test_readers_see_eof_when_connection_gives_up():
+    socket = FakeSocket()
+    connect = AsyncMock(side_effect=[socket, Exception("refused")])
+    connection = SharedConnection("ws://example.com/ws", max_retries=1, retry_delay=0.01)
+    with patch("websockets.connect", connect):
+        adapter = WebSocketInput(connection=connection)
+        await adapter.start()
+        await socket.close()
+        with pytest.raises(EOFError, match="closed"):
+            await adapter.read_message()
+        await adapter.stop()
+
+def test_manager_hands_out_one_connection_per_uri():
+    manager = ConnectionManager()
+    assert manager.get("ws://a") is manager.get("ws://a")
+    assert manager.get("ws://a") is not manager.get("ws://b")
+    assert len(manager) == 2
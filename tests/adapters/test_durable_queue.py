@@ -0,0 +1,104 @@
+import asyncio
+import sqlite3
+import pytest
+from src.adapters.input.durable_queue import DurableQueue
+from src.adapters.input.server_input_adapter import ServerInputAdapter
+
+
+def message(request_id, text, partial=False):
+    return {"role": "Questioner", "message": text, "partial": partial, "request_id": request_id}
+
+def stored(path, table="messages"):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT request_id, attempts FROM {table} ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.mark.asyncio
+async def test_messages_are_delivered_in_order_and_acked(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = DurableQueue(path)
+    await queue.open()
+    await queue.put(message("a", "one", partial=True))
+    await queue.put(message("a", "two"))
+    await queue.put(message("b", "three"))
+
+    assert (await asyncio.wait_for(queue.get(), 1))["message"] == "one"
+    assert (await asyncio.wait_for(queue.get(), 1))["message"] == "two"
+    queue.ack("a")
+    await queue.close()
+
+    assert stored(path) == [("b", 1)]
+
+@pytest.mark.asyncio
+async def test_unacked_messages_survive_a_restart(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = DurableQueue(path, visibility_timeout=0.2)
+    await queue.open()
+    await queue.put(message("a", "hello"))
+    assert (await asyncio.wait_for(queue.get(), 1))["message"] == "hello"
+    # the process goes away before answering
+    await queue.close()
+
+    queue = DurableQueue(path, visibility_timeout=0.2)
+    await queue.open()
+    # the claim of the previous process has to expire first
+    redelivered = await asyncio.wait_for(queue.get(), 2)
+    assert redelivered["message"] == "hello"
+    queue.ack("a")
+    await queue.close()
+    assert stored(path) == []
+
+@pytest.mark.asyncio
+async def test_held_messages_are_not_delivered_twice(tmp_path):
+    queue = DurableQueue(str(tmp_path / "queue.db"), visibility_timeout=0.15)
+    await queue.open()
+    await queue.put(message("a", "slow"))
+    await asyncio.wait_for(queue.get(), 1)
+    # the claim is extended while the request is being answered
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.get(), 0.5)
+    await queue.close()
+
+@pytest.mark.asyncio
+async def test_messages_delivered_too_often_become_dead_letters(tmp_path):
+    path = str(tmp_path / "queue.db")
+    for _ in range(2):
+        queue = DurableQueue(path, visibility_timeout=0.1, max_attempts=2)
+        await queue.open()
+        if not stored(path):
+            await queue.put(message("a", "poison"))
+        await asyncio.wait_for(queue.get(), 2)
+        await queue.close()
+        await asyncio.sleep(0.15)
+
+    queue = DurableQueue(path, visibility_timeout=0.1, max_attempts=2)
+    await queue.open()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.get(), 0.3)
+    await queue.close()
+    assert stored(path) == []
+    assert stored(path, "dead_letters") == [("a", 2)]
+
+@pytest.mark.asyncio
+async def test_server_input_adapter_acks_after_the_next_read(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = DurableQueue(path)
+    await queue.open()
+    adapter = ServerInputAdapter(queue)
+    await queue.put(message("a", "first"))
+    await queue.put(message("b", "part", partial=True))
+    await queue.put(message("b", "rest"))
+    await queue.put(None)
+
+    assert (await adapter.read_message())["request_id"] == "a"
+    # reading again means a was answered; b isn't finished until the read after its final frame
+    assert (await adapter.read_message())["request_id"] == "b"
+    assert (await adapter.read_message())["message"] == "rest"
+    with pytest.raises(EOFError):
+        await adapter.read_message()
+    await queue.close()
+
+    assert stored(path) == []
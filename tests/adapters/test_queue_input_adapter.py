@@ -0,0 +1,40 @@
+import pytest
+import asyncio
+from src.adapters.input.queue_input_adapter import QueueInput
+
+@pytest.mark.asyncio
+async def test_queue_input_read_message():
+    q = asyncio.Queue()
+    msg = {"role": "Questioner", "message": "Hello"}
+    await q.put(msg)
+    adapter = QueueInput(q)
+    assert await adapter.read_message() is msg
+
+@pytest.mark.asyncio
+async def test_queue_input_end_of_stream():
+    q = asyncio.Queue()
+    await q.put(None)
+    adapter = QueueInput(q)
+    with pytest.raises(EOFError, match="No more messages"):
+        await adapter.read_message()
+    # further reads fail without blocking on the queue
+    with pytest.raises(EOFError, match="Adapter is stopped"):
+        await adapter.read_message()
+
+@pytest.mark.asyncio
+async def test_queue_input_stop():
+    adapter = QueueInput(asyncio.Queue())
+    await adapter.stop()
+    with pytest.raises(EOFError, match="Adapter is stopped"):
+        await adapter.read_message()
+
+@pytest.mark.asyncio
+async def test_queue_input_waits_for_every_producer():
+    q = asyncio.Queue()
+    await q.put(None)
+    await q.put({"role": "Responder", "message": "late"})
+    await q.put(None)
+    adapter = QueueInput(q, producers=2)
+    assert (await adapter.read_message())["message"] == "late"
+    with pytest.raises(EOFError, match="No more messages"):
+        await adapter.read_message()
@@ -0,0 +1,27 @@
+import pytest
+import asyncio
+from src.adapters.output.queue_output_adapter import QueueOutput
+
+@pytest.mark.asyncio
+async def test_queue_output_write_message():
+    q = asyncio.Queue()
+    adapter = QueueOutput(q)
+    data = {"role": "Responder", "message": "Hello"}
+    await adapter.write_message(data)
+    assert q.get_nowait() is data
+
+@pytest.mark.asyncio
+async def test_queue_output_stop_signals_end_once():
+    q = asyncio.Queue()
+    adapter = QueueOutput(q)
+    await adapter.stop()
+    await adapter.stop()
+    assert q.get_nowait() is None
+    assert q.empty()
+
+@pytest.mark.asyncio
+async def test_queue_output_write_after_stop():
+    adapter = QueueOutput(asyncio.Queue())
+    await adapter.stop()
+    with pytest.raises(EOFError, match="Adapter is stopped"):
+        await adapter.write_message({"role": "Responder", "message": "late"})
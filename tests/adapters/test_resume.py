@@ -0,0 +1,138 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from websockets.exceptions import ConnectionClosedError
+from src.adapters.output.websocket_output_adapter import WebSocketOutput
+from src.adapters.resume import ReplayBuffer, ResumeTracker, backoff_delay
+
+
+def test_replay_buffer_numbers_frames_per_request():
+    replay = ReplayBuffer()
+    a0, n0 = replay.stamp({"request_id": "a", "message": "x", "partial": True})
+    b0, m0 = replay.stamp({"request_id": "b", "message": "y", "partial": True})
+    a1, n1 = replay.stamp({"request_id": "a", "partial": False})
+    assert (n0, m0, n1) == (0, 0, 1)
+    assert a1["message_number"] == 1
+    # frames without a request_id aren't numbered
+    assert replay.stamp({"message": "z"}) == ({"message": "z"}, None)
+
+def test_replay_buffer_sends_unacknowledged_frames():
+    replay = ReplayBuffer()
+    for number, frame in enumerate(["a0", "a1", "a2"]):
+        replay.stamp({"request_id": "a"})
+        replay.add("a", number, frame, final=number == 2)
+    replay.stamp({"request_id": "b"})
+    replay.add("b", 0, "b0", final=False)
+
+    assert replay.frames_after({"a": 0, "b": 0}) == ["a1", "a2"]
+    # without an answer everything is sent again
+    assert replay.frames_after(None) == ["a0", "a1", "a2", "b0"]
+
+    # finished and fully received requests are forgotten
+    replay.prune({"a": 2, "b": 0})
+    assert replay.streams() == ["b"]
+    assert len(replay) == 1
+
+def test_replay_buffer_is_bounded():
+    replay = ReplayBuffer(max_frames=2)
+    for number in range(3):
+        replay.stamp({"request_id": "a"})
+        replay.add("a", number, f"a{number}", final=False)
+    assert len(replay) == 2
+    assert replay.frames_after(None) == ["a1", "a2"]
+
+def send(replay, request_id, final=False):
+    frame, number = replay.stamp({"request_id": request_id, "partial": not final})
+    replay.add(request_id, number, json.dumps(frame), final=final)
+    return number
+
+def test_replay_buffer_forgets_unfinished_streams():
+    replay = ReplayBuffer(max_frames=4)
+    # many requests whose final frame is never sent
+    for i in range(100):
+        send(replay, f"r{i}")
+
+    assert len(replay) == 4
+    assert len(replay._streams) <= 4
+    assert len(replay._retired) <= 4
+    # a forgotten request that continues keeps its numbering
+    assert send(replay, "r99") == 1
+    assert send(replay, "r98") == 1
+
+def test_resume_tracker_drops_duplicates():
+    tracker = ResumeTracker(max_streams=2)
+    assert tracker.accept("a", 0)
+    assert tracker.accept("a", 1)
+    assert not tracker.accept("a", 1)
+    assert tracker.received(["a", "missing"]) == {"a": 1}
+
+    tracker.accept("b", 0)
+    tracker.accept("c", 0)
+    assert tracker.received(["a"]) == {}
+
+def test_backoff_grows_with_jitter_and_cap():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, 0.1, cap=5.0)
+        expected = min(5.0, 0.1 * 2 ** attempt)
+        assert expected / 2 <= delay <= expected
+
+
+class ResumingSocket:
+    """Answers resume handshakes with what `received` says arrived."""
+    def __init__(self, received, fail_after=None):
+        self.inbound = asyncio.Queue()
+        self.sent = []
+        self.received = received
+        self.fail_after = fail_after
+
+    async def send(self, frame):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise ConnectionClosedError(None, None)
+        data = json.loads(frame)
+        if data.get("type") == "resume":
+            self.inbound.put_nowait(json.dumps({"type": "resume_ack", "received": self.received}))
+            return
+        self.sent.append(data)
+
+    async def recv(self):
+        return await self.inbound.get()
+
+    async def close(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_resumable_output_resends_missing_frames_after_reconnect():
+    first = ResumingSocket({}, fail_after=2)
+    # the receiver only got the first frame before the connection dropped
+    second = ResumingSocket({"req": 0})
+    with patch("websockets.connect", AsyncMock(side_effect=[first, second])):
+        adapter = WebSocketOutput(uri="ws://example.com/ws", retry_delay=0.01, resumable=True)
+        await adapter.start()
+        for word in ["one", "two", "three"]:
+            await adapter.write_message({"request_id": "req", "message": word, "partial": True})
+        await adapter.write_message({"request_id": "req", "partial": False})
+
+    assert [frame["message_number"] for frame in first.sent] == [0, 1]
+    # frame 1 is sent again, as the receiver didn't acknowledge it
+    assert [frame["message_number"] for frame in second.sent] == [1, 2, 3]
+    assert second.sent[-1]["partial"] is False
+
+@pytest.mark.asyncio
+async def test_resumable_output_without_answer_resends_everything():
+    first = ResumingSocket({}, fail_after=1)
+    second = ResumingSocket({})
+
+    async def silent_send(frame):
+        data = json.loads(frame)
+        if data.get("type") != "resume":
+            second.sent.append(data)
+    second.send = silent_send
+
+    with patch("websockets.connect", AsyncMock(side_effect=[first, second])):
+        adapter = WebSocketOutput(uri="ws://example.com/ws", retry_delay=0.01, resumable=True, resume_timeout=0.05)
+        await adapter.start()
+        await adapter.write_message({"request_id": "req", "message": "a", "partial": True})
+        await adapter.write_message({"request_id": "req", "message": "b", "partial": True})
+
+    assert [frame["message_number"] for frame in second.sent] == [0, 1]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from src.adapters.output.send_queue import CoalescingSendQueue
+from src.adapters.output.websocket_output_adapter import WebSocketOutput
+
+
+class GatedSend:
+    """A send that waits until the test opens the gate."""
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, data):
+        await self.gate.wait()
+        self.sent.append(data)
+
+
+@pytest.mark.asyncio
+async def test_partial_frames_merge_while_a_send_is_in_flight():
+    send = GatedSend()
+    queue = CoalescingSendQueue(send)
+    await queue.start()
+
+    await queue.put({"request_id": "a", "message": "one ", "partial": True})
+    await asyncio.sleep(0)  # the writer takes the first frame and waits on the socket
+    for word in ["two ", "three "]:
+        await queue.put({"request_id": "a", "message": word, "partial": True})
+    await queue.put({"request_id": "b", "message": "other", "partial": True})
+    await queue.put({"request_id": "a", "partial": False})
+    await queue.put({"request_id": "a", "message": "late", "partial": True})
+
+    send.gate.set()
+    await queue.close()
+
+    assert [(frame["request_id"], frame.get("message")) for frame in send.sent] == [
+        ("a", "one "), ("a", "two three "), ("b", "other"), ("a", None), ("a", "late")
+    ]
+    assert queue.merged == 1
+
+@pytest.mark.asyncio
+async def test_put_waits_only_when_full():
+    send = GatedSend()
+    queue = CoalescingSendQueue(send, max_frames=1)
+    await queue.start()
+
+    await queue.put({"message": "in flight"})
+    await asyncio.sleep(0)
+    await queue.put({"message": "waiting"})
+    blocked = asyncio.create_task(queue.put({"message": "blocked"}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    send.gate.set()
+    await blocked
+    await queue.close()
+    assert [frame["message"] for frame in send.sent] == ["in flight", "waiting", "blocked"]
+
+@pytest.mark.asyncio
+async def test_send_failure_surfaces_on_next_put():
+    queue = CoalescingSendQueue(AsyncMock(side_effect=EOFError("socket gone")))
+    await queue.start()
+    await queue.put({"message": "lost"})
+    await asyncio.sleep(0)
+    with pytest.raises(EOFError, match="socket gone"):
+        await queue.put({"message": "next"})
+
+@pytest.mark.asyncio
+async def test_websocket_output_drains_queue_on_stop():
+    mock_ws = AsyncMock()
+    with patch("websockets.connect", new_callable=AsyncMock, return_value=mock_ws):
+        adapter = WebSocketOutput(uri="ws://example.com/ws", send_queue=8)
+        await adapter.start()
+        await adapter.write_message({"request_id": "a", "message": "hi", "partial": True})
+        await adapter.write_message({"request_id": "a", "partial": False})
+        await adapter.stop()
+
+    sent = [json.loads(call.args[0]) for call in mock_ws.send.call_args_list]
+    assert sent == [{"request_id": "a", "message": "hi", "partial": True}, {"request_id": "a", "partial": False}]
@@ -29,6 +29,16 @@ async def test_server_input_adapter_read_valid_message():
     msg = await adapter.read_message()
     assert msg == {"role": "Questioner", "message": "Hello"}
 
+@pytest.mark.asyncio
+async def test_server_input_adapter_reads_queued_dict():
+    # the websocket server queues validated messages without re-encoding them
+    q = asyncio.Queue()
+    message = {"role": "Questioner", "message": "Hello"}
+    await q.put(message)
+    adapter = ServerInputAdapter(q)
+    await adapter.start()
+    assert await adapter.read_message() is message
+
 @pytest.mark.asyncio
 async def test_server_input_adapter_read_none():
     q = asyncio.Queue()
@@ -39,13 +49,13 @@ async def test_server_input_adapter_read_none():
         await adapter.read_message()
 
 @pytest.mark.asyncio
-async def test_server_input_adapter_read_invalid_json():
+async def test_server_input_adapter_skips_invalid_json():
     q = asyncio.Queue()
     await q.put("Not JSON")
+    await q.put(json.dumps({"role": "Questioner", "message": "Hello"}))
     adapter = ServerInputAdapter(q)
     await adapter.start()
-    with pytest.raises(EOFError, match="Invalid JSON"):
-        await adapter.read_message()
+    assert await adapter.read_message() == {"role": "Questioner", "message": "Hello"}
 
 @pytest.mark.asyncio
 async def test_server_input_adapter_read_unexpected_exception():
@@ -54,15 +54,27 @@ async def test_stdin_input_adapter_read_message_eof():
             await adapter.read_message()
 
 @pytest.mark.asyncio
-async def test_stdin_input_adapter_read_message_empty_line():
-    # empty line (just newline)
+async def test_stdin_input_adapter_read_message_skips_empty_line():
+    # empty lines are keep-alives, not the end of input
     mock_process = AsyncMock()
-    mock_process.stdout.readline = AsyncMock(return_value=b'\n')
+    mock_process.stdout.readline = AsyncMock(side_effect=[b'\n', b'  \n', b'{"role":"Questioner","message":"hello"}\n'])
 
     with patch("asyncio.create_subprocess_exec", return_value=mock_process):
         adapter = StdInInput(["echo"])
         await adapter.start()
-        with pytest.raises(EOFError, match="EOF reached"):
+        msg = await adapter.read_message()
+        assert msg == {"role": "Questioner", "message": "hello"}
+
+@pytest.mark.asyncio
+async def test_stdin_input_adapter_read_message_too_long():
+    mock_process = AsyncMock()
+    mock_process.stdout.readline = AsyncMock(side_effect=ValueError("Separator is not found, and chunk exceed the limit"))
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as create:
+        adapter = StdInInput(["echo"], max_line_bytes=1024)
+        await adapter.start()
+        assert create.call_args.kwargs["limit"] == 1024
+        with pytest.raises(EOFError, match="longer than 1024 bytes"):
             await adapter.read_message()
 
 @pytest.mark.asyncio
@@ -50,3 +50,78 @@ async def test_stdout_output_start():
 async def test_stdout_output_stop():
     adapter = StdOutOutput()
     await adapter.stop()  # no error expected
+
+class SlowStream:
+    """Records each write and flush, taking a little time for every flush."""
+    def __init__(self, delay=0.0):
+        self.writes = []
+        self.flushes = 0
+        self.delay = delay
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def flush(self):
+        import time
+        time.sleep(self.delay)
+        self.flushes += 1
+
+@pytest.mark.asyncio
+async def test_buffered_stdout_batches_partial_frames():
+    stream = SlowStream()
+    adapter = StdOutOutput(flush_interval_ms=50)
+    adapter.writer.stream = stream
+    await adapter.start()
+
+    for word in ["a", "b", "c"]:
+        await adapter.write_message({"role": "Responder", "message": word, "partial": True})
+    await adapter.write_message({"role": "Responder", "partial": False})
+    await adapter.stop()
+
+    lines = "".join(stream.writes).splitlines()
+    assert [json.loads(line).get("message") for line in lines] == ["a", "b", "c", None]
+    # the final frame flushed the window early, so all four frames went out together
+    assert stream.flushes == 1
+
+@pytest.mark.asyncio
+async def test_buffered_stdout_applies_backpressure():
+    stream = SlowStream(delay=0.05)
+    adapter = StdOutOutput(flush_interval_ms=0, max_buffer_bytes=10)
+    adapter.writer.stream = stream
+    await adapter.start()
+
+    for i in range(3):
+        await adapter.write_message({"message": str(i), "partial": True})
+        # each frame is over the limit, so the next write waits for it to be written
+        assert adapter.writer._pending <= len(json.dumps({"message": str(i), "partial": True})) + 1
+    await adapter.stop()
+
+    assert len("".join(stream.writes).splitlines()) == 3
+
+@pytest.mark.asyncio
+async def test_buffered_stdout_counts_utf8_bytes():
+    stream = SlowStream(delay=0.05)
+    adapter = StdOutOutput(flush_interval_ms=0, max_buffer_bytes=16)
+    adapter.writer.stream = stream
+    await adapter.start()
+
+    # 10 characters, but 30 bytes, are over the limit
+    await adapter.writer.write("€" * 10)
+    assert adapter.writer._pending == 30
+    await adapter.writer.write("next")
+    assert adapter.writer._pending == 4
+    await adapter.stop()
+
+    assert "".join(stream.writes) == "€" * 10 + "next"
+
+@pytest.mark.asyncio
+async def test_buffered_stdout_write_failure():
+    stream = MagicMock()
+    stream.write.side_effect = Exception("Broken pipe")
+    adapter = StdOutOutput(flush_interval_ms=0)
+    adapter.writer.stream = stream
+    await adapter.start()
+
+    await adapter.write_message({"message": "lost", "partial": False})
+    with pytest.raises(EOFError, match="Broken pipe"):
+        await adapter.stop()
@@ -1,16 +1,17 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 import json
-from websockets.exceptions import ConnectionClosedError
 from src.adapters.input.websocket_input_adapter import WebSocketInput
+from tests.adapters.test_connection_manager import FakeSocket
 
 @pytest.mark.asyncio
 async def test_websocket_input_start_success():
-    mock_ws = AsyncMock()
-    with patch("websockets.connect", new_callable=AsyncMock, return_value=mock_ws):
+    socket = FakeSocket()
+    with patch("websockets.connect", new_callable=AsyncMock, return_value=socket):
         adapter = WebSocketInput(uri="ws://example.com/ws")
         await adapter.start()
-        assert adapter.websocket == mock_ws
+        assert adapter.websocket == socket
+        await adapter.stop()
 
 @pytest.mark.asyncio
 async def test_websocket_input_start_failure():
@@ -25,8 +26,8 @@ async def test_websocket_input_start_failure():
 
 @pytest.mark.asyncio
 async def test_websocket_input_start_retries_then_success():
-    mock_ws = AsyncMock()
-    attempts = [Exception("Failed once"), mock_ws]
+    socket = FakeSocket()
+    attempts = [Exception("Failed once"), socket]
 
     async def mock_connect(*args, **kwargs):
         val = attempts.pop(0)
@@ -37,73 +38,69 @@ async def test_websocket_input_start_retries_then_success():
     with patch("websockets.connect", new_callable=AsyncMock, side_effect=mock_connect):
         adapter = WebSocketInput(uri="ws://example.com/ws", max_retries=2, retry_delay=0.01)
         await adapter.start()
-        assert adapter.websocket == mock_ws
+        assert adapter.websocket == socket
+        await adapter.stop()
 
 @pytest.mark.asyncio
 async def test_websocket_input_read_message_valid():
-    mock_ws = AsyncMock()
-    mock_ws.recv = AsyncMock(return_value=json.dumps({"role": "Questioner", "message": "Hello"}))
+    socket = FakeSocket()
+    socket.inbound.put_nowait(json.dumps({"role": "Questioner", "message": "Hello"}))
 
-    with patch("websockets.connect", new_callable=AsyncMock, return_value=mock_ws):
+    with patch("websockets.connect", new_callable=AsyncMock, return_value=socket):
         adapter = WebSocketInput(uri="ws://example.com/ws")
         await adapter.start()
         msg = await adapter.read_message()
         assert msg == {"role": "Questioner", "message": "Hello"}
+        await adapter.stop()
 
 @pytest.mark.asyncio
-async def test_websocket_input_read_message_invalid_json():
-    mock_ws = AsyncMock()
-    mock_ws.recv = AsyncMock(return_value="Not JSON")
+async def test_websocket_input_read_message_skips_invalid_json():
+    socket = FakeSocket()
+    socket.inbound.put_nowait("Not JSON")
+    socket.inbound.put_nowait(json.dumps({"role": "Questioner", "message": "Hi"}))
 
-    with patch("websockets.connect", new_callable=AsyncMock, return_value=mock_ws):
+    with patch("websockets.connect", new_callable=AsyncMock, return_value=socket):
         adapter = WebSocketInput(uri="ws://example.com/ws")
         await adapter.start()
-        with pytest.raises(EOFError, match="Received invalid JSON"):
-            await adapter.read_message()
+        assert await adapter.read_message() == {"role": "Questioner", "message": "Hi"}
+        await adapter.stop()
 
 @pytest.mark.asyncio
 async def test_websocket_input_read_message_connection_closed_once():
-    # First read attempt fails
-    first_mock_ws = AsyncMock()
-    first_mock_ws.recv = AsyncMock(side_effect=ConnectionClosedError(None, None))
-
-    # After reconnect, a valid message is returned
-    second_mock_ws = AsyncMock()
-    second_mock_ws.recv = AsyncMock(return_value=json.dumps({"role": "Questioner", "message": "Recovered"}))
+    # the first connection drops, the reconnected one delivers a message
+    first, second = FakeSocket(), FakeSocket()
+    first.inbound.put_nowait(None)
+    second.inbound.put_nowait(json.dumps({"role": "Questioner", "message": "Recovered"}))
 
-    attempts = [first_mock_ws, second_mock_ws]
-
-    async def mock_connect(*args, **kwargs):
-        return attempts.pop(0)
-
-    with patch("websockets.connect", new_callable=AsyncMock, side_effect=mock_connect):
+    with patch("websockets.connect", new_callable=AsyncMock, side_effect=[first, second]):
         adapter = WebSocketInput(uri="ws://example.com/ws", max_retries=2, retry_delay=0.01)
         await adapter.start()
         msg = await adapter.read_message()
         assert msg == {"role": "Questioner", "message": "Recovered"}
+        await adapter.stop()
 
 @pytest.mark.asyncio
-async def test_websocket_input_read_message_connection_closed_multiple_times():
-    mock_ws = AsyncMock()
-    mock_ws.recv = AsyncMock(side_effect=ConnectionClosedError(None, None))
+async def test_websocket_input_read_message_connection_lost_for_good():
+    socket = FakeSocket()
+    connect = AsyncMock(side_effect=[socket, Exception("refused"), Exception("refused")])
 
-    with patch("websockets.connect", new_callable=AsyncMock, return_value=mock_ws):
+    with patch("websockets.connect", connect):
         adapter = WebSocketInput(uri="ws://example.com/ws", max_retries=2, retry_delay=0.01)
         await adapter.start()
-        with pytest.raises(EOFError, match="Failed to read message after multiple retries."):
+        await socket.close()
+        with pytest.raises(EOFError, match="closed"):
             await adapter.read_message()
+        await adapter.stop()
 
 @pytest.mark.asyncio
 async def test_websocket_input_stop():
-    mock_ws = AsyncMock()
-    mock_ws.close = AsyncMock()
+    socket = FakeSocket()
 
-    with patch("websockets.connect", new_callable=AsyncMock, return_value=mock_ws):
+    with patch("websockets.connect", new_callable=AsyncMock, return_value=socket):
         adapter = WebSocketInput(uri="ws://example.com/ws")
         await adapter.start()
         await adapter.stop()
-        mock_ws.close.assert_awaited_once()
-        assert adapter.websocket is not None
+        assert socket.closed
 
 @pytest.mark.asyncio
 async def test_websocket_input_stop_no_connection():
@@ -0,0 +1,42 @@
+import os
+import socket
+import pytest
+from src.adapters.ws_connect import unix_socket_path, connect
+from src.ws_server import serve, remove_stale_socket
+
+
+def test_unix_socket_path():
+    assert unix_socket_path("unix:///tmp/hop.sock") == "/tmp/hop.sock"
+    assert unix_socket_path("unix://relative/hop.sock") == "relative/hop.sock"
+    assert unix_socket_path("ws://localhost:8000/ws") is None
+    with pytest.raises(ValueError):
+        unix_socket_path("unix://")
+
+def test_remove_stale_socket_leaves_other_files(tmp_path):
+    path = str(tmp_path / "hop.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.close()
+    remove_stale_socket(path)
+    assert not os.path.exists(path)
+
+    regular = tmp_path / "file"
+    regular.write_text("keep")
+    remove_stale_socket(str(regular))
+    assert regular.exists()
+    # a missing path is fine
+    remove_stale_socket(path)
+
+@pytest.mark.asyncio
+async def test_round_trip_over_unix_socket(tmp_path):
+    uri = f"unix://{tmp_path / 'hop.sock'}"
+
+    async def echo(websocket):
+        async for frame in websocket:
+            await websocket.send(frame)
+
+    async with serve(echo, uri):
+        websocket = await connect(uri)
+        await websocket.send('{"message": "hello"}')
+        assert await websocket.recv() == '{"message": "hello"}'
+        await websocket.close()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import pytest
+from src.batch.batch_runner import BatchRunner, completed_request_ids, default_output_path
+
+
+class EchoHandler:
+    """Streams the question back one word at a time."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.questions = []
+
+    async def get_response_stream(self, question, conversation):
+        self.questions.append(question)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if question == "fail":
+                raise RuntimeError("model error")
+            for word in question.split():
+                yield word + " "
+        finally:
+            self.in_flight -= 1
+
+class BlockingHandler:
+    def get_response(self, question, conversation):
+        return question.upper()
+
+def write_requests(path, lines):
+    path.write_text("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines))
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_default_output_path():
+    assert default_output_path("runs/prompts.jsonl") == "runs/prompts.results.jsonl"
+
+@pytest.mark.asyncio
+async def test_batch_writes_results_with_bounded_concurrency(tmp_path):
+    requests = tmp_path / "requests.jsonl"
+    write_requests(requests, [{"request_id": f"r{i}", "message": f"hello number {i}"} for i in range(10)])
+    handler = EchoHandler()
+
+    summary = await BatchRunner(lambda persona: handler, str(requests), concurrency=3).run()
+
+    assert (summary.succeeded, summary.failed, summary.skipped) == (10, 0, 0)
+    assert handler.max_in_flight == 3
+    results = {r["request_id"]: r for r in read_results(tmp_path / "requests.results.jsonl")}
+    assert results["r4"]["response"] == "hello number 4 "
+    assert results["r4"]["chunks"] == 3
+    assert results["r4"]["status"] == "ok"
+    assert results["r4"]["duration_ms"] >= results["r4"]["time_to_first_token_ms"] >= 0
+
+@pytest.mark.asyncio
+async def test_batch_records_errors_and_runs_blocking_handlers(tmp_path):
+    requests = tmp_path / "requests.jsonl"
+    write_requests(requests, ["not json", {"request_id": "a"}, {"request_id": "b", "message": "fine"}, ""])
+    output = tmp_path / "out.jsonl"
+
+    summary = await BatchRunner(lambda persona: BlockingHandler(), str(requests), output_path=str(output)).run()
+
+    assert (summary.succeeded, summary.failed) == (1, 2)
+    results = {r["request_id"]: r for r in read_results(output)}
+    assert results["line-1"]["status"] == "error"
+    assert results["a"]["error"] == "Request has no message."
+    # a handler without streaming has no token count or first token
+    assert results["b"]["response"] == "FINE"
+    assert results["b"]["chunks"] is None
+
+@pytest.mark.asyncio
+async def test_restarted_batch_skips_completed_requests(tmp_path):
+    requests = tmp_path / "requests.jsonl"
+    write_requests(requests, [{"request_id": "a", "message": "one"}, {"request_id": "b", "message": "fail"},
+                              {"message": "no id"}])
+    output = tmp_path / "out.jsonl"
+    # a previous run finished a and was killed while writing another line
+    output.write_text(json.dumps({"request_id": "a", "status": "ok", "response": "one "}) + '\n{"request_id": "b", "sta')
+
+    handler = EchoHandler()
+    summary = await BatchRunner(lambda persona: handler, str(requests), output_path=str(output)).run()
+
+    assert handler.questions == ["fail", "no id"]
+    assert (summary.succeeded, summary.failed, summary.skipped) == (1, 1, 1)
+    assert completed_request_ids(str(output)) == {"a", "line-3"}
+
+    # the failed request is tried again on the next run
+    handler = EchoHandler()
+    await BatchRunner(lambda persona: handler, str(requests), output_path=str(output)).run()
+    assert handler.questions == ["fail"]
+
+@pytest.mark.asyncio
+async def test_batch_picks_handler_per_persona(tmp_path):
+    requests = tmp_path / "requests.jsonl"
+    write_requests(requests, [{"message": "hi", "persona": "pirate"}, {"message": "hi"}])
+    personas = []
+
+    def handler_for(persona):
+        personas.append(persona)
+        return BlockingHandler()
+
+    await BatchRunner(handler_for, str(requests), concurrency=1).run()
+    assert personas == ["pirate", None]
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from src.chat_handler.conversation_manager import ConversationManager
+from src.chat_handler.conversation_store import SQLiteConversationStore
+
+
+def turns(n, start=0):
+    return [{"role": "user" if i % 2 == 0 else "responder", "content": f"turn {i}"} for i in range(start, start + n)]
+
+def test_store_keeps_conversations_apart(tmp_path):
+    store = SQLiteConversationStore(str(tmp_path / "conversations.db"))
+    store.append("a", "user", "hello")
+    store.append("b", "user", "hallo")
+    store.append("a", "responder", "hi")
+
+    assert store.recent("a", 10) == [{"role": "user", "content": "hello"}, {"role": "responder", "content": "hi"}]
+    assert store.recent("a", 1) == [{"role": "responder", "content": "hi"}]
+    assert store.history("b") == [{"role": "user", "content": "hallo"}]
+    store.close()
+
+def test_old_turns_are_compacted_without_losing_history(tmp_path):
+    store = SQLiteConversationStore(str(tmp_path / "conversations.db"), keep_turns=3, compact_after=5)
+    for turn in turns(20):
+        store.append("a", turn["role"], turn["content"])
+    store.flush()
+
+    # turns written in one batch are compacted together
+    assert 1 <= store.compactions <= 3
+    assert store._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0] < 8
+    assert store.history("a") == turns(20)
+    # a window longer than the uncompacted turns reaches into the archive
+    assert store.recent("a", 6) == turns(6, start=14)
+    store.close()
+
+def test_manager_keeps_a_bounded_window_and_reloads_it(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    store = SQLiteConversationStore(path)
+    manager = ConversationManager(store, conversation_id="translator", max_turns=4)
+    for turn in turns(10):
+        manager.add_message(turn["role"], turn["content"])
+    assert manager.get_conversation() == turns(4, start=6)
+    store.close()
+
+    # after a restart the recent turns are loaded when the conversation is first used
+    store = SQLiteConversationStore(path)
+    manager = ConversationManager(store, conversation_id="translator", max_turns=4)
+    assert manager.conversation == []
+    manager.add_message("USER", "turn 10")
+    assert manager.get_conversation() == turns(4, start=7)
+    assert len(store.history("translator")) == 11
+    store.close()
+
+def test_append_returns_before_the_turn_is_written(tmp_path, mocker):
+    store = SQLiteConversationStore(str(tmp_path / "conversations.db"))
+    written = mocker.patch.object(store, "_write", side_effect=store._write)
+
+    # the writer thread can't get the connection, yet appending doesn't wait for it
+    with store._lock:
+        store.append("a", "user", "hello")
+        store.append("a", "responder", "hi")
+
+    assert store.recent("a", 10) == [{"role": "user", "content": "hello"}, {"role": "responder", "content": "hi"}]
+    assert written.call_count >= 1
+    store.close()
+    with pytest.raises(EOFError):
+        store.append("a", "user", "too late")
+
+@pytest.mark.asyncio
+async def test_manager_loads_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    store = SQLiteConversationStore(path)
+    for turn in turns(3):
+        store.append("a", turn["role"], turn["content"])
+    store.close()
+
+    store = SQLiteConversationStore(path)
+    manager = ConversationManager(store, conversation_id="a", max_turns=2)
+    # while a write holds the store, loading waits on a worker thread, not on the loop
+    with store._lock:
+        load = asyncio.ensure_future(asyncio.gather(manager.load(), manager.load()))
+        await asyncio.sleep(0.05)
+        assert not load.done()
+    await load
+    assert manager.get_conversation() == turns(2, start=1)
+    store.close()
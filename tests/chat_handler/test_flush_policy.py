@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from src.chat_handler.flush_policy import FlushPolicy, TokenBatcher, batch_tokens
+from src.chat_handler.response_utils import get_response
+
+
+async def token_stream(tokens, delays=None):
+    for i, token in enumerate(tokens):
+        if delays:
+            await asyncio.sleep(delays[i])
+        yield token
+
+
+async def collect(tokens, policy, delays=None):
+    return [frame async for frame in batch_tokens(token_stream(tokens, delays), TokenBatcher(policy))]
+
+
+@pytest.mark.asyncio
+async def test_default_policy_flushes_every_five_tokens_or_newline():
+    frames = await collect(["a", "b", "c\n", "d", "e", "f", "g", "h", "i"], FlushPolicy())
+    assert frames == ["abc\n", "defgh", "i"]
+
+@pytest.mark.asyncio
+async def test_max_bytes_flushes_large_tokens():
+    frames = await collect(["aaaa", "bbbb", "cc"], FlushPolicy(max_tokens=None, max_bytes=8))
+    assert frames == ["aaaabbbb", "cc"]
+
+@pytest.mark.asyncio
+async def test_max_delay_flushes_while_the_model_stalls():
+    seen = []
+    policy = FlushPolicy(max_tokens=100, max_delay_ms=20)
+    stream = token_stream(["a", "b", "c"], delays=[0, 0, 0.3])
+
+    async for frame in batch_tokens(stream, TokenBatcher(policy), on_token=seen.append):
+        # the first frame goes out on the timer, before "c" has arrived
+        if not frame.endswith("c"):
+            assert seen == ["a", "b"]
+        seen.append(frame)
+
+    assert seen == ["a", "b", "ab", "c", "c"]
+
+def test_adaptive_policy_holds_tokens_for_the_send_latency():
+    policy = FlushPolicy(max_tokens=2, adaptive=True, send_latency=0.5)
+    batcher = TokenBatcher(policy)
+    batcher.add("a", now=10.0)
+    batcher.add("b", now=10.0)
+    assert batcher.should_flush(now=10.0)
+    batcher.take(now=10.0)
+
+    batcher.add("c", now=10.1)
+    batcher.add("d", now=10.1)
+    assert not batcher.should_flush(now=10.1)
+    assert batcher.time_to_flush(now=10.1) == pytest.approx(0.4)
+    assert batcher.should_flush(now=10.5)
+
+def test_adaptive_policy_never_holds_back_max_bytes():
+    policy = FlushPolicy(max_tokens=None, max_bytes=2, adaptive=True, send_latency=5.0)
+    batcher = TokenBatcher(policy)
+    batcher.take(now=1.0)
+    batcher.add("ab", now=1.0)
+    assert batcher.should_flush(now=1.0)
+
+def test_record_send_smooths_latency():
+    policy = FlushPolicy(latency_smoothing=0.5)
+    policy.record_send(0.1)
+    assert policy.send_latency == pytest.approx(0.1)
+    policy.record_send(0.3)
+    assert policy.send_latency == pytest.approx(0.2)
+
+@pytest.mark.asyncio
+async def test_get_response_uses_flush_policy():
+    class Handler:
+        def get_response_stream(self, question, conversation):
+            yield from ["one ", "two ", "three ", "four"]
+
+    class Output:
+        def __init__(self):
+            self.frames = []
+
+        async def write_message(self, data):
+            self.frames.append(data)
+
+    output = Output()
+    policy = FlushPolicy(max_tokens=2)
+    answer = await get_response(Handler(), output, "q", [], True, "local", None, request_id="r1", flush_policy=policy)
+
+    assert answer == "one two three four"
+    assert [frame.get("message") for frame in output.frames] == ["one two ", "three four", None]
+    assert policy.send_latency > 0
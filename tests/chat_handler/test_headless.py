@@ -0,0 +1,69 @@
+import asyncio
+import subprocess
+import sys
+import time
+import pytest
+from src.chat_handler import ui_utils
+from src.chat_handler.ui_renderer import UIRenderer
+
+HEADLESS_SERVER = """
+import asyncio, sys
+sys.path.insert(0, "src")
+from chat_handler.ui_utils import set_headless
+set_headless()
+
+import main
+from chat_handler.ui_renderer import UIRenderer
+from chat_handler.response_utils import get_response
+
+class Handler:
+    def get_response_stream(self, question, conversation):
+        yield from question.split()
+
+class Output:
+    async def write_message(self, data):
+        pass
+
+async def run():
+    renderer = UIRenderer()
+    renderer.start_streaming(True, "local", "remote", "questioner", "hi")
+    renderer.update_streaming(" there")
+    renderer.end_streaming()
+    renderer.display_complete_message(True, "local", "remote", "responder", "hello")
+    await renderer.after_message(server_mode=True)
+    await get_response(Handler(), Output(), "a b c", [], True, "local", None)
+
+asyncio.run(run())
+print(sorted(name for name in sys.modules if name == "rich" or name.startswith("rich.")))
+"""
+
+
+@pytest.fixture
+def headless():
+    ui_utils.set_headless()
+    yield
+    ui_utils.set_headless(False)
+
+
+def test_headless_process_never_imports_rich():
+    result = subprocess.run([sys.executable, "-c", HEADLESS_SERVER], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+@pytest.mark.asyncio
+async def test_headless_print_prompt_does_not_wait(headless, capsys):
+    start = time.monotonic()
+    await ui_utils.print_prompt(server_mode=True)
+    assert time.monotonic() - start < 0.05
+    assert capsys.readouterr().out == ""
+
+def test_headless_renderer_draws_nothing(headless, capsys):
+    renderer = UIRenderer()
+    renderer.start_streaming(True, "local", "remote", "questioner", "hi")
+    assert renderer.is_streaming
+    renderer.update_streaming(" there")
+    renderer.end_streaming()
+    renderer.display_complete_message(True, "local", "remote", "responder", "hello")
+
+    assert not renderer.is_streaming
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import pytest
+import uuid
+from types import SimpleNamespace
+from src.chat_handler.chat_handler import ChatHandler
+from src.ws_server import persona_from_path, server_handler
+
+
+class FakeWebSocket:
+    def __init__(self, path, frames):
+        self.request = SimpleNamespace(path=path)
+        self.frames = frames
+        self.sent = []
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for frame in self.frames:
+            yield frame
+
+    async def send(self, frame):
+        self.sent.append(frame)
+
+
+def multi_persona_handler(persona=None):
+    return ChatHandler(None, None, mode="persona", persona=persona, server=True, multi_persona=True)
+
+
+def test_persona_from_path():
+    assert persona_from_path(FakeWebSocket("/persona/sassy_persona", [])) == "sassy_persona"
+    assert persona_from_path(FakeWebSocket("/persona/helpful%20persona/", [])) == "helpful persona"
+    assert persona_from_path(FakeWebSocket("/persona/", [])) is None
+    assert persona_from_path(FakeWebSocket("/", [])) is None
+    assert persona_from_path(SimpleNamespace()) is None
+
+@pytest.mark.asyncio
+async def test_server_handler_message_persona_wins_over_path():
+    frames = [
+        json.dumps({"role": "Questioner", "message": "hi", "request_id": str(uuid.uuid4())}),
+        json.dumps({"role": "Questioner", "message": "hi", "request_id": str(uuid.uuid4()), "persona": "helpful_persona"}),
+    ]
+    queue = asyncio.Queue()
+    await server_handler(FakeWebSocket("/persona/sassy_persona", frames), queue)
+
+    assert queue.get_nowait()["persona"] == "sassy_persona"
+    assert queue.get_nowait()["persona"] == "helpful_persona"
+
+def test_responder_for_routes_by_persona():
+    chat_handler = multi_persona_handler()
+    sassy, sassy_conversation = chat_handler.responder_for("sassy_persona")
+    helpful, helpful_conversation = chat_handler.responder_for("helpful_persona")
+
+    assert sassy.persona_name == "sassy_persona"
+    assert helpful.persona_name == "helpful_persona"
+    assert sassy_conversation is not helpful_conversation
+    assert chat_handler.responder_for("sassy_persona") == (sassy, sassy_conversation)
+
+def test_responder_for_falls_back_to_default_persona():
+    chat_handler = multi_persona_handler(persona="sassy_persona")
+    handler, _ = chat_handler.responder_for(None)
+    assert handler.persona_name == "sassy_persona"
+
+def test_responder_for_unknown_or_missing_persona():
+    chat_handler = multi_persona_handler()
+    with pytest.raises(ValueError):
+        chat_handler.responder_for("no_such_persona")
+    with pytest.raises(ValueError, match="no persona"):
+        chat_handler.responder_for(None)
+
+def test_responder_for_ignores_persona_outside_multi_persona_mode():
+    chat_handler = ChatHandler(None, None, mode="forwarder", server=True)
+    assert chat_handler.responder_for("sassy_persona") == (chat_handler.responder_handler, chat_handler.conversation_manager)
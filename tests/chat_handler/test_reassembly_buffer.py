@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from src.chat_handler.reassembly_buffer import ReassemblyBuffer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def open_stream(buffer, request_id, text=""):
+    buffer.open(request_id, {"chunks": []})
+    return buffer.add(request_id, text)
+
+
+def test_chunks_are_reassembled_and_popped():
+    buffer = ReassemblyBuffer()
+    open_stream(buffer, "a", "Hel")
+    assert buffer.add("a", "lo")
+    assert "".join(buffer.get("a")["chunks"]) == "Hello"
+    assert buffer.total_bytes == 5
+
+    buffer.pop("a")
+    assert len(buffer) == 0 and buffer.total_bytes == 0
+
+def test_quiet_streams_expire():
+    clock, evicted = Clock(), []
+    buffer = ReassemblyBuffer(ttl=10, clock=clock, on_evict=lambda request_id, state, reason: evicted.append((request_id, reason)))
+    open_stream(buffer, "a", "x")
+    clock.now = 5
+    open_stream(buffer, "b", "y")
+    clock.now = 12
+    buffer.add("b", "z")
+
+    assert buffer.expire() == 1
+    assert evicted == [("a", "ttl")]
+    assert "b" in buffer and buffer.total_bytes == 2
+    # the rest of the evicted stream is ignored until its final frame
+    assert buffer.is_dropped("a")
+    buffer.forget_dropped("a")
+    assert not buffer.is_dropped("a")
+
+def test_oversized_stream_is_evicted():
+    buffer = ReassemblyBuffer(max_stream_bytes=4)
+    open_stream(buffer, "a", "abc")
+    assert not buffer.add("a", "de")
+    assert "a" not in buffer and buffer.total_bytes == 0
+    assert buffer.evicted["stream_bytes"] == 1
+
+def test_memory_cap_evicts_least_recently_active_streams():
+    buffer = ReassemblyBuffer(max_total_bytes=10)
+    open_stream(buffer, "a", "aaaa")
+    open_stream(buffer, "b", "bbbb")
+    buffer.add("a", "a")
+    # b is now the least recently active
+    assert open_stream(buffer, "c", "cccc")
+    assert "b" not in buffer and "a" in buffer
+    assert buffer.evicted["total_bytes"] == 1
+
+def test_stream_count_is_capped():
+    buffer = ReassemblyBuffer(max_streams=2)
+    for request_id in "abc":
+        open_stream(buffer, request_id, "x")
+    assert "a" not in buffer and len(buffer) == 2
+    assert buffer.evicted["streams"] == 1
+
+@pytest.mark.asyncio
+async def test_streams_expire_without_new_frames():
+    evicted = []
+    buffer = ReassemblyBuffer(ttl=0.05, on_evict=lambda request_id, state, reason: evicted.append(request_id))
+    open_stream(buffer, "a", "x")
+
+    # nothing else arrives, yet the periodic check evicts the stream
+    expiry = asyncio.create_task(buffer.expire_periodically())
+    try:
+        for _ in range(100):
+            if evicted:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        expiry.cancel()
+    assert evicted == ["a"] and len(buffer) == 0
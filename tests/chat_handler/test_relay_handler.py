@@ -0,0 +1,57 @@
+import asyncio
+import json
+import pytest
+from src.chat_handler.relay_handler import handle_relay
+from src.adapters.input.server_input_adapter import ServerInputAdapter
+from src.ws_server import relay_frame
+
+
+class RawOutput:
+    def __init__(self, fail_on=None):
+        self.frames = []
+        self.fail_on = fail_on
+
+    async def write_raw(self, frame):
+        if frame == self.fail_on:
+            raise EOFError("send failed")
+        self.frames.append(frame)
+
+
+def test_relay_frame_passes_json_unchanged():
+    raw = '{"role": "Questioner", "message": "hi", "partial": true, "request_id": "abc"}'
+    assert relay_frame(raw) is raw
+
+def test_relay_frame_wraps_plain_text():
+    frame = json.loads(relay_frame(b"hello"))
+    assert frame["message"] == "hello"
+    assert frame["role"] == "Questioner"
+    assert frame["partial"] is False
+    assert frame["request_id"]
+
+def test_relay_frame_drops_blank_text():
+    assert relay_frame("   ") is None
+
+def test_relay_frame_drops_binary_that_is_not_text():
+    assert relay_frame(b"\xff\xfe{") is None
+
+@pytest.mark.asyncio
+async def test_handle_relay_forwards_raw_frames_in_order():
+    queue = asyncio.Queue()
+    frames = ['{"message": "a", "partial": true}', '{"message": "b", "partial": false}']
+    for frame in frames:
+        queue.put_nowait(frame)
+    queue.put_nowait(None)
+
+    output = RawOutput()
+    await handle_relay(ServerInputAdapter(queue), output)
+    assert output.frames == frames
+
+@pytest.mark.asyncio
+async def test_handle_relay_continues_after_failed_send():
+    queue = asyncio.Queue()
+    for frame in ("one", "two", None):
+        queue.put_nowait(frame)
+
+    output = RawOutput(fail_on="one")
+    await handle_relay(ServerInputAdapter(queue), output)
+    assert output.frames == ["two"]
@@ -0,0 +1,95 @@
+import threading
+from src.chat_handler.render_thread import RenderThread
+
+
+def blocked_render_thread(**kwargs):
+    """A started render thread that is stuck in its first call until the returned event is set."""
+    render_thread = RenderThread(**kwargs)
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    render_thread.start()
+    render_thread.submit(block)
+    assert started.wait(5)
+    return render_thread, release
+
+
+def test_render_thread_runs_calls_in_order():
+    calls = []
+    render_thread = RenderThread()
+    render_thread.start()
+    for i in range(5):
+        render_thread.submit(calls.append, i)
+    render_thread.stop()
+    assert calls == [0, 1, 2, 3, 4]
+
+def test_render_thread_coalesces_appends_while_busy():
+    drawn = []
+    render_thread, release = blocked_render_thread()
+
+    for token in ["a", "b", "c"]:
+        render_thread.append("panel", drawn.append, token)
+    release.set()
+    render_thread.stop()
+
+    assert drawn == ["abc"]
+
+def test_render_thread_keeps_appends_behind_later_calls():
+    events = []
+    render_thread, release = blocked_render_thread()
+
+    render_thread.append("panel", events.append, "a")
+    render_thread.submit(events.append, "stop", target="panel")
+    render_thread.append("panel", events.append, "b")
+    release.set()
+    render_thread.stop()
+
+    assert events == ["a", "stop", "b"]
+
+def test_render_thread_drops_oldest_partial_frames_when_behind():
+    shown = []
+    render_thread, release = blocked_render_thread(max_pending=2)
+
+    render_thread.submit(shown.append, "start")
+    for i in range(4):
+        render_thread.submit(shown.append, f"frame {i}", droppable=True)
+    release.set()
+    render_thread.stop()
+
+    assert shown == ["start", "frame 3"]
+    assert render_thread.dropped == 3
+
+def test_render_thread_makes_complete_messages_wait_for_room():
+    shown = []
+    render_thread, release = blocked_render_thread(max_pending=2)
+
+    render_thread.submit(shown.append, "message 0")
+    render_thread.submit(shown.append, "message 1")
+    waiting = threading.Thread(target=render_thread.submit, args=(shown.append, "message 2"))
+    waiting.start()
+    waiting.join(0.2)
+    assert waiting.is_alive()
+
+    release.set()
+    waiting.join(5)
+    assert not waiting.is_alive()
+    render_thread.stop()
+
+    assert shown == ["message 0", "message 1", "message 2"]
+    assert render_thread.dropped == 0
+
+def test_render_thread_survives_failing_calls():
+    calls = []
+
+    def fail():
+        raise RuntimeError("terminal gone")
+
+    render_thread = RenderThread()
+    render_thread.start()
+    render_thread.submit(fail)
+    render_thread.submit(calls.append, "after")
+    render_thread.stop()
+    assert calls == ["after"]
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from src.chat_handler.conversation_manager import ConversationManager
+from src.chat_handler.segmented_response import SentenceSegmenter, SegmentedResponder, segment_responder
+
+def test_segmenter_splits_on_sentence_end():
+    segmenter = SentenceSegmenter(min_chars=5)
+    assert segmenter.feed("Hello there. How") == ["Hello there. "]
+    assert segmenter.feed(" are you? Fine") == ["How are you? "]
+    assert segmenter.flush() == "Fine"
+    assert segmenter.flush() is None
+
+def test_segmenter_waits_for_following_whitespace():
+    segmenter = SentenceSegmenter(min_chars=1)
+    # "3.14" must not be cut at the decimal point
+    assert segmenter.feed("Pi is 3.") == []
+    assert segmenter.feed("14 roughly.") == []
+    assert segmenter.feed(" Next") == ["Pi is 3.14 roughly. "]
+
+def test_segmenter_merges_short_segments():
+    segmenter = SentenceSegmenter(min_chars=20)
+    assert segmenter.feed("Hi. Dr. Smith is here today. ") == ["Hi. Dr. Smith is here today. "]
+
+def test_segmenter_splits_on_newline():
+    segmenter = SentenceSegmenter(min_chars=1)
+    assert segmenter.feed("first line\nsecond") == ["first line\n"]
+
+def test_segmenter_cuts_long_text():
+    segmenter = SentenceSegmenter(min_chars=1, max_chars=10)
+    assert segmenter.feed("aaaa bbbb cccc dddd") == ["aaaa bbbb "]
+    assert segmenter.flush() == "cccc dddd"
+
+@pytest.mark.asyncio
+async def test_segmented_responder_answers_before_finish():
+    answered = []
+    first_answered = asyncio.Event()
+
+    async def respond_segment(segment, index):
+        answered.append((index, segment))
+        first_answered.set()
+        return segment.upper()
+
+    responder = SegmentedResponder(respond_segment, SentenceSegmenter(min_chars=1))
+    responder.feed("one. tw")
+
+    # the first sentence is answered while the prompt is still streaming
+    await asyncio.wait_for(first_answered.wait(), timeout=1)
+    assert answered == [(0, "one. ")]
+
+    answer = await responder.finish("o.")
+    assert answered == [(0, "one. "), (1, "two.")]
+    assert answer == "ONE. TWO."
+
+@pytest.mark.asyncio
+async def test_segmented_responder_empty():
+    async def respond_segment(segment, index):
+        raise AssertionError("should not be called")
+
+    responder = SegmentedResponder(respond_segment)
+    assert await responder.finish("   ") == ""
+
+
+class EchoStreamHandler:
+    async def get_response_stream(self, question, conversation):
+        yield question.strip().upper()
+
+class RecordingOutput:
+    def __init__(self):
+        self.frames = []
+
+    async def write_message(self, data):
+        self.frames.append(data)
+
+@pytest.mark.asyncio
+async def test_segment_responder_streams_partial_frames_and_keeps_history():
+    output = RecordingOutput()
+    conversation = ConversationManager()
+    responder = segment_responder(EchoStreamHandler(), output, conversation, "req-1", "stage")
+    responder.segmenter = SentenceSegmenter(min_chars=1)
+
+    responder.feed("one. ")
+    answer = await responder.finish("two.")
+
+    assert answer == "ONE. TWO."
+    # the caller sends the final frame
+    assert all(frame["partial"] and frame["request_id"] == "req-1" for frame in output.frames)
+    assert "".join(frame["message"] for frame in output.frames) == "ONE. TWO."
+    assert [message["role"] for message in conversation.get_conversation()] == ["questioner", "responder", "questioner", "responder"]
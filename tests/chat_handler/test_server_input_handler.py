@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+import pytest
+from src.adapters.input.server_input_adapter import ServerInputAdapter
+from src.chat_handler import ui_utils
+from src.chat_handler.chat_handler import ChatHandler
+from src.chat_handler.server_input_handler import handle_server_input
+
+
+class SlowHandler:
+    """Answers after a delay, recording how many requests it was answering at once."""
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def get_response(self, question, conversation):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return question.upper()
+
+
+class RecordingOutput:
+    def __init__(self):
+        self.frames = []
+
+    async def write_message(self, data):
+        self.frames.append(data)
+
+
+class AckingQueue(asyncio.Queue):
+    def __init__(self):
+        super().__init__()
+        self.acked = []
+
+    def ack(self, request_id):
+        self.acked.append(request_id)
+
+
+@pytest.fixture
+def headless():
+    ui_utils.set_headless()
+    yield
+    ui_utils.set_headless(False)
+
+
+async def serve(concurrency, prompts):
+    queue = AckingQueue()
+    handler = SlowHandler()
+    output = RecordingOutput()
+    chat_handler = ChatHandler(ServerInputAdapter(queue), output, mode="forwarder", server=True)
+    chat_handler.responder_handler = handler
+    chat_handler.concurrency = concurrency
+
+    request_ids = [str(uuid.uuid4()) for _ in prompts]
+    for request_id, prompt in zip(request_ids, prompts):
+        queue.put_nowait({"role": "Questioner", "message": prompt, "partial": False, "request_id": request_id})
+
+    task = asyncio.create_task(handle_server_input(chat_handler))
+    try:
+        for _ in range(200):
+            if len(queue.acked) == len(prompts):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        # a cancelled read is reported as EOF, so cancel until the handler stops
+        while not task.done():
+            task.cancel()
+            await asyncio.sleep(0.01)
+    return chat_handler, handler, queue, request_ids
+
+@pytest.mark.asyncio
+async def test_server_answers_concurrently_up_to_its_concurrency(headless):
+    chat_handler, handler, queue, request_ids = await serve(2, ["one", "two", "three", "four"])
+
+    assert handler.max_active == 2
+    # each request is acked once it was answered, not when the next one is read
+    assert sorted(queue.acked) == sorted(request_ids)
+    # a request's turns stay together in the history
+    history = chat_handler.conversation_manager.get_conversation()
+    assert [turn["content"].lower() for turn in history[::2]] == [turn["content"].lower() for turn in history[1::2]]
+
+@pytest.mark.asyncio
+async def test_server_answers_one_at_a_time_by_default(headless):
+    chat_handler, handler, queue, request_ids = await serve(1, ["one", "two", "three"])
+
+    assert handler.max_active == 1
+    assert [turn["content"] for turn in chat_handler.conversation_manager.get_conversation()] == ["one", "ONE", "two", "TWO", "three", "THREE"]
+
+def test_subprocess_workers_set_the_concurrency():
+    chat_handler = ChatHandler(None, None, mode="subprocess", server=True, cmd=["true"], workers=3)
+    assert chat_handler.concurrency == 3
+    assert ChatHandler(None, None, mode="forwarder", server=True, workers=3).concurrency == 1
@@ -0,0 +1,75 @@
+import asyncio
+import io
+from rich.console import Console
+from src.chat_handler.stream_dashboard import DashboardStreamRenderer, StreamDashboard
+from src.chat_handler.ui_utils import custom_theme
+
+
+def make_dashboard(**kwargs):
+    output = io.StringIO()
+    live_console = Console(file=output, force_terminal=True, width=120, theme=custom_theme)
+    return StreamDashboard(live_console=live_console, **kwargs), output
+
+
+def test_dashboard_tracks_each_stream():
+    dashboard, output = make_dashboard(refresh_per_second=1000)
+    dashboard.start()
+    dashboard.stream_started("req-one-1234", "Questioner")
+    dashboard.stream_started("req-two-5678", "Questioner")
+    dashboard.stream_update("req-one-1234", "hello there world")
+    dashboard.stream_update("req-two-5678", "hi", phase="answering")
+
+    assert dashboard.streams["req-one-1234"].tokens == 3
+    assert dashboard.streams["req-two-5678"].phase == "answering"
+
+    dashboard.stream_finished("req-one-1234")
+    dashboard.stop()
+
+    assert list(dashboard.streams) == ["req-two-5678"]
+    assert dashboard.finished == 1
+    assert dashboard.finished_tokens == 3
+    assert "req-two-" in output.getvalue()
+
+def test_dashboard_ignores_unknown_streams():
+    dashboard, _ = make_dashboard()
+    dashboard.stream_update("missing", "text")
+    dashboard.stream_finished("missing")
+    assert dashboard.streams == {}
+    assert dashboard.finished == 0
+
+def test_compact_dashboard_shows_only_aggregate():
+    dashboard, output = make_dashboard(compact=True)
+    dashboard.start()
+    dashboard.stream_started("req-one-1234", "Questioner")
+    dashboard.stream_update("req-one-1234", "some streamed words")
+    dashboard.stop()
+
+    rows, summary = dashboard._snapshot(0.0)
+    assert rows == []
+    assert "1 active, 0 finished" in output.getvalue()
+    assert "req-one-" not in output.getvalue()
+
+def test_dashboard_limits_refresh_rate(monkeypatch):
+    dashboard, _ = make_dashboard(refresh_per_second=1)
+    draws = []
+    monkeypatch.setattr(dashboard, "_draw", lambda snapshot: draws.append(snapshot))
+    dashboard.stream_started("req", "Questioner")
+    for _ in range(200):
+        dashboard.stream_update("req", "token ")
+    assert len(draws) == 1
+
+def test_renderer_finishes_stream_after_message():
+    dashboard, _ = make_dashboard()
+    renderer = DashboardStreamRenderer(dashboard, "req")
+    renderer.start_streaming(True, "Assistant", "Questioner", "Questioner", "Hel")
+    renderer.update_streaming("lo")
+    renderer.end_streaming()
+    renderer.display_complete_message(True, "Assistant", "Questioner", "Questioner", "Hello")
+    assert dashboard.streams["req"].phase == "answering"
+
+    dashboard.observer("req")("An answer")
+    assert dashboard.streams["req"].tail == "HelloAn answer"
+
+    asyncio.run(renderer.after_message(server_mode=True))
+    assert dashboard.streams == {}
+    assert dashboard.finished == 1
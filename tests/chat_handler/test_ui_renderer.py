@@ -0,0 +1,69 @@
+import io
+import time
+from rich.console import Console
+from src.chat_handler.ui_renderer import StreamingPanel
+from src.chat_handler.ui_utils import custom_theme
+
+
+def make_panel(**kwargs):
+    output = io.StringIO()
+    live_console = Console(file=output, force_terminal=True, width=60, theme=custom_theme)
+    return StreamingPanel("Assistant", "assistant", live_console=live_console, **kwargs), output
+
+
+def test_streaming_panel_accumulates_chunks():
+    panel, _ = make_panel(initial_text="Hel")
+    with panel:
+        panel.append("lo ")
+        panel.append("")
+        panel.append("world")
+    assert panel.content == "Hello world"
+    # reading the content again doesn't change it
+    assert panel.content == "Hello world"
+
+def test_streaming_panel_limits_refresh_rate(monkeypatch):
+    panel, _ = make_panel(refresh_per_second=1)
+    refreshes = []
+    with panel:
+        monkeypatch.setattr(panel._live, "refresh", lambda: refreshes.append(1))
+        for _ in range(500):
+            panel.append("token ")
+
+    # all chunks arrived within the first frame interval, so only stopping draws a frame
+    assert refreshes == [1]
+    assert panel.content == "token " * 500
+
+def test_streaming_panel_draws_pending_text_while_stream_pauses():
+    panel, output = make_panel(refresh_per_second=20)
+    with panel:
+        panel.append("before the pause")
+        # nothing else arrives, yet the next frame still shows the text
+        deadline = time.monotonic() + 2
+        while "before the pause" not in output.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert "before the pause" in output.getvalue()
+
+def test_streaming_panel_draws_final_text_on_stop():
+    panel, output = make_panel(refresh_per_second=1)
+    with panel:
+        panel.append("the final words")
+    assert "the final words" in output.getvalue()
+
+def test_streaming_panel_draws_on_render_thread():
+    from src.chat_handler import ui_utils
+    from src.chat_handler.render_thread import RenderThread
+
+    render_thread = RenderThread()
+    render_thread.start()
+    ui_utils.set_render_thread(render_thread)
+    try:
+        panel, output = make_panel()
+        with panel:
+            for word in ["drawn ", "off ", "the ", "loop"]:
+                panel.append(word)
+        assert panel.content == "drawn off the loop"
+    finally:
+        ui_utils.set_render_thread(None)
+        render_thread.stop()
+
+    assert "drawn off the loop" in output.getvalue()
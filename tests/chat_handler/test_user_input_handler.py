@@ -10,6 +10,7 @@ async def test_handle_user_input_normal_message(mocker):
     chat_handler.local_name = "You (Human, Client)"
     chat_handler.remote_name = "Assistant (Server)"
     chat_handler.conversation_manager = MagicMock()
+    chat_handler.conversation_manager.load = AsyncMock()
 
     chat_handler.input_adapter.read_message = AsyncMock(side_effect=[
         {"role": "user", "message": "Hello!"},
@@ -47,6 +48,7 @@ async def test_handle_user_input_exit(mocker):
     chat_handler.local_name = "You"
     chat_handler.remote_name = "Assistant"
     chat_handler.conversation_manager = MagicMock()
+    chat_handler.conversation_manager.load = AsyncMock()
 
     chat_handler.input_adapter.read_message = AsyncMock(return_value={"role": "user", "message": "exit"})
     chat_handler.output_adapter = AsyncMock()
@@ -69,6 +71,7 @@ async def test_handle_user_input_read_error(mocker):
     chat_handler.local_name = "You"
     chat_handler.remote_name = "Assistant"
     chat_handler.conversation_manager = MagicMock()
+    chat_handler.conversation_manager.load = AsyncMock()
 
     # First call raises EOFError, second call returns a message, then exit
     chat_handler.input_adapter.read_message = AsyncMock(side_effect=[
@@ -107,6 +110,7 @@ async def test_handle_user_input_write_error(mocker):
     chat_handler.local_name = "You"
     chat_handler.remote_name = "Assistant"
     chat_handler.conversation_manager = MagicMock()
+    chat_handler.conversation_manager.load = AsyncMock()
 
     chat_handler.input_adapter.read_message = AsyncMock(side_effect=[
         {"role": "user", "message": "Test message"},
@@ -137,3 +141,51 @@ async def test_handle_user_input_write_error(mocker):
         )
         # Attempted to write to output_adapter, failed once
         assert chat_handler.output_adapter.write_message.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_user_input_streams_answers_through_the_conversation():
+    from src.transport.adapter_conversation_io import AdapterConversationIO
+
+    class Duplex:
+        """Answers each request with two partial frames and a final one."""
+        def __init__(self):
+            self.sent = []
+            self.inbox = asyncio.Queue()
+
+        async def write_message(self, data):
+            self.sent.append(data)
+            if data.get("type") == "chat":
+                for text in ["Hi ", "there"]:
+                    self.inbox.put_nowait({"role": "Responder", "message": text, "partial": True, "request_id": data["request_id"]})
+                self.inbox.put_nowait({"role": "Responder", "partial": False, "request_id": data["request_id"]})
+
+        async def read_message(self):
+            return await self.inbox.get()
+
+    chat_handler = MagicMock()
+    chat_handler.server = False
+    chat_handler.conversation_manager.load = AsyncMock()
+    chat_handler.input_adapter.read_message = AsyncMock(side_effect=[
+        {"role": "user", "message": "Hello!"},
+        {"role": "user", "message": "exit"}
+    ])
+    duplex = Duplex()
+
+    with patch("src.chat_handler.user_input_handler.UIRenderer") as MockUIRenderer:
+        mock_renderer = MockUIRenderer.return_value
+        mock_renderer.is_streaming = False
+        mock_renderer.after_message = AsyncMock()
+
+        def start_streaming(*args):
+            mock_renderer.is_streaming = True
+        mock_renderer.start_streaming.side_effect = start_streaming
+
+        await asyncio.wait_for(handle_user_input(chat_handler, AdapterConversationIO(duplex)), 5)
+
+        assert mock_renderer.start_streaming.call_args[0][-1] == "Hi "
+        mock_renderer.update_streaming.assert_called_once_with("there")
+        mock_renderer.end_streaming.assert_called_once()
+    # the request grants the server credit for its answer
+    assert duplex.sent[0]["message"] == "Hello!"
+    assert duplex.sent[0]["credit"] > 0
@@ -0,0 +1,51 @@
+import pytest
+from src.messages import codec as codec_module
+from src.messages.codec import JsonCodec, create_codec, get_text_codec
+
+
+def test_json_codec_round_trip():
+    codec = JsonCodec()
+    frame = codec.encode({"role": "Responder", "message": "Grüße", "partial": True})
+    assert isinstance(frame, str)
+    assert codec.decode(frame) == {"role": "Responder", "message": "Grüße", "partial": True}
+    # binary websocket frames decode too
+    assert codec.decode(frame.encode("utf-8"))["message"] == "Grüße"
+
+def test_json_codec_errors_are_standard():
+    codec = create_codec("json")
+    with pytest.raises(ValueError):
+        codec.decode("not json")
+    with pytest.raises(TypeError):
+        codec.encode({"message": {1, 2}})
+
+def test_create_codec_rejects_unknown():
+    with pytest.raises(ValueError, match="Unknown codec"):
+        create_codec("xml")
+
+def test_orjson_codec_matches_json():
+    pytest.importorskip("orjson")
+    frame = create_codec("orjson").encode({"message": "hi"})
+    assert isinstance(frame, str)
+    assert JsonCodec().decode(frame) == {"message": "hi"}
+
+def test_msgpack_codec_round_trip():
+    pytest.importorskip("msgpack")
+    codec = create_codec("msgpack")
+    frame = codec.encode({"message": "hi"})
+    assert isinstance(frame, bytes)
+    assert codec.decode(frame) == {"message": "hi"}
+    with pytest.raises(ValueError):
+        codec.decode("text frame")
+
+def test_unavailable_codecs_are_reported(monkeypatch):
+    monkeypatch.setattr(codec_module, "msgpack", None)
+    monkeypatch.setattr(codec_module, "orjson", None)
+    with pytest.raises(ValueError, match="msgpack package"):
+        create_codec("msgpack")
+    with pytest.raises(ValueError, match="orjson package"):
+        create_codec("orjson")
+    assert isinstance(create_codec("json"), JsonCodec)
+
+def test_text_codec_falls_back_from_binary(monkeypatch):
+    monkeypatch.setattr(codec_module, "_codec", codec_module.MsgpackCodec())
+    assert not get_text_codec().binary
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import pytest
+from src.pipeline.dag import FanInInput, build_dag_pipeline, load_pipeline_definition, validate_stages
+from src.adapters.input.queue_input_adapter import QueueInput
+
+
+class ListInput:
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    async def read_message(self):
+        if not self.messages:
+            raise EOFError("done")
+        return self.messages.pop(0)
+
+
+class ListOutput:
+    streams_partials = False
+
+    def __init__(self):
+        self.frames = []
+
+    async def write_message(self, data):
+        self.frames.append(data)
+
+
+class TagHandler:
+    """Answers with the stage's tag so merged output shows which stage ran."""
+    def __init__(self, tag, delay=0.0):
+        self.tag = tag
+        self.delay = delay
+
+    async def get_response(self, question, conversation):
+        await asyncio.sleep(self.delay)
+        return f"{self.tag}({question})"
+
+
+@pytest.fixture
+def tag_handlers(monkeypatch):
+    """Build every stage with a TagHandler named after its persona (or mode)."""
+    delays = {}
+
+    def fake_create_response_handler(mode, provider, model, persona=None, llm_client=None):
+        tag = persona or mode
+        return TagHandler(tag, delays.get(tag, 0.0)), tag
+
+    monkeypatch.setattr("src.pipeline.stage.create_response_handler", fake_create_response_handler)
+    monkeypatch.setattr("src.pipeline.stage.get_shared_client", lambda provider, model: None)
+    return delays
+
+
+def test_validate_stages_topological_order():
+    stages = [
+        {"name": "merge", "type": "forwarder", "inputs": ["a", "b"]},
+        {"name": "a", "type": "forwarder", "inputs": ["src"]},
+        {"name": "src", "type": "forwarder"},
+        {"name": "b", "type": "forwarder", "inputs": ["src"]},
+    ]
+    assert validate_stages(stages) == ["src", "a", "b", "merge"]
+
+
+@pytest.mark.parametrize("stages, error", [
+    ([{"type": "forwarder"}], "needs a name"),
+    ([{"name": "a", "type": "forwarder"}, {"name": "a", "type": "forwarder"}], "Duplicate"),
+    ([{"name": "a", "type": "robot"}], "unknown type"),
+    ([{"name": "a", "type": "persona"}], "needs a persona"),
+    ([{"name": "a", "type": "forwarder", "inputs": ["missing"]}], "unknown stage"),
+    ([{"name": "a", "type": "forwarder", "inputs": ["b"]}, {"name": "b", "type": "forwarder", "inputs": ["a"]}], "cycle"),
+    ([{"name": "a", "type": "forwarder", "concurrency": 0}], "concurrency"),
+    ([{"name": "a", "type": "forwarder", "concurrency": 2}], "history"),
+    ([{"name": "a", "type": "forwarder", "merge": "vote"}], "merge strategy"),
+])
+def test_validate_stages_errors(stages, error):
+    with pytest.raises(ValueError, match=error):
+        validate_stages(stages)
+
+
+def test_load_pipeline_definition(tmp_path):
+    path = tmp_path / "pipeline.json"
+    path.write_text(json.dumps({"stages": [{"name": "a", "type": "forwarder"}]}))
+    assert load_pipeline_definition(str(path)) == [{"name": "a", "type": "forwarder"}]
+
+    path.write_text(json.dumps({"stages": []}))
+    with pytest.raises(ValueError, match="non-empty 'stages'"):
+        load_pipeline_definition(str(path))
+
+
+def test_bundled_example_is_valid():
+    stages = load_pipeline_definition("pipelines/english_fanout.json")
+    order = validate_stages(stages)
+    assert order[0] == "input" and order[-1] == "translations"
+
+
+@pytest.mark.asyncio
+async def test_fan_in_merges_in_declared_order():
+    queue = asyncio.Queue()
+    fan_in = FanInInput(QueueInput(queue, producers=2), ["a", "b"])
+    await queue.put({"message": "from ", "partial": True, "request_id": "r1", "stage": "b"})
+    await queue.put({"message": "A", "partial": False, "request_id": "r1", "stage": "a"})
+    await queue.put({"message": "B", "partial": False, "request_id": "r1", "stage": "b"})
+
+    merged = await fan_in.read_message()
+    assert merged == {"role": "Questioner", "message": "[a]\nA\n\n[b]\nfrom B", "partial": False, "request_id": "r1"}
+
+
+@pytest.mark.asyncio
+async def test_fan_in_flushes_incomplete_requests_at_end():
+    queue = asyncio.Queue()
+    fan_in = FanInInput(QueueInput(queue, producers=2), ["a", "b"], merge="join")
+    await queue.put({"message": "only a", "partial": False, "request_id": "r1", "stage": "a"})
+    await queue.put(None)
+    await queue.put(None)
+
+    assert (await fan_in.read_message())["message"] == "only a"
+    with pytest.raises(EOFError):
+        await fan_in.read_message()
+
+
+@pytest.mark.asyncio
+async def test_dag_fan_out_fan_in(tag_handlers):
+    stages = [
+        {"name": "input", "type": "forwarder"},
+        {"name": "fr", "type": "persona", "persona": "to_fr", "inputs": ["input"]},
+        {"name": "de", "type": "persona", "persona": "to_de", "inputs": ["input"]},
+        {"name": "merge", "type": "forwarder", "inputs": ["fr", "de"], "merge": "join"},
+    ]
+    output = ListOutput()
+    pipeline = build_dag_pipeline(
+        stages, "ollama", "llama3.3",
+        ListInput([{"role": "Questioner", "message": "hi", "request_id": "r1"}]),
+        output
+    )
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    assert len(output.frames) == 1
+    assert output.frames[0]["request_id"] == "r1"
+    assert output.frames[0]["message"] == "forwarder(to_fr(forwarder(hi))\n\nto_de(forwarder(hi)))"
+
+
+@pytest.mark.asyncio
+async def test_dag_fan_out_runs_concurrently(tag_handlers):
+    tag_handlers.update({"slow_a": 0.3, "slow_b": 0.3, "slow_c": 0.3})
+    stages = [{"name": name, "type": "persona", "persona": name} for name in ("slow_a", "slow_b", "slow_c")]
+    output = ListOutput()
+    pipeline = build_dag_pipeline(
+        stages, "ollama", "llama3.3",
+        ListInput([{"role": "Questioner", "message": "hi", "request_id": "r1"}]),
+        output
+    )
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    # three 0.3s stages in parallel finish well before their sum
+    assert loop.time() - started < 0.6
+    assert sorted(frame["stage"] for frame in output.frames) == ["slow_a", "slow_b", "slow_c"]
+
+
+@pytest.mark.asyncio
+async def test_dag_stage_concurrency(tag_handlers):
+    tag_handlers["slow"] = 0.2
+    stages = [{"name": "slow", "type": "persona", "persona": "slow", "concurrency": 4, "history": False}]
+    output = ListOutput()
+    messages = [{"role": "Questioner", "message": f"m{i}", "request_id": f"r{i}"} for i in range(4)]
+    pipeline = build_dag_pipeline(stages, "ollama", "llama3.3", ListInput(messages), output)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    assert loop.time() - started < 0.6
+    assert sorted(frame["request_id"] for frame in output.frames) == ["r0", "r1", "r2", "r3"]
@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+from src.pipeline.pipeline import Pipeline
+from src.pipeline.stage import PipelineStage, parse_stage_spec
+from src.adapters.input.queue_input_adapter import QueueInput
+from src.adapters.output.queue_output_adapter import QueueOutput
+
+
+class ListInput:
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    async def read_message(self):
+        if not self.messages:
+            raise EOFError("done")
+        return self.messages.pop(0)
+
+
+class ListOutput:
+    def __init__(self, streams_partials=True):
+        self.streams_partials = streams_partials
+        self.frames = []
+
+    async def write_message(self, data):
+        self.frames.append(data)
+
+
+class SuffixHandler:
+    """Streams the question back word by word with a suffix appended."""
+    def __init__(self, suffix):
+        self.suffix = suffix
+
+    def get_response(self, question, conversation):
+        return question + self.suffix
+
+    def get_response_stream(self, question, conversation):
+        for word in (question + self.suffix).split(" "):
+            yield word + " "
+
+
+def build_pipeline(handlers, input_adapter, output_adapter, stream):
+    queues = [asyncio.Queue() for _ in range(len(handlers) + 1)]
+    stages = [
+        PipelineStage(f"stage{i}", handler, QueueInput(queues[i]), QueueOutput(queues[i + 1]), stream=stream)
+        for i, handler in enumerate(handlers)
+    ]
+    return Pipeline(stages, input_adapter, output_adapter, QueueOutput(queues[0]), QueueInput(queues[-1]))
+
+
+def test_parse_stage_spec():
+    assert parse_stage_spec("forwarder") == ("forwarder", None)
+    assert parse_stage_spec("llm") == ("llm", None)
+    assert parse_stage_spec("english_german_translator") == ("persona", "english_german_translator")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_non_streaming_chain():
+    output = ListOutput()
+    pipeline = build_pipeline(
+        [SuffixHandler(" one"), SuffixHandler(" two")],
+        ListInput([{"role": "Questioner", "message": "hello", "request_id": "r1"}]),
+        output,
+        stream=False
+    )
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    assert output.frames == [{"role": "Responder", "message": "hello one two", "partial": False, "request_id": "r1"}]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_streaming_chain():
+    output = ListOutput()
+    pipeline = build_pipeline(
+        [SuffixHandler(" one"), SuffixHandler(" two")],
+        ListInput([{"role": "Questioner", "message": "hello", "request_id": "r1"}]),
+        output,
+        stream=True
+    )
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    partials = [f for f in output.frames if f["partial"]]
+    assert partials
+    assert all(f["request_id"] == "r1" for f in output.frames)
+    assert "".join(f["message"] for f in partials).split() == ["hello", "one", "two"]
+    assert output.frames[-1] == {"role": "Responder", "partial": False, "request_id": "r1"}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_coalesces_for_non_streaming_output():
+    output = ListOutput(streams_partials=False)
+    pipeline = build_pipeline(
+        [SuffixHandler(" one")],
+        ListInput([{"role": "Questioner", "message": "hello"}]),
+        output,
+        stream=True
+    )
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    assert len(output.frames) == 1
+    assert output.frames[0]["message"].split() == ["hello", "one"]
+    assert output.frames[0]["partial"] is False
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_on_exit():
+    output = ListOutput()
+    pipeline = build_pipeline(
+        [SuffixHandler("!")],
+        ListInput([
+            {"role": "Questioner", "message": "exit"},
+            {"role": "Questioner", "message": "never seen"}
+        ]),
+        output,
+        stream=False
+    )
+    await asyncio.wait_for(pipeline.run(), timeout=2)
+
+    assert output.frames == []
+
+
+@pytest.mark.asyncio
+async def test_stage_segment_stream_starts_before_upstream_final():
+    inbox, outbox = asyncio.Queue(), asyncio.Queue()
+    stage = PipelineStage("stage", SuffixHandler(""), QueueInput(inbox), QueueOutput(outbox), stream=True, segment_stream=True)
+    task = asyncio.create_task(stage.run())
+
+    await inbox.put({"role": "Responder", "message": "The first sentence is done. The sec", "partial": True, "request_id": "r1"})
+
+    # output for the first sentence arrives while upstream is still streaming
+    first = await asyncio.wait_for(outbox.get(), timeout=1)
+    assert first["partial"] is True
+    assert first["request_id"] == "r1"
+
+    await inbox.put({"role": "Responder", "message": "ond one.", "partial": False, "request_id": "r1"})
+    await inbox.put(None)
+    await asyncio.wait_for(task, timeout=1)
+
+    frames = [first]
+    while (frame := outbox.get_nowait()) is not None:
+        frames.append(frame)
+
+    assert "".join(f["message"] for f in frames if f["partial"]).split() == "The first sentence is done. The second one.".split()
+    assert frames[-1] == {"role": "Responder", "partial": False, "request_id": "r1"}
+    assert sum(1 for f in frames if not f["partial"]) == 1
+
+@pytest.mark.asyncio
+async def test_stage_empty_prompt_still_sends_final_frame():
+    output = ListOutput()
+    stage = PipelineStage("stage", SuffixHandler("!"), ListInput([]), output, stream=True)
+
+    assert await stage.respond("   ", "req-1") == ""
+    assert output.frames == [{"role": "Responder", "partial": False, "request_id": "req-1"}]
+
+def test_stage_rejects_shared_history_with_concurrency():
+    with pytest.raises(ValueError, match="history"):
+        PipelineStage("stage", SuffixHandler("!"), ListInput([]), ListOutput(), concurrency=2)
+    assert PipelineStage("stage", SuffixHandler("!"), ListInput([]), ListOutput(), concurrency=2, keep_history=False).concurrency == 2
@@ -0,0 +1,48 @@
+import pytest
+from src.response_handlers.handler_pool import ResponseHandlerPool
+from src.response_handlers.persona_handler import PersonaHandler
+from src.response_handlers.forwarder_handler import ForwarderHandler
+
+def test_handler_pool_reuses_handlers():
+    pool = ResponseHandlerPool(mode="persona", provider="ollama", model="llama3.3")
+    first, description = pool.get("helpful_persona")
+    second, _ = pool.get("helpful_persona")
+
+    assert isinstance(first, PersonaHandler)
+    assert first is second
+    assert description == "Persona (helpful_persona, ollama/llama3.3)"
+    assert len(pool) == 1
+
+def test_handler_pool_shares_llm_client():
+    pool = ResponseHandlerPool(mode="persona", provider="ollama", model="llama3.3")
+    helpful, _ = pool.get("helpful_persona")
+    sassy, _ = pool.get("sassy_persona")
+
+    assert helpful is not sassy
+    assert helpful.llm_client is sassy.llm_client
+
+def test_handler_pool_default_persona():
+    pool = ResponseHandlerPool(mode="persona", provider="ollama", model="llama3.3", default_persona="sassy_persona")
+    handler, _ = pool.get()
+    assert handler.persona_name == "sassy_persona"
+
+def test_handler_pool_evicts_least_recently_used():
+    pool = ResponseHandlerPool(mode="persona", provider="ollama", model="llama3.3", max_handlers=2)
+    helpful, _ = pool.get("helpful_persona")
+    pool.get("sassy_persona")
+    pool.get("helpful_persona")
+    pool.get("exact_bot")
+
+    assert len(pool) == 2
+    assert pool.get("helpful_persona")[0] is helpful
+
+def test_handler_pool_unknown_persona():
+    pool = ResponseHandlerPool(mode="persona", provider="ollama", model="llama3.3")
+    with pytest.raises(ValueError, match="No system prompt found"):
+        pool.get("does_not_exist")
+
+def test_handler_pool_non_llm_mode():
+    pool = ResponseHandlerPool(mode="forwarder", provider="ollama", model="llama3.3")
+    handler, description = pool.get()
+    assert isinstance(handler, ForwarderHandler)
+    assert description == "forwarder"
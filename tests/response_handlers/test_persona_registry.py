@@ -0,0 +1,114 @@
+import json
+import os
+import pytest
+from src.response_handlers.persona_registry import PersonaRegistry, estimate_tokens
+
+
+def write_personas(path, personas):
+    path.write_text(json.dumps({name: {"system_prompt": prompt} for name, prompt in personas.items()}))
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_registry_loads_and_precomputes_tokens(tmp_path):
+    personas_file = tmp_path / "personas.json"
+    write_personas(personas_file, {"helpful": "You are helpful."})
+
+    registry = PersonaRegistry(personas_file=str(personas_file))
+    persona = registry.get("helpful")
+
+    assert persona.system_prompt == "You are helpful."
+    assert persona.token_count == estimate_tokens("You are helpful.") == 4
+    assert registry.names() == ["helpful"]
+
+
+def test_registry_parses_once(tmp_path, mocker):
+    personas_file = tmp_path / "personas.json"
+    write_personas(personas_file, {"helpful": "You are helpful."})
+
+    registry = PersonaRegistry(personas_file=str(personas_file), reload_interval=0)
+    load_spy = mocker.spy(registry, "_load")
+
+    first = registry.get("helpful")
+    second = registry.get("helpful")
+
+    assert first is second
+    assert load_spy.call_count == 1
+
+
+def test_registry_unknown_persona(tmp_path):
+    personas_file = tmp_path / "personas.json"
+    write_personas(personas_file, {"helpful": "You are helpful."})
+
+    registry = PersonaRegistry(personas_file=str(personas_file))
+    with pytest.raises(ValueError, match="No system prompt found for persona 'missing'"):
+        registry.get("missing")
+
+
+def test_registry_missing_file(tmp_path):
+    registry = PersonaRegistry(personas_file=str(tmp_path / "nope.json"))
+    with pytest.raises(FileNotFoundError):
+        registry.get("helpful")
+
+
+def test_registry_extra_directories_override(tmp_path):
+    personas_file = tmp_path / "personas.json"
+    write_personas(personas_file, {"helpful": "Base prompt.", "sassy": "Sassy prompt."})
+    extra_dir = tmp_path / "extra"
+    extra_dir.mkdir()
+    write_personas(extra_dir / "more.json", {"helpful": "Override prompt.", "exact": "Exact prompt."})
+
+    registry = PersonaRegistry(personas_file=str(personas_file), persona_dirs=[str(extra_dir)])
+
+    assert registry.get("helpful").system_prompt == "Override prompt."
+    assert registry.get("sassy").system_prompt == "Sassy prompt."
+    assert registry.get("exact").source == str(extra_dir / "more.json")
+
+
+def test_registry_hot_reload(tmp_path):
+    personas_file = tmp_path / "personas.json"
+    write_personas(personas_file, {"helpful": "Old prompt."})
+
+    registry = PersonaRegistry(personas_file=str(personas_file), reload_interval=0)
+    old = registry.get("helpful")
+
+    write_personas(personas_file, {"helpful": "New prompt."})
+    bump_mtime(personas_file)
+
+    assert registry.get("helpful").system_prompt == "New prompt."
+    # callers holding the old persona are unaffected by the swap
+    assert old.system_prompt == "Old prompt."
+
+
+def test_registry_reload_keeps_snapshot_on_bad_file(tmp_path):
+    personas_file = tmp_path / "personas.json"
+    write_personas(personas_file, {"helpful": "Good prompt."})
+
+    registry = PersonaRegistry(personas_file=str(personas_file), reload_interval=0)
+    registry.get("helpful")
+
+    personas_file.write_text("{ not json")
+    bump_mtime(personas_file)
+
+    assert registry.get("helpful").system_prompt == "Good prompt."
+
+
+def test_registry_rejects_non_object_file(tmp_path):
+    personas_file = tmp_path / "personas.json"
+    personas_file.write_text(json.dumps(["helpful"]))
+
+    registry = PersonaRegistry(personas_file=str(personas_file))
+    with pytest.raises(ValueError, match="expected an object"):
+        registry.get("helpful")
+
+    write_personas(personas_file, {"helpful": "Good prompt."})
+    registry.reload(force=True)
+    personas_file.write_text(json.dumps("not personas"))
+    bump_mtime(personas_file)
+
+    # a reload to a non-object keeps the last good snapshot
+    assert registry.reload() is False
+    assert registry.get("helpful").system_prompt == "Good prompt."
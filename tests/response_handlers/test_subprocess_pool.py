@@ -0,0 +1,98 @@
+import asyncio
+import sys
+import pytest
+from src.response_handlers.subprocess_pool import SubprocessPool
+from src.response_handlers.subprocess_handler import SubprocessHandler
+
+# answers each request line with its message upper-cased, exiting on "crash"; "pid?" asks for its pid
+WORKER = """
+import json, os, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["message"] == "crash":
+        sys.exit(1)
+    message = str(os.getpid()) if request["message"] == "pid?" else request["message"].upper()
+    answer = {"request_id": request["request_id"], "message": message}
+    print(json.dumps(answer), flush=True)
+"""
+
+def worker_cmd():
+    return [sys.executable, "-c", WORKER]
+
+
+@pytest.mark.asyncio
+async def test_pool_answers_by_request_id():
+    pool = SubprocessPool(worker_cmd(), workers=2)
+    try:
+        answers = await asyncio.gather(*(pool.request(f"hello {i}") for i in range(6)))
+        assert answers == [f"HELLO {i}" for i in range(6)]
+
+        # concurrent requests are spread over both workers
+        pids = await asyncio.gather(*(pool.request("pid?") for _ in range(4)))
+        assert len(set(pids)) == 2
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_pool_restarts_crashed_worker():
+    pool = SubprocessPool(worker_cmd(), workers=1, restart_delay=0.01)
+    try:
+        with pytest.raises(EOFError):
+            await pool.request("crash")
+
+        for _ in range(200):
+            if pool.workers[0].alive and pool.restarts:
+                break
+            await asyncio.sleep(0.01)
+
+        answer = await pool.request("back")
+        assert answer == "BACK"
+        assert pool.restarts == 1
+    finally:
+        await pool.close()
+
+def test_pool_requires_command_and_workers():
+    with pytest.raises(ValueError):
+        SubprocessPool([])
+    with pytest.raises(ValueError):
+        SubprocessPool(worker_cmd(), workers=0)
+
+@pytest.mark.asyncio
+async def test_subprocess_handler_streams_answer():
+    handler = SubprocessHandler(worker_cmd(), workers=1)
+    try:
+        tokens = [token async for token in handler.get_response_stream("hi", [])]
+        assert tokens == ["HI"]
+    finally:
+        await handler.close()
+
+# streams each answer word by word as partial frames, interleaving concurrent requests
+STREAMING_WORKER = """
+import json, sys
+for line in sys.stdin:
+    if not line.strip():
+        continue
+    request = json.loads(line)
+    print(flush=True)  # a keep-alive
+    for word in request["message"].split():
+        print(json.dumps({"request_id": request["request_id"], "message": word + " ", "partial": True}), flush=True)
+    print(json.dumps({"request_id": request["request_id"], "partial": False}), flush=True)
+"""
+
+@pytest.mark.asyncio
+async def test_pool_streams_partial_frames():
+    pool = SubprocessPool([sys.executable, "-c", STREAMING_WORKER])
+    try:
+        chunks = [chunk async for chunk in pool.stream("one two three")]
+        assert chunks == ["one ", "two ", "three "]
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_pool_reads_lines_over_default_limit():
+    pool = SubprocessPool(worker_cmd(), max_line_bytes=1024 * 1024)
+    try:
+        answer = await pool.request("x" * 200_000)
+        assert answer == "X" * 200_000
+    finally:
+        await pool.close()
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import uuid
+import pytest
+from src.tracing.tracer import Tracer, trace_id_for
+from src.tracing.exporters import JsonlSpanExporter, OtlpJsonSpanExporter, create_span_exporter
+from src.messages.message_types import ChatMessage
+from src.pipeline.pipeline import Pipeline
+from src.pipeline.stage import PipelineStage
+from src.adapters.input.queue_input_adapter import QueueInput
+from src.adapters.output.queue_output_adapter import QueueOutput
+from tests.pipeline.test_pipeline import ListInput, ListOutput, SuffixHandler
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    # application modules import the process-wide tracer as tracing.tracer
+    exporter = ListExporter()
+    monkeypatch.setattr("tracing.tracer._tracer", Tracer("test", exporter))
+    return exporter
+
+
+def test_trace_id_joins_on_request_id():
+    request_id = str(uuid.uuid4())
+    assert trace_id_for(request_id) == uuid.UUID(request_id).hex
+    assert len(trace_id_for("not-a-uuid")) == 32
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    assert not tracer.enabled
+    assert tracer.continue_trace(None, str(uuid.uuid4())) is None
+    assert tracer.record("hop", "abc", 1.0, 2.0) is None
+
+def test_continue_trace_names_hop_span():
+    tracer = Tracer("hop1", ListExporter())
+    incoming = {"trace_id": "t" * 32, "parent_span_id": "upstream", "sent_at": 1.0, "received_at": 1.5, "queued_at": 1.6}
+    hop = tracer.continue_trace(incoming)
+
+    assert hop["trace_id"] == "t" * 32
+    assert hop["upstream_span_id"] == "upstream"
+    assert hop["parent_span_id"] not in (None, "upstream")
+
+    tracer.record_ingress(hop, incoming, read_at=2.0)
+    tracer.end_hop(hop, 1.5)
+    names = {span.name: span for span in tracer.exporter.spans}
+
+    assert set(names) == {"transit", "validation", "queue_wait", "hop"}
+    assert names["queue_wait"].duration_ms == pytest.approx(400.0)
+    assert names["queue_wait"].parent_span_id == hop["parent_span_id"]
+    assert names["hop"].span_id == hop["parent_span_id"]
+    assert names["hop"].parent_span_id == "upstream"
+
+def test_message_schema_carries_trace():
+    msg = ChatMessage(role="Questioner", message="hi", trace={"trace_id": "abc", "sent_at": 1.0})
+    assert msg.trace.trace_id == "abc"
+    assert json.loads(msg.model_dump_json())["trace"]["sent_at"] == 1.0
+    assert ChatMessage(role="Questioner", message="hi").trace is None
+
+def test_jsonl_exporter(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer("hop1", JsonlSpanExporter(str(path)))
+    tracer.record("generation", "abc", 1.0, 1.25, parent_span_id="p", tokens=3)
+    tracer.close()
+
+    span = json.loads(path.read_text().strip())
+    assert span["name"] == "generation"
+    assert span["hop"] == "hop1"
+    assert span["duration_ms"] == 250.0
+    assert span["attributes"] == {"tokens": 3}
+
+def test_otlp_exporter(tmp_path):
+    path = tmp_path / "spans.otlp.jsonl"
+    tracer = Tracer("hop1", OtlpJsonSpanExporter(str(path)))
+    tracer.record("send", "a" * 32, 1.0, 2.0, parent_span_id="b" * 16, frames=2)
+    tracer.close()
+
+    request = json.loads(path.read_text().strip())
+    resource_spans = request["resourceSpans"][0]
+    span = resource_spans["scopeSpans"][0]["spans"][0]
+    assert resource_spans["resource"]["attributes"][0] == {"key": "service.name", "value": {"stringValue": "hop1"}}
+    assert span["traceId"] == "a" * 32
+    assert span["parentSpanId"] == "b" * 16
+    assert span["startTimeUnixNano"] == "1000000000"
+    assert span["attributes"] == [{"key": "frames", "value": {"intValue": "2"}}]
+
+def test_unknown_trace_format(tmp_path):
+    with pytest.raises(ValueError, match="Unknown trace format"):
+        create_span_exporter(str(tmp_path / "spans"), "zipkin")
+
+@pytest.mark.asyncio
+async def test_pipeline_spans_form_one_trace(exporter):
+    queues = [asyncio.Queue() for _ in range(3)]
+    stages = [
+        PipelineStage(f"stage{i}", SuffixHandler(f" {i}"), QueueInput(queues[i]), QueueOutput(queues[i + 1]), stream=True)
+        for i in range(2)
+    ]
+    output = ListOutput()
+    pipeline = Pipeline(stages, ListInput([{"role": "Questioner", "message": "hi"}]), output, QueueOutput(queues[0]), QueueInput(queues[-1]))
+    await pipeline.run()
+
+    request_id = output.frames[0]["request_id"]
+    assert all(frame["trace"]["trace_id"] == trace_id_for(request_id) for frame in output.frames)
+
+    hops = [span for span in exporter.spans if span.name == "hop"]
+    assert [span.attributes["stage"] for span in hops] == ["stage0", "stage1"]
+    # the second stage's hop hangs off the first one's
+    assert hops[1].parent_span_id == hops[0].span_id
+
+    names = {span.name for span in exporter.spans}
+    assert {"queue_wait", "time_to_first_token", "generation", "send"} <= names
@@ -0,0 +1,186 @@
+import asyncio
+import contextlib
+import json
+import uuid
+import pytest
+from src.transport.conversation_io import ConversationIO
+from src.transport.adapter_conversation_io import AdapterConversationIO, ConversationEndedError
+from src.transport.flow_control import CreditLedger, InboundStream, StreamCancelledError
+from src.adapters.output.server_output_adapter import ServerOutputAdapter, get_credit_ledger
+from src.ws_server import server_handler
+
+
+class CreditedPeer(ConversationIO):
+    """Answers each request with `chunks` partial frames, sending only as many as it has credit for."""
+
+    def __init__(self, chunks=10):
+        self.chunks = chunks
+        self.inbox = asyncio.Queue()
+        self.sent = []
+        self.ledger = CreditLedger()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.tasks = []
+
+    async def start_conversation(self):
+        pass
+
+    async def end_conversation(self):
+        for task in self.tasks:
+            task.cancel()
+
+    async def listen(self):
+        frame = await self.inbox.get()
+        self.in_flight -= frame.get("partial", False)
+        return frame
+
+    async def respond(self, data):
+        self.sent.append(data)
+        if data.get("type") == "credit":
+            self.ledger.grant(data["request_id"], data["credit"])
+        elif data.get("type") == "cancel":
+            self.ledger.cancel(data["request_id"])
+        else:
+            self.ledger.open(data["request_id"], data["credit"])
+            self.tasks.append(asyncio.create_task(self.answer(data["request_id"])))
+
+    async def answer(self, request_id):
+        try:
+            for number in range(self.chunks):
+                await self.ledger.acquire(request_id)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await self.inbox.put({"request_id": request_id, "message": f"{number} ", "partial": True})
+        except StreamCancelledError:
+            pass
+        await self.inbox.put({"request_id": request_id, "partial": False})
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_chunks_within_the_window():
+    peer = CreditedPeer(chunks=20)
+    chunks = []
+    async for chunk in peer.stream({"role": "Questioner", "message": "count"}, window=4):
+        chunks.append(chunk)
+        await asyncio.sleep(0.001)
+
+    assert "".join(chunks) == "".join(f"{n} " for n in range(20))
+    # the sender never got more than a window ahead of the slow reader
+    assert peer.max_in_flight <= 4
+    assert [frame["type"] for frame in peer.sent[1:]] == ["credit"] * 10
+
+@pytest.mark.asyncio
+async def test_leaving_a_stream_cancels_it():
+    peer = CreditedPeer(chunks=1000)
+    async with contextlib.aclosing(peer.stream({"role": "Questioner", "message": "count"}, window=4)) as chunks:
+        async for chunk in chunks:
+            break
+
+    assert peer.sent[-1]["type"] == "cancel"
+    await asyncio.sleep(0.01)
+    # the sender stopped instead of generating the rest
+    assert peer.inbox.qsize() < 10
+    await peer.end_conversation()
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_are_demultiplexed():
+    peer = CreditedPeer(chunks=5)
+
+    async def collect(message):
+        return [chunk async for chunk in peer.stream({"role": "Questioner", "message": message}, window=2)]
+
+    first, second = await asyncio.gather(collect("a"), collect("b"))
+    assert first == second == [f"{n} " for n in range(5)]
+
+@pytest.mark.asyncio
+async def test_stream_over_adapters_ends_when_the_input_does():
+    class Input:
+        async def read_message(self):
+            raise EOFError("gone")
+
+    class Output:
+        def __init__(self):
+            self.frames = []
+
+        async def write_message(self, data):
+            self.frames.append(data)
+
+    output = Output()
+    conversation = AdapterConversationIO(Input(), output)
+    with pytest.raises(ConversationEndedError, match="gone"):
+        async for _ in conversation.stream({"role": "Questioner", "message": "hi"}):
+            pass
+    assert output.frames[0]["credit"] == 64
+    assert output.frames[-1]["type"] == "cancel"
+
+def test_inbound_stream_returns_credit_in_batches():
+    inbound = InboundStream("a", window=4)
+    assert [inbound.credit() for _ in range(5)] == [0, 2, 0, 2, 0]
+
+@pytest.mark.asyncio
+async def test_server_output_waits_for_credit():
+    class Client:
+        def __init__(self):
+            self.frames = []
+
+        async def send(self, message):
+            self.frames.append(message)
+
+    client, ledger = Client(), get_credit_ledger()
+    adapter = ServerOutputAdapter({client})
+    ledger.open("r", 1)
+
+    await adapter.write_message({"request_id": "r", "message": "a", "partial": True})
+    blocked = asyncio.create_task(adapter.write_message({"request_id": "r", "message": "b", "partial": True}))
+    await asyncio.sleep(0.01)
+    assert len(client.frames) == 1 and not blocked.done()
+
+    ledger.grant("r", 1)
+    await asyncio.wait_for(blocked, 1)
+    assert len(client.frames) == 2
+
+    ledger.cancel("r")
+    with pytest.raises(EOFError, match="cancelled"):
+        await adapter.write_message({"request_id": "r", "message": "c", "partial": True})
+    # the final frame still goes out and ends the stream
+    await adapter.write_message({"request_id": "r", "partial": False})
+    assert len(client.frames) == 3 and "r" not in ledger
+
+@pytest.mark.asyncio
+async def test_ledger_cancels_a_stalled_stream():
+    ledger = CreditLedger(stall_timeout=0.05)
+    ledger.open("r", 1)
+    await ledger.acquire("r")
+
+    # the receiver stopped reading without going away
+    with pytest.raises(StreamCancelledError):
+        await asyncio.wait_for(ledger.acquire("r"), 1)
+
+@pytest.mark.asyncio
+async def test_server_ignores_malformed_credit_frames():
+    class Socket:
+        request = None
+
+        def __init__(self, frames):
+            self.frames = frames
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            for frame in self.frames:
+                yield frame
+
+        async def send(self, message):
+            pass
+
+    ledger = get_credit_ledger()
+    ledger.open("bad-credit", 1)
+    frames = [json.dumps({"type": "credit", "request_id": "bad-credit", "credit": credit}) for credit in ("x", [1], True, -1, 2)]
+    queue = asyncio.Queue()
+    # the connection survives every bad frame and still handles the good one
+    await server_handler(Socket(frames + [json.dumps({"role": "Questioner", "message": "after", "request_id": str(uuid.uuid4())})]), queue)
+
+    assert ledger._windows["bad-credit"].credit == 3
+    assert queue.get_nowait()["message"] == "after"
+    ledger.close("bad-credit")